@@ -3,19 +3,19 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from datetime import timedelta
+import importlib
 import os
 
 from .config import config
+from .utils.db_routing import RoutingSession
 
 # Inicialización de extensiones
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 login_manager = LoginManager()
 jwt = JWTManager()
-migrate = Migrate()
 csrf = CSRFProtect()
 
 # Configuración del login_manager
@@ -23,32 +23,139 @@ login_manager.login_view = 'auth.login'
 login_manager.login_message = 'Por favor inicie sesión para acceder a esta página.'
 login_manager.login_message_category = 'info'
 
-def create_app(config_name='default'):
-    """Crea y configura la aplicación Flask"""
+# Blueprints de la aplicación: (módulo, atributo, prefijo de URL).
+# Se importan al registrarlos, de modo que los scripts que no sirven peticiones no cargan las vistas.
+BLUEPRINTS = [
+    ('.views.auth', 'auth_bp', None),
+    ('.auth.routes', 'jwt_auth_bp', '/api/auth'),
+    ('.api.routes', 'api_v1_bp', '/api/v1'),
+    ('.views.admin', 'admin_bp', '/admin'),
+    ('.views.organizer', 'organizer_bp', '/organizer'),
+    ('.views.volunteer', 'volunteer_bp', '/volunteer'),
+]
+
+def register_blueprints(app, nombres=None):
+    """Registra los blueprints indicados por nombre de atributo (todos si nombres es None)"""
+    for modulo, atributo, prefijo in BLUEPRINTS:
+        if nombres is not None and atributo not in nombres:
+            continue
+        blueprint = getattr(importlib.import_module(modulo, __name__), atributo)
+        app.register_blueprint(blueprint, url_prefix=prefijo)
+
+# Módulos de modelos que se importan siempre, para que las relaciones declaradas por nombre
+# se resuelvan aunque no se registre ningún blueprint que los importe.
+# (models/resource.py no se incluye: redefine la tabla gestion_recursos de models/event.py)
+MODEL_MODULES = ['.models.user', '.models.event', '.models.organization', '.models.activity', '.models.system',
+                 '.models.analytics']
+
+def import_models():
+    for modulo in MODEL_MODULES:
+        importlib.import_module(modulo, __name__)
+
+def create_app(config_name='default', blueprints=None):
+    """
+    Crea y configura la aplicación Flask.
+    blueprints limita los blueprints registrados: None registra todos y () ninguno,
+    útil para scripts de inicialización que solo necesitan los modelos.
+    """
+    from .utils.startup import StartupProfile, init_migrations
+    profile = StartupProfile()
     app = Flask(__name__)
+    app.extensions['startup_profile'] = profile
     
-    # Cargar la configuración
-    app.config.from_object(config[config_name])
+    with profile.phase('configuración'):
+        # Cargar la configuración
+        app.config.from_object(config[config_name])
+        
+        # Opciones del pool de conexiones según la configuración
+        from .utils.db_pool import build_engine_options
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
+        if app.config.get('REPLICA_DATABASE_URL'):
+            from .utils.db_routing import replica_bind_options
+            app.config.setdefault('SQLALCHEMY_BINDS', {})['replica'] = replica_bind_options(app.config)
+    
+        # IP y esquema reales del cliente detrás de los proxies de confianza
+        if app.config.get('PROXY_FIX_X_FOR'):
+            from werkzeug.middleware.proxy_fix import ProxyFix
+            saltos = app.config['PROXY_FIX_X_FOR']
+            app.wsgi_app = ProxyFix(app.wsgi_app, x_for=saltos, x_proto=saltos)
     
     # Inicializar extensiones
-    db.init_app(app)
-    bcrypt.init_app(app)
-    login_manager.init_app(app)
-    migrate.init_app(app, db)
-    jwt.init_app(app)
-    csrf.init_app(app)
+    with profile.phase('extensiones'):
+        db.init_app(app)
+        import_models()
+        bcrypt.init_app(app)
+        login_manager.init_app(app)
+        jwt.init_app(app)
+        csrf.init_app(app)
+        # Flask-Migrate (y Alembic) solo se cargan para la CLI
+        init_migrations(app, db)
+    
+    with profile.phase('servicios'):
+        # Lecturas de vistas de solo lectura en la réplica (si está configurada)
+        from .utils.db_routing import init_replica_routing
+        init_replica_routing(app, db)
+        
+        # Sesiones almacenadas en el servidor
+        from .utils.session_store import init_session_store
+        init_session_store(app)
+        
+        # Revocación de tokens JWT verificada en memoria
+        from .auth.revocation import init_token_revocation
+        init_token_revocation(app)
+        
+        # Limitación de intentos de inicio de sesión
+        from .utils.rate_limit import init_rate_limiter
+        init_rate_limiter(app)
+        
+        # Bandeja de salida de correos
+        from .utils.mailer import init_mailer
+        init_mailer(app)
+        
+        # Notificaciones en tiempo real (Server-Sent Events)
+        from .utils.notifications import init_notifications
+        init_notifications(app)
+        
+        # Eventos destacados de la página de inicio
+        from .utils.featured import init_featured_events
+        init_featured_events(app)
+        
+        # Actividad reciente del panel de administración
+        from .utils.activity_feed import init_activity_feed
+        init_activity_feed(app)
+        
+        # Resúmenes analíticos del panel de administración
+        from .utils.analytics import init_analytics
+        init_analytics(app)
+        
+        # Aviso de consultas perezosas durante el renderizado (desarrollo)
+        from .utils.query_guard import init_query_guard
+        init_query_guard(app)
     
     # Registrar blueprints
-    from .views.auth import auth_bp as views_auth_bp
-    from .views.admin import admin_bp
-    from .views.organizer import organizer_bp
-    from .views.volunteer import volunteer_bp
-    from .auth.routes import jwt_auth_bp
-    
-    app.register_blueprint(views_auth_bp)
-    app.register_blueprint(jwt_auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(admin_bp, url_prefix='/admin')
-    app.register_blueprint(organizer_bp, url_prefix='/organizer')
-    app.register_blueprint(volunteer_bp, url_prefix='/volunteer')
+    with profile.phase('blueprints'):
+        register_blueprints(app, blueprints)
+    
+    with profile.phase('recursos, imágenes y compresión'):
+        # Recursos estáticos generados (CSS/JS minificados con huella)
+        from .utils.assets import init_assets
+        init_assets(app)
+        
+        # Imágenes subidas y sus variantes redimensionadas
+        from .utils.uploads import init_uploads
+        init_uploads(app)
+        
+        # Compresión de respuestas y caché de páginas públicas
+        from .utils.compression import init_compression
+        init_compression(app)
+    
+    with profile.phase('comandos y tareas'):
+        # Comandos de línea de comandos y tareas programadas
+        from .commands import register_commands
+        from .utils.lifecycle import init_lifecycle_scheduler
+        register_commands(app)
+        init_lifecycle_scheduler(app)
     
+    if app.config.get('STARTUP_PROFILE'):
+        app.logger.info('Arranque de la aplicación:\n%s', profile.report())
     return app
@@ -0,0 +1,179 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import get_jwt_identity
+from app.auth.jwt_auth import token_required
+from app.models.event import Evento, SolicitudEvento
+from app.models.organization import Organizacion
+from app.api.serializers import (
+    ApiError,
+    EVENT_FIELDS, ORGANIZATION_FIELDS, SOLICITUD_FIELDS,
+    EVENT_INCLUDES, ORGANIZATION_INCLUDES, SOLICITUD_INCLUDES,
+    parse_fields, parse_includes, parse_ids, encode_cursor, decode_cursor,
+    event_query_options, organization_query_options, solicitud_query_options,
+    serialize_events, serialize_organizations, serialize_solicitudes
+)
+
+api_v1_bp = Blueprint('api_v1', __name__)
+
+MAX_BATCH_IDS = 100
+MAX_PAGE_SIZE = 100
+
+
+@api_v1_bp.errorhandler(ApiError)
+def handle_api_error(error):
+    """Devuelve los errores de validación en formato JSON"""
+    return jsonify({'message': error.message}), error.status
+
+
+def _page_size():
+    """Obtiene el tamaño de página solicitado dentro de los límites permitidos"""
+    limit = request.args.get('limit', current_app.config.get('ITEMS_PER_PAGE', 10), type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _paginate(query, id_column):
+    """
+    Paginación por cursor (keyset) sobre la columna id.
+    Devuelve los elementos de la página y el cursor de la siguiente.
+    """
+    limit = _page_size()
+    cursor = decode_cursor(request.args.get('cursor'))
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    # Se pide un elemento extra para saber si hay más páginas
+    items = query.order_by(id_column.asc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].id)
+    return items, next_cursor
+
+
+def _batch(query, id_column):
+    """Búsqueda por lote (?ids=1,2,3) respetando el orden solicitado"""
+    ids = parse_ids(request.args.get('ids'), MAX_BATCH_IDS)
+    encontrados = {obj.id: obj for obj in query.filter(id_column.in_(ids)).all()} if ids else {}
+    items = [encontrados[i] for i in ids if i in encontrados]
+    missing = [i for i in ids if i not in encontrados]
+    return items, missing
+
+
+def _parse_date(nombre):
+    valor = request.args.get(nombre)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise ApiError(f'Formato de fecha inválido en {nombre}, use AAAA-MM-DD')
+
+
+@api_v1_bp.route('/events', methods=['GET'])
+def list_events():
+    """Lista de eventos con campos seleccionables, lotes y paginación por cursor"""
+    campos = parse_fields(request.args.get('fields'), EVENT_FIELDS)
+    includes = parse_includes(request.args.get('include'), EVENT_INCLUDES)
+    query = Evento.query.options(*event_query_options(includes))
+
+    if 'ids' in request.args:
+        eventos, missing = _batch(query, Evento.id)
+        return jsonify({'data': serialize_events(eventos, campos, includes), 'missing': missing}), 200
+
+    organizacion_id = request.args.get('organizacion_id', type=int)
+    if organizacion_id:
+        query = query.filter(Evento.organizacion_id == organizacion_id)
+
+    estado = request.args.get('estado')
+    if estado:
+        query = query.filter(Evento.estado == estado)
+
+    fecha_desde = _parse_date('fecha_desde')
+    if fecha_desde:
+        query = query.filter(Evento.fecha >= fecha_desde)
+
+    fecha_hasta = _parse_date('fecha_hasta')
+    if fecha_hasta:
+        query = query.filter(Evento.fecha <= fecha_hasta)
+
+    eventos, next_cursor = _paginate(query, Evento.id)
+    return jsonify({
+        'data': serialize_events(eventos, campos, includes),
+        'next_cursor': next_cursor
+    }), 200
+
+
+@api_v1_bp.route('/events/<int:event_id>', methods=['GET'])
+def get_event(event_id):
+    """Detalle de un evento"""
+    campos = parse_fields(request.args.get('fields'), EVENT_FIELDS)
+    includes = parse_includes(request.args.get('include'), EVENT_INCLUDES)
+    evento = Evento.query.options(*event_query_options(includes)).filter(Evento.id == event_id).first()
+    if not evento:
+        return jsonify({'message': 'Evento no encontrado'}), 404
+    return jsonify({'data': serialize_events([evento], campos, includes)[0]}), 200
+
+
+@api_v1_bp.route('/organizations', methods=['GET'])
+def list_organizations():
+    """Lista de organizaciones con campos seleccionables, lotes y paginación por cursor"""
+    campos = parse_fields(request.args.get('fields'), ORGANIZATION_FIELDS)
+    includes = parse_includes(request.args.get('include'), ORGANIZATION_INCLUDES)
+    query = Organizacion.query.options(*organization_query_options(includes))
+
+    if 'ids' in request.args:
+        organizaciones, missing = _batch(query, Organizacion.id)
+        return jsonify({
+            'data': serialize_organizations(organizaciones, campos, includes),
+            'missing': missing
+        }), 200
+
+    tipo_id = request.args.get('tipo_organizacion_id', type=int)
+    if tipo_id:
+        query = query.filter(Organizacion.tipo_organizacion_id == tipo_id)
+
+    organizaciones, next_cursor = _paginate(query, Organizacion.id)
+    return jsonify({
+        'data': serialize_organizations(organizaciones, campos, includes),
+        'next_cursor': next_cursor
+    }), 200
+
+
+@api_v1_bp.route('/organizations/<int:org_id>', methods=['GET'])
+def get_organization(org_id):
+    """Detalle de una organización"""
+    campos = parse_fields(request.args.get('fields'), ORGANIZATION_FIELDS)
+    includes = parse_includes(request.args.get('include'), ORGANIZATION_INCLUDES)
+    organizacion = Organizacion.query.options(
+        *organization_query_options(includes)
+    ).filter(Organizacion.id == org_id).first()
+    if not organizacion:
+        return jsonify({'message': 'Organización no encontrada'}), 404
+    return jsonify({'data': serialize_organizations([organizacion], campos, includes)[0]}), 200
+
+
+@api_v1_bp.route('/solicitudes', methods=['GET'])
+@token_required
+def list_solicitudes():
+    """Solicitudes de participación del usuario autenticado"""
+    campos = parse_fields(request.args.get('fields'), SOLICITUD_FIELDS)
+    includes = parse_includes(request.args.get('include'), SOLICITUD_INCLUDES)
+    query = SolicitudEvento.query.options(
+        *solicitud_query_options(includes)
+    ).filter(SolicitudEvento.usuario_id == int(get_jwt_identity()))
+
+    if 'ids' in request.args:
+        solicitudes, missing = _batch(query, SolicitudEvento.id)
+        return jsonify({
+            'data': serialize_solicitudes(solicitudes, campos, includes),
+            'missing': missing
+        }), 200
+
+    estado = request.args.get('estado')
+    if estado:
+        query = query.filter(SolicitudEvento.estado == estado)
+
+    solicitudes, next_cursor = _paginate(query, SolicitudEvento.id)
+    return jsonify({
+        'data': serialize_solicitudes(solicitudes, campos, includes),
+        'next_cursor': next_cursor
+    }), 200
@@ -0,0 +1,201 @@
+import base64
+from sqlalchemy.orm import joinedload, selectinload
+from ..models.event import Evento, SolicitudEvento
+from ..models.organization import Organizacion
+from ..utils.preload import load_event_areas
+
+
+class ApiError(Exception):
+    """Error de validación de parámetros de la API"""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _fecha(valor):
+    return valor.isoformat() if valor else None
+
+
+# Campos disponibles por recurso. Cada campo es una función que recibe el objeto.
+EVENT_FIELDS = {
+    'id': lambda e: e.id,
+    'nombre': lambda e: e.nombre,
+    'fecha': lambda e: _fecha(e.fecha),
+    'descripcion': lambda e: e.descripcion,
+    'ubicacion': lambda e: e.ubicacion,
+    'localidad': lambda e: e.localidad,
+    'latitud': lambda e: e.latitud,
+    'longitud': lambda e: e.longitud,
+    'requisitos': lambda e: e.requisitos,
+    'estado': lambda e: e.estado,
+    'organizacion_id': lambda e: e.organizacion_id,
+}
+
+ORGANIZATION_FIELDS = {
+    'id': lambda o: o.id,
+    'nombre': lambda o: o.nombre,
+    'localidad': lambda o: o.localidad,
+    'descripcion': lambda o: o.descripcion,
+    'correo_electronico': lambda o: o.correo_electronico,
+    'telefono': lambda o: o.telefono,
+    'tipo_organizacion_id': lambda o: o.tipo_organizacion_id,
+    'fecha_creacion': lambda o: _fecha(o.fecha_creacion),
+}
+
+SOLICITUD_FIELDS = {
+    'id': lambda s: s.id,
+    'usuario_id': lambda s: s.usuario_id,
+    'evento_id': lambda s: s.evento_id,
+    'estado': lambda s: s.estado,
+    'solicitado_en': lambda s: _fecha(s.solicitado_en),
+    'decidido_en': lambda s: _fecha(s.decidido_en),
+}
+
+AREA_FIELDS = {
+    'id': lambda a: a.id,
+    'nombre': lambda a: a.nombre,
+}
+
+# Relaciones que se pueden incluir en la respuesta por recurso
+EVENT_INCLUDES = {'organizacion', 'areas'}
+ORGANIZATION_INCLUDES = {'tipo', 'areas'}
+SOLICITUD_INCLUDES = {'evento'}
+
+
+def parse_list(valor):
+    """Convierte una cadena separada por comas en una lista sin vacíos"""
+    if not valor:
+        return []
+    return [parte.strip() for parte in valor.split(',') if parte.strip()]
+
+
+def parse_fields(valor, disponibles):
+    """Valida el parámetro ?fields= y devuelve la lista de campos a serializar"""
+    campos = parse_list(valor)
+    if not campos:
+        return list(disponibles)
+    desconocidos = [c for c in campos if c not in disponibles]
+    if desconocidos:
+        raise ApiError(f"Campos desconocidos: {', '.join(desconocidos)}")
+    # El id siempre se incluye para que el cliente pueda referenciar el objeto
+    if 'id' not in campos:
+        campos.insert(0, 'id')
+    return campos
+
+
+def parse_includes(valor, disponibles):
+    """Valida el parámetro ?include= y devuelve el conjunto de relaciones"""
+    includes = set(parse_list(valor))
+    desconocidos = includes - disponibles
+    if desconocidos:
+        raise ApiError(f"Relaciones desconocidas: {', '.join(sorted(desconocidos))}")
+    return includes
+
+
+def parse_ids(valor, max_ids):
+    """Valida el parámetro ?ids=1,2,3 conservando el orden solicitado"""
+    partes = parse_list(valor)
+    # Se limita la entrada antes de procesarla, repetidos incluidos
+    if len(partes) > max_ids:
+        raise ApiError(f'Se permiten como máximo {max_ids} identificadores por consulta')
+    for parte in partes:
+        # isdigit() también acepta dígitos Unicode ('²', '٣') que int() no convierte
+        if not (parte.isascii() and parte.isdigit()):
+            raise ApiError(f'Identificador inválido: {parte}')
+    return list(dict.fromkeys(int(parte) for parte in partes))
+
+
+def encode_cursor(ultimo_id):
+    """Genera un cursor opaco a partir del último id devuelto"""
+    return base64.urlsafe_b64encode(str(ultimo_id).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decodifica un cursor generado por encode_cursor"""
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(cursor + relleno).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError('Cursor inválido')
+
+
+def serialize(obj, campos, disponibles):
+    """Serializa un objeto con el subconjunto de campos solicitado"""
+    return {campo: disponibles[campo](obj) for campo in campos}
+
+
+def event_query_options(includes):
+    """Opciones de carga anticipada para las relaciones incluidas de eventos"""
+    opciones = []
+    if 'organizacion' in includes:
+        opciones.append(joinedload(Evento.organizacion))
+    return opciones
+
+
+def organization_query_options(includes):
+    """Opciones de carga anticipada para las relaciones incluidas de organizaciones"""
+    opciones = []
+    if 'tipo' in includes:
+        opciones.append(joinedload(Organizacion.tipo_organizacion))
+    if 'areas' in includes:
+        opciones.append(selectinload(Organizacion.areas_trabajo))
+    return opciones
+
+
+def solicitud_query_options(includes):
+    """Opciones de carga anticipada para las relaciones incluidas de solicitudes"""
+    opciones = []
+    if 'evento' in includes:
+        opciones.append(joinedload(SolicitudEvento.evento))
+    return opciones
+
+
+def serialize_events(eventos, campos, includes):
+    """Serializa una lista de eventos con sus relaciones incluidas"""
+    areas_por_evento = load_event_areas([e.id for e in eventos]) if 'areas' in includes else {}
+    resultado = []
+    for evento in eventos:
+        data = serialize(evento, campos, EVENT_FIELDS)
+        if 'organizacion' in includes:
+            data['organizacion'] = {
+                'id': evento.organizacion.id,
+                'nombre': evento.organizacion.nombre,
+            }
+        if 'areas' in includes:
+            data['areas'] = [serialize(a, AREA_FIELDS, AREA_FIELDS) for a in areas_por_evento.get(evento.id, [])]
+        resultado.append(data)
+    return resultado
+
+
+def serialize_organizations(organizaciones, campos, includes):
+    """Serializa una lista de organizaciones con sus relaciones incluidas"""
+    resultado = []
+    for org in organizaciones:
+        data = serialize(org, campos, ORGANIZATION_FIELDS)
+        if 'tipo' in includes:
+            data['tipo'] = {
+                'id': org.tipo_organizacion.id,
+                'nombre': org.tipo_organizacion.nombre,
+            }
+        if 'areas' in includes:
+            data['areas'] = [serialize(a, AREA_FIELDS, AREA_FIELDS) for a in org.areas_trabajo]
+        resultado.append(data)
+    return resultado
+
+
+def serialize_solicitudes(solicitudes, campos, includes):
+    """Serializa una lista de solicitudes con sus relaciones incluidas"""
+    resultado = []
+    for solicitud in solicitudes:
+        data = serialize(solicitud, campos, SOLICITUD_FIELDS)
+        if 'evento' in includes:
+            data['evento'] = {
+                'id': solicitud.evento.id,
+                'nombre': solicitud.evento.nombre,
+                'fecha': _fecha(solicitud.evento.fecha),
+            }
+        resultado.append(data)
+    return resultado
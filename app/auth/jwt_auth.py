@@ -4,11 +4,16 @@ from flask_jwt_extended import (
     create_refresh_token,
     jwt_required,
     get_jwt_identity,
-    get_jwt
+    get_jwt,
+    decode_token
 )
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
 from datetime import datetime, timedelta
 from functools import wraps
 from app.models.user import User
+from app.auth.revocation import revoke_token
+from app.utils.rate_limit import get_login_limiter
 from app import db
 
 def init_jwt_auth(app):
@@ -17,21 +22,28 @@ def init_jwt_auth(app):
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = app.config['JWT_ACCESS_TOKEN_EXPIRES']
     app.config['JWT_REFRESH_TOKEN_EXPIRES'] = app.config['JWT_REFRESH_TOKEN_EXPIRES']
 
+def token_claims(user):
+    """Claims del token: rol, estado y versión, para verificar sin consultar la base de datos"""
+    return {
+        'rol': user.role.nombre if user.role else None,
+        'estado': user.estado,
+        'ver': user.version_token or 0
+    }
+
 def login_user(email, password):
     """Autentica un usuario y devuelve los tokens JWT"""
+    limiter = get_login_limiter()
     user = User.query.filter_by(correo_electronico=email).first()
     
     if user and user.check_password(password):
+        limiter.register_success(email)
         if not user.is_active():
             return None, "Usuario inactivo"
             
         # Crear tokens
-        access_token = create_access_token(identity=user.id)
-        refresh_token = create_refresh_token(identity=user.id)
-        
-        # Actualizar último login
-        user.ultimo_intento_fallido = datetime.utcnow()
-        db.session.commit()
+        claims = token_claims(user)
+        access_token = create_access_token(identity=str(user.id), additional_claims=claims)
+        refresh_token = create_refresh_token(identity=str(user.id), additional_claims=claims)
         
         return {
             'access_token': access_token,
@@ -44,23 +56,44 @@ def login_user(email, password):
             }
         }, None
     
+    limiter.register_failure(email)
     return None, "Credenciales inválidas"
 
 def refresh_token():
     """Genera un nuevo token de acceso usando el token de actualización"""
     current_user_id = get_jwt_identity()
-    access_token = create_access_token(identity=current_user_id)
+    # El rol y el estado se leen de nuevo para que el token refleje los cambios
+    user = User.query.get(int(current_user_id))
+    if not user or not user.is_active():
+        return None
+    access_token = create_access_token(identity=current_user_id, additional_claims=token_claims(user))
     return {'access_token': access_token}
 
+def logout_tokens(refresh=None):
+    """
+    Revoca el token de acceso actual y, si se envía, el de actualización.
+    El de actualización se valida antes de revocar nada; si no es válido (mal formado,
+    vencido o de otro usuario) se ignora y el cierre de sesión sigue adelante.
+    """
+    payload = None
+    if refresh:
+        try:
+            payload = decode_token(refresh)
+        except (JWTExtendedException, PyJWTError):
+            pass
+        if payload and (payload.get('type') != 'refresh' or payload.get('sub') != get_jwt_identity()):
+            payload = None
+    revoke_token(get_jwt())
+    if payload:
+        revoke_token(payload)
+
 def token_required(f):
     """Decorador para proteger rutas que requieren autenticación"""
     @wraps(f)
     @jwt_required()
     def decorated(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or not user.is_active():
+        # Los claims del token y la lista de revocaciones bastan: no se consulta la base de datos
+        if get_jwt().get('estado') != 'activo':
             return jsonify({'message': 'Usuario no autorizado'}), 401
             
         return f(*args, **kwargs)
@@ -71,10 +104,8 @@ def admin_required(f):
     @wraps(f)
     @jwt_required()
     def decorated(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or not user.is_active() or not user.is_admin():
+        claims = get_jwt()
+        if claims.get('estado') != 'activo' or claims.get('rol') != 'administrador':
             return jsonify({'message': 'Acceso denegado'}), 403
             
         return f(*args, **kwargs)
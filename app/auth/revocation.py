@@ -0,0 +1,134 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from app import db, jwt
+from app.models.user import RevocacionToken
+from app.utils.data_structures import BloomFilter
+
+
+class RevocationList:
+    """
+    Revocaciones de tokens en memoria del proceso:
+    - un filtro de Bloom con los jti revocados (solo un acierto se confirma en la base de datos);
+    - la versión mínima de token vigente por usuario.
+    Se sincroniza con la tabla revocaciones_token cada sync_interval segundos leyendo solo las filas
+    recientes, por lo que verificar un token no requiere consultas a la base de datos.
+    Las filas no se leen a partir del último id: los IDENTITY de SQL Server pueden confirmarse
+    fuera de orden y una revocación con id menor se perdería. Cada lectura repite las filas creadas
+    en los últimos sync_margin segundos antes de la anterior y descarta las ya aplicadas por id.
+    """
+    def __init__(self, capacity, error_rate, sync_interval, sync_margin=60):
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.versiones = {}
+        self.sync_interval = sync_interval
+        self.sync_margin = timedelta(seconds=sync_margin)
+        self._lock = threading.Lock()
+        self._desde = None
+        self._aplicadas = {}  # id -> creado_en de las revocaciones dentro del margen
+        self._sincronizado = None
+
+    def _apply(self, revocacion):
+        if revocacion.jti:
+            self.bloom.add(revocacion.jti)
+        if revocacion.version is not None:
+            actual = self.versiones.get(revocacion.usuario_id, 0)
+            self.versiones[revocacion.usuario_id] = max(actual, revocacion.version)
+
+    def _record(self, revocacion):
+        if revocacion.id not in self._aplicadas:
+            self._apply(revocacion)
+            self._aplicadas[revocacion.id] = revocacion.creado_en
+
+    def add(self, revocacion):
+        """Aplica una revocación recién confirmada en este proceso"""
+        with self._lock:
+            self._record(revocacion)
+
+    def sync(self, force=False):
+        """Carga las revocaciones nuevas; reconstruye el filtro si superó su capacidad"""
+        with self._lock:
+            if (not force and self._sincronizado is not None
+                    and time.monotonic() - self._sincronizado < self.sync_interval):
+                return
+            if self.bloom.count >= self.bloom.capacity:
+                self.bloom.clear()
+                self.versiones = {}
+                self._desde = None
+                self._aplicadas = {}
+            inicio = datetime.utcnow()
+            consulta = RevocacionToken.query.filter(RevocacionToken.expira_en > inicio)
+            if self._desde is not None:
+                consulta = consulta.filter(RevocacionToken.creado_en >= self._desde - self.sync_margin)
+            for revocacion in consulta.all():
+                self._record(revocacion)
+            # Solo hace falta recordar las revocaciones que la próxima lectura volverá a ver
+            limite = inicio - self.sync_margin
+            self._aplicadas = {id: creado for id, creado in self._aplicadas.items() if creado >= limite}
+            self._desde = inicio
+            self._sincronizado = time.monotonic()
+
+    def is_revoked(self, payload):
+        self.sync()
+        usuario_id = int(payload['sub'])
+        if payload.get('ver', 0) < self.versiones.get(usuario_id, 0):
+            return True
+        jti = payload.get('jti')
+        if jti and jti in self.bloom:
+            # Posible falso positivo del filtro: se confirma en la base de datos
+            return db.session.query(
+                RevocacionToken.query.filter_by(jti=jti).exists()
+            ).scalar()
+        return False
+
+
+def _expiration(payload):
+    return datetime.fromtimestamp(payload['exp'], timezone.utc).replace(tzinfo=None)
+
+
+def revoke_token(payload):
+    """Revoca un token concreto (por su jti) hasta que caduque"""
+    revocacion = RevocacionToken(
+        usuario_id=int(payload['sub']),
+        jti=payload['jti'],
+        expira_en=_expiration(payload)
+    )
+    db.session.add(revocacion)
+    db.session.commit()
+    # Efecto inmediato en este proceso; los demás lo cargan en su próxima sincronización
+    get_revocation_list().add(revocacion)
+
+
+def revoke_user_tokens(user):
+    """
+    Revoca todos los tokens emitidos al usuario incrementando su versión.
+    Se confirma junto con la transacción del llamador.
+    """
+    user.version_token = (user.version_token or 0) + 1
+    duracion = max(current_app.config['JWT_ACCESS_TOKEN_EXPIRES'], current_app.config['JWT_REFRESH_TOKEN_EXPIRES'])
+    db.session.add(RevocacionToken(
+        usuario_id=user.id,
+        version=user.version_token,
+        expira_en=datetime.utcnow() + duracion
+    ))
+
+
+@jwt.token_in_blocklist_loader
+def _token_revocado(jwt_header, jwt_payload):
+    return get_revocation_list().is_revoked(jwt_payload)
+
+
+def init_token_revocation(app):
+    """Crea la lista de revocaciones en memoria de la aplicación"""
+    revocaciones = RevocationList(
+        app.config.get('JWT_REVOCATION_CAPACITY', 10000),
+        app.config.get('JWT_REVOCATION_ERROR_RATE', 0.001),
+        app.config.get('JWT_REVOCATION_SYNC_INTERVAL', 5),
+        app.config.get('JWT_REVOCATION_SYNC_MARGIN', 60)
+    )
+    app.extensions['jwt_revocations'] = revocaciones
+    return revocaciones
+
+
+def get_revocation_list():
+    return current_app.extensions['jwt_revocations']
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.auth.jwt_auth import login_user, refresh_token, token_required, admin_required
+from app.auth.jwt_auth import login_user, refresh_token, logout_tokens, token_required, admin_required
 from app.models.user import User
+from app.utils.rate_limit import get_login_limiter
 
 jwt_auth_bp = Blueprint('jwt_auth', __name__)
 
@@ -12,6 +13,11 @@ def login():
     
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({'message': 'Datos incompletos'}), 400
+    
+    # Rechazar el tráfico abusivo antes de consultar la base de datos o verificar la contraseña
+    permitido, espera = get_login_limiter().check(request.remote_addr, data['email'])
+    if not permitido:
+        return jsonify({'message': 'Demasiados intentos de inicio de sesión'}), 429, {'Retry-After': str(espera)}
         
     result, error = login_user(data['email'], data['password'])
     
@@ -24,14 +30,17 @@ def login():
 @jwt_required(refresh=True)
 def refresh():
     """Ruta para refrescar el token de acceso"""
-    return jsonify(refresh_token()), 200
+    result = refresh_token()
+    if result is None:
+        return jsonify({'message': 'Usuario no autorizado'}), 401
+    return jsonify(result), 200
 
 @jwt_auth_bp.route('/me', methods=['GET'])
 @token_required
 def get_current_user():
     """Ruta para obtener información del usuario actual"""
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = User.query.get(int(current_user_id))
     
     return jsonify({
         'id': user.id,
@@ -43,6 +52,7 @@ def get_current_user():
 @jwt_auth_bp.route('/logout', methods=['POST'])
 @token_required
 def logout():
-    """Ruta para cerrar sesión"""
-    # En JWT, el logout se maneja en el cliente eliminando los tokens
+    """Ruta para cerrar sesión: revoca el token de acceso y, si se envía, el de actualización"""
+    data = request.get_json(silent=True) or {}
+    logout_tokens(data.get('refresh_token'))
     return jsonify({'message': 'Sesión cerrada exitosamente'}), 200 
\ No newline at end of file
@@ -0,0 +1,62 @@
+import click
+
+
+def register_commands(app):
+    """Registra los comandos de línea de comandos de la aplicación"""
+
+    @app.cli.command('lifecycle')
+    @click.option('--batch-size', type=int, default=None, help='Filas actualizadas por lote')
+    def lifecycle_command(batch_size):
+        """Ejecuta las transiciones de estado de eventos y solicitudes"""
+        from .utils.lifecycle import run_lifecycle
+        resultado = run_lifecycle(batch_size)
+        for nombre, total in resultado.items():
+            click.echo(f'{nombre}: {total}')
+
+    @app.cli.command('analytics')
+    @click.option('--batch-size', type=int, default=1000, help='Eventos procesados por lote')
+    def rebuild_analytics_command(batch_size):
+        """Recalcula los resúmenes analíticos del panel de administración"""
+        from .utils.analytics import rebuild_analytics
+        resultado = rebuild_analytics(batch_size)
+        click.echo(f'Resúmenes analíticos: {resultado["filas"]} filas de eventos, {resultado["dias"]} días de solicitudes')
+
+    @app.cli.command('assets')
+    def build_assets_command():
+        """Genera los CSS/JS minificados con huella y sus variantes comprimidas"""
+        from .utils.assets import build_assets
+        manifest = build_assets(app.static_folder)
+        for nombre, destino in sorted(manifest.items()):
+            click.echo(f'{nombre} -> {destino}')
+
+    @app.cli.command('resumenes')
+    def rebuild_summaries_command():
+        """Reconstruye los resúmenes de participación y de calificaciones"""
+        from .models.activity import rebuild_summaries
+        from .utils.ratings import rebuild_rating_summaries
+        usuarios, organizaciones = rebuild_summaries()
+        eventos = rebuild_rating_summaries()
+        click.echo(f'Resúmenes reconstruidos: {usuarios} voluntarios, {organizaciones} organizaciones, '
+                   f'{eventos} eventos calificados')
+
+    @app.cli.command('outbox')
+    @click.option('--max-batches', type=int, default=None, help='Lotes enviados como máximo')
+    def outbox_command(max_batches):
+        """Envía los correos pendientes de la bandeja de salida"""
+        from .utils.mailer import get_outbox_sender
+        resultado = get_outbox_sender().send_pending(max_batches)
+        for nombre, total in resultado.items():
+            click.echo(f'{nombre}: {total}')
+
+    @app.cli.command('seed')
+    @click.option('--force', is_flag=True, help='Sincroniza aunque la versión guardada coincida')
+    def seed_command(force):
+        """Crea o actualiza los datos de referencia (roles, áreas, tipos de organización)"""
+        from .utils.init_data import seed_reference_data, seed_version
+        resultado = seed_reference_data(force=force)
+        if resultado is None:
+            click.echo(f'Datos de referencia al día (versión {seed_version()})')
+            return
+        for tabla, (insertadas, actualizadas) in resultado.items():
+            click.echo(f'{tabla}: {insertadas} insertadas, {actualizadas} actualizadas')
+        click.echo(f'Versión de la semilla: {seed_version()}')
@@ -1,10 +1,14 @@
 from datetime import datetime, timedelta
-from flask import current_app
+from flask import current_app, request, url_for
 from flask_login import login_user, logout_user, current_user
 from .. import db, bcrypt
 from ..models.user import User, Role, RegistroActividadUsuario
 from ..utils.security import validate_password, generate_jwt_token
 from ..utils.validators import validate_email
+from ..utils.rate_limit import get_login_limiter
+from ..utils.mailer import queue_email
+from ..utils.session_store import regenerate_session
+from ..auth.revocation import revoke_user_tokens
 
 class AuthController:
     @staticmethod
@@ -81,11 +85,22 @@ class AuthController:
         """
         Inicia sesión de un usuario
         """
+        # Rechazar el tráfico abusivo antes de consultar la base de datos o verificar la contraseña
+        limiter = get_login_limiter()
+        permitido, espera = limiter.check(request.remote_addr, email)
+        if not permitido:
+            return {
+                'success': False,
+                'message': f'Demasiados intentos de inicio de sesión. Intente de nuevo en {espera} segundos.',
+                'retry_after': espera
+            }
+        
         try:
             user = User.query.filter_by(correo_electronico=email).first()
             
             # Verificar si el usuario existe
             if not user:
+                limiter.register_failure(email)
                 return {'success': False, 'message': 'Correo electrónico o contraseña incorrectos'}
             
             # Verificar si el usuario está bloqueado
@@ -104,26 +119,19 @@ class AuthController:
             if user.estado == 'inactivo':
                 return {'success': False, 'message': 'Su cuenta está inactiva. Contacte al administrador.'}
             
-            # Verificar la contraseña
+            # Verificar la contraseña; los fallos se cuentan en el limitador, sin escribir en la base de datos
             if not user.check_password(password):
-                # Incrementar el contador de intentos fallidos
-                user.intentos_fallidos += 1
-                user.ultimo_intento_fallido = datetime.utcnow()
-                
-                # Bloquear al usuario si excede el número máximo de intentos
-                max_attempts = current_app.config.get('MAX_LOGIN_ATTEMPTS', 5)
-                if user.intentos_fallidos >= max_attempts:
-                    user.estado = 'bloqueado'
-                
-                db.session.commit()
-                
+                limiter.register_failure(email)
                 return {'success': False, 'message': 'Correo electrónico o contraseña incorrectos'}
             
-            # Resetear el contador de intentos fallidos
-            user.intentos_fallidos = 0
-            db.session.commit()
+            limiter.register_success(email)
+            
+            # Resetear el contador heredado de intentos fallidos solo si hace falta
+            if user.intentos_fallidos:
+                user.intentos_fallidos = 0
             
-            # Iniciar sesión
+            # Iniciar sesión con un id de sesión nuevo
+            regenerate_session()
             login_user(user, remember=remember)
             
             # Registrar la actividad
@@ -172,8 +180,9 @@ class AuthController:
             db.session.add(activity)
             db.session.commit()
             
-            # Cerrar sesión
+            # Cerrar sesión y descartar el id de sesión
             logout_user()
+            regenerate_session()
             
             return {'success': True, 'message': 'Cierre de sesión exitoso'}
         
@@ -197,8 +206,9 @@ class AuthController:
         if not validate_password(new_password):
             return {'success': False, 'message': 'La nueva contraseña no cumple con los requisitos de seguridad'}
         
-        # Cambiar la contraseña
+        # Cambiar la contraseña y revocar los tokens emitidos con la anterior
         user.contrasena = new_password
+        revoke_user_tokens(user)
         db.session.commit()
         
         # Registrar la actividad
@@ -226,8 +236,15 @@ class AuthController:
         # Generar token de restablecimiento (válido por 1 hora)
         token = generate_jwt_token(user.id, expiration=3600)
         
-        # Aquí se enviaría el correo con el enlace para restablecer la contraseña
-        # Por simplicidad, solo devolvemos el token
+        # El correo se envía desde la bandeja de salida al confirmar la transacción
+        enlace = url_for('auth.reset_password', token=token, _external=True)
+        queue_email(
+            user.correo_electronico,
+            'Restablecer tu contraseña de LandLink',
+            f'Hola {user.nombre},\n\n'
+            f'Para restablecer tu contraseña abre el siguiente enlace (válido durante 1 hora):\n{enlace}\n\n'
+            'Si no solicitaste este cambio, ignora este mensaje.'
+        )
         
         # Registrar la actividad
         activity = RegistroActividadUsuario(
@@ -238,11 +255,8 @@ class AuthController:
         db.session.add(activity)
         db.session.commit()
         
-        return {
-            'success': True, 
-            'message': 'Si el correo está registrado, recibirá instrucciones para restablecer su contraseña',
-            'token': token  # En producción, esto no se devolvería
-        }
+        # El token solo viaja en el correo: la respuesta es la misma exista o no la cuenta
+        return {'success': True, 'message': 'Si el correo está registrado, recibirá instrucciones para restablecer su contraseña'}
     
     @staticmethod
     def reset_password(token, new_password):
@@ -266,8 +280,9 @@ class AuthController:
         if not validate_password(new_password):
             return {'success': False, 'message': 'La nueva contraseña no cumple con los requisitos de seguridad'}
         
-        # Cambiar la contraseña
+        # Cambiar la contraseña y revocar los tokens emitidos con la anterior
         user.contrasena = new_password
+        revoke_user_tokens(user)
         db.session.commit()
         
         # Registrar la actividad
@@ -3,12 +3,17 @@ from ..models.user import User
 from datetime import datetime
 from .. import db
 from sqlalchemy import or_
+from ..utils.lifecycle import ESTADOS_ABIERTOS
+from ..utils.capacity import enroll, waitlist_position
 
 class ProjectController:
     @staticmethod
     def get_projects(filters=None):
         """Obtiene proyectos con filtros opcionales"""
-        query = Evento.query.filter(Evento.fecha >= datetime.utcnow().date())
+        query = Evento.query.filter(
+            Evento.estado.in_(ESTADOS_ABIERTOS),
+            Evento.fecha >= datetime.utcnow().date()
+        )
         
         if filters:
             if filters.get('search'):
@@ -34,10 +39,19 @@ class ProjectController:
                 query = query.filter(Evento.organizador_id == filters['organizador'])
         
         # Ordenar por fecha
-        query = query.order_by(Evento.fecha.asc())
+        query = query.order_by(Evento.fecha.asc(), Evento.id.asc())
+        
+        if filters and filters.get('limit'):
+            query = query.limit(filters['limit'])
         
         return query.all()
     
+    @staticmethod
+    def get_featured_projects(limit=3):
+        """Obtiene los eventos destacados (próximos, más solicitados y mejor calificados)"""
+        from ..utils.featured import get_featured_events
+        return get_featured_events(limit)
+    
     @staticmethod
     def get_project_details(project_id):
         """Obtiene detalles de un proyecto específico"""
@@ -49,6 +63,7 @@ class ProjectController:
         return Evento.query.filter(
             Evento.area_id == project.area_id,
             Evento.id != project.id,
+            Evento.estado.in_(ESTADOS_ABIERTOS),
             Evento.fecha >= datetime.utcnow().date()
         ).limit(3).all()
     
@@ -56,7 +71,10 @@ class ProjectController:
     def get_project_stats():
         """Obtiene estadísticas de proyectos"""
         total_projects = Evento.query.count()
-        active_projects = Evento.query.filter(Evento.fecha >= datetime.utcnow().date()).count()
+        active_projects = Evento.query.filter(
+            Evento.estado.in_(ESTADOS_ABIERTOS),
+            Evento.fecha >= datetime.utcnow().date()
+        ).count()
         total_volunteers = User.query.filter_by(rol_id=3).count()  # Asumiendo que 3 es el ID del rol voluntario
         total_organizations = User.query.filter_by(rol_id=2).count()  # Asumiendo que 2 es el ID del rol organizador
         
@@ -84,21 +102,19 @@ class ProjectController:
         if existing_request:
             return False, "Ya has enviado una solicitud para este proyecto"
         
-        # Crear nueva solicitud
-        solicitud = SolicitudEvento(
-            usuario_id=user_id,
-            evento_id=project_id,
-            mensaje=mensaje,
-            estado='pendiente'
-        )
-        
+        # Crear nueva solicitud (en lista de espera si el proyecto está completo).
+        # SolicitudEvento no guarda mensaje, así que el texto del formulario no se almacena
         try:
-            db.session.add(solicitud)
-            db.session.commit()
-            return True, "Solicitud enviada correctamente"
+            solicitud = enroll(user_id, project_id)
         except Exception as e:
             db.session.rollback()
             return False, f"Error al enviar la solicitud: {str(e)}"
+        
+        if solicitud is None:
+            return False, "Ya has enviado una solicitud para este proyecto"
+        if solicitud.estado == 'en_espera':
+            return True, f"El proyecto está completo. Quedaste en la lista de espera (posición {waitlist_position(solicitud)})"
+        return True, "Solicitud enviada correctamente"
     
     @staticmethod
     def get_user_requests(user_id):
@@ -0,0 +1,72 @@
+from datetime import datetime
+from ..models.event import Evento, SolicitudEvento
+from ..models.activity import HistorialActividad, ResumenVoluntario
+from .. import db
+
+class VolunteerController:
+    @staticmethod
+    def get_upcoming_events(user_id, limit=None):
+        """Eventos futuros con solicitud aprobada, ordenados por fecha, en una sola consulta"""
+        query = Evento.query.join(
+            SolicitudEvento, SolicitudEvento.evento_id == Evento.id
+        ).filter(
+            SolicitudEvento.usuario_id == user_id,
+            SolicitudEvento.estado == 'aprobado',
+            Evento.fecha >= datetime.utcnow().date()
+        ).order_by(Evento.fecha.asc(), Evento.id.asc())
+
+        if limit:
+            query = query.limit(limit)
+
+        return query.all()
+
+    @staticmethod
+    def get_recent_requests(user_id, limit=10):
+        """Últimas solicitudes del usuario con su evento cargado en la misma consulta"""
+        return SolicitudEvento.query.options(
+            db.joinedload(SolicitudEvento.evento)
+        ).filter(
+            SolicitudEvento.usuario_id == user_id
+        ).order_by(
+            SolicitudEvento.solicitado_en.desc(),
+            SolicitudEvento.id.desc()
+        ).limit(limit).all()
+
+    @staticmethod
+    def count_requests(user_id):
+        """Cantidad de solicitudes del usuario"""
+        return db.session.query(db.func.count(SolicitudEvento.id)).filter(
+            SolicitudEvento.usuario_id == user_id
+        ).scalar()
+
+    @staticmethod
+    def get_enrolled_event_ids(user_id, evento_ids):
+        """
+        Ids de los eventos indicados (los de una página del listado) en los que el usuario
+        tiene solicitud, como conjunto: una consulta IN acotada a la página.
+        """
+        if not evento_ids:
+            return set()
+        filas = db.session.query(SolicitudEvento.evento_id).filter(
+            SolicitudEvento.usuario_id == user_id,
+            SolicitudEvento.evento_id.in_(evento_ids)
+        ).all()
+        return {fila[0] for fila in filas}
+
+    @staticmethod
+    def get_history_page(user_id, page=1, per_page=10):
+        """Página del historial de participación con evento, organización y rol en la misma consulta"""
+        return HistorialActividad.query.options(
+            db.joinedload(HistorialActividad.evento).joinedload(Evento.organizacion),
+            db.joinedload(HistorialActividad.rol_evento)
+        ).filter(
+            HistorialActividad.usuario_id == user_id
+        ).order_by(
+            HistorialActividad.fecha_participacion.desc(),
+            HistorialActividad.id.desc()
+        ).paginate(page=page, per_page=per_page, error_out=False)
+
+    @staticmethod
+    def get_summary(user_id):
+        """Totales de participación precalculados (o None si aún no participó)"""
+        return db.session.get(ResumenVoluntario, user_id)
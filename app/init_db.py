@@ -1,32 +1,10 @@
-from app import db, create_app
-from app.models.user import Role
+from app.utils.init_data import seed_reference_data
+from app.utils.startup import script_app_context
 
 def init_roles():
-    """Inicializa los roles básicos del sistema"""
-    app = create_app()
-    with app.app_context():
-        roles = [
-            {
-                'nombre': 'administrador',
-                'descripcion': 'Administrador del sistema con acceso total'
-            },
-            {
-                'nombre': 'organizador',
-                'descripcion': 'Organizador de eventos y proyectos'
-            },
-            {
-                'nombre': 'voluntario',
-                'descripcion': 'Usuario voluntario'
-            }
-        ]
-        
-        for role_data in roles:
-            role = Role.query.filter_by(nombre=role_data['nombre']).first()
-            if not role:
-                role = Role(**role_data)
-                db.session.add(role)
-        
-        db.session.commit()
+    """Inicializa los roles básicos del sistema junto con el resto de datos de referencia"""
+    with script_app_context():
+        seed_reference_data(force=True)
 
 if __name__ == '__main__':
-    init_roles() 
\ No newline at end of file
+    init_roles() 
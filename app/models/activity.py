@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import event, inspect
 from .. import db
 
 class HistorialActividad(db.Model):
@@ -6,14 +7,192 @@ class HistorialActividad(db.Model):
     __tablename__ = 'historial_actividad'
     
     id = db.Column(db.Integer, primary_key=True)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
-    evento_id = db.Column(db.Integer, db.ForeignKey('eventos.id'), nullable=False)
-    fecha_participacion = db.Column(db.Date, nullable=False)
+    # active_history conserva el valor anterior para ajustar los resúmenes al actualizar
+    usuario_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False), active_history=True)
+    evento_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('eventos.id'), nullable=False), active_history=True)
+    fecha_participacion = db.column_property(db.Column(db.Date, nullable=False), active_history=True)
     rol_evento_id = db.Column(db.Integer, db.ForeignKey('roles_evento.id'))
-    horas = db.Column(db.Integer)
+    horas = db.column_property(db.Column(db.Integer), active_history=True)
+    
+    __table_args__ = (
+        db.Index('ix_historial_usuario_fecha', 'usuario_id', 'fecha_participacion'),
+    )
     
     def __repr__(self):
         return f'<HistorialActividad {self.id}>'
 
 
+class ResumenVoluntario(db.Model):
+    """Totales de participación por voluntario, mantenidos al escribir el historial"""
+    __tablename__ = 'resumen_voluntarios'
+    
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), primary_key=True)
+    total_horas = db.Column(db.Integer, nullable=False, default=0)
+    eventos_asistidos = db.Column(db.Integer, nullable=False, default=0)
+    ultima_participacion = db.Column(db.Date)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ResumenVoluntario {self.usuario_id}>'
+
+
+class ResumenOrganizacion(db.Model):
+    """Totales de participación por organización, mantenidos al escribir el historial"""
+    __tablename__ = 'resumen_organizaciones'
+    
+    organizacion_id = db.Column(db.Integer, db.ForeignKey('organizaciones.id'), primary_key=True)
+    total_horas = db.Column(db.Integer, nullable=False, default=0)
+    participaciones = db.Column(db.Integer, nullable=False, default=0)
+    ultima_participacion = db.Column(db.Date)
+    actualizado_en = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ResumenOrganizacion {self.organizacion_id}>'
+
+
+def _organizacion_de_evento(connection, evento_id):
+    from .event import Evento
+    return connection.execute(
+        db.select(Evento.organizacion_id).where(Evento.id == evento_id)
+    ).scalar()
+
+
+def _aplicar_delta(connection, modelo, columna_id, valor_id, columna_conteo, horas, conteo, fecha):
+    """
+    Suma horas y participaciones a una fila de resumen, creándola si no existe.
+    La última participación solo avanza; al restar se recalcula aparte.
+    """
+    tabla = modelo.__table__
+    ultima = tabla.c.ultima_participacion
+    valores = {
+        'total_horas': tabla.c.total_horas + horas,
+        columna_conteo: tabla.c[columna_conteo] + conteo,
+        'actualizado_en': datetime.utcnow(),
+    }
+    if fecha is not None and conteo >= 0:
+        valores['ultima_participacion'] = db.case(
+            (db.or_(ultima.is_(None), ultima < fecha), fecha),
+            else_=ultima
+        )
+    resultado = connection.execute(
+        tabla.update().where(tabla.c[columna_id] == valor_id).values(**valores)
+    )
+    if resultado.rowcount == 0:
+        connection.execute(tabla.insert().values(**{
+            columna_id: valor_id,
+            'total_horas': max(horas, 0),
+            columna_conteo: max(conteo, 0),
+            'ultima_participacion': fecha if conteo >= 0 else None,
+            'actualizado_en': datetime.utcnow(),
+        }))
+
+
+def _recalcular_ultima(connection, usuario_id, organizacion_id):
+    """Recalcula la última participación tras eliminar o mover un registro"""
+    from .event import Evento
+    hist = HistorialActividad.__table__
+    connection.execute(
+        ResumenVoluntario.__table__.update().where(
+            ResumenVoluntario.usuario_id == usuario_id
+        ).values(ultima_participacion=db.select(db.func.max(hist.c.fecha_participacion)).where(
+            hist.c.usuario_id == usuario_id
+        ).scalar_subquery())
+    )
+    if organizacion_id is not None:
+        connection.execute(
+            ResumenOrganizacion.__table__.update().where(
+                ResumenOrganizacion.organizacion_id == organizacion_id
+            ).values(ultima_participacion=db.select(db.func.max(hist.c.fecha_participacion)).join(
+                Evento.__table__, Evento.__table__.c.id == hist.c.evento_id
+            ).where(
+                Evento.__table__.c.organizacion_id == organizacion_id
+            ).scalar_subquery())
+        )
 
+
+def _registrar(connection, usuario_id, evento_id, horas, conteo, fecha):
+    organizacion_id = _organizacion_de_evento(connection, evento_id)
+    _aplicar_delta(connection, ResumenVoluntario, 'usuario_id', usuario_id,
+                   'eventos_asistidos', horas or 0, conteo, fecha)
+    if organizacion_id is not None:
+        _aplicar_delta(connection, ResumenOrganizacion, 'organizacion_id', organizacion_id,
+                       'participaciones', horas or 0, conteo, fecha)
+    return organizacion_id
+
+
+@event.listens_for(HistorialActividad, 'after_insert')
+def _historial_insertado(mapper, connection, target):
+    _registrar(connection, target.usuario_id, target.evento_id, target.horas, 1, target.fecha_participacion)
+
+
+@event.listens_for(HistorialActividad, 'after_delete')
+def _historial_eliminado(mapper, connection, target):
+    organizacion_id = _registrar(connection, target.usuario_id, target.evento_id,
+                                 -(target.horas or 0), -1, None)
+    _recalcular_ultima(connection, target.usuario_id, organizacion_id)
+
+
+@event.listens_for(HistorialActividad, 'after_update')
+def _historial_actualizado(mapper, connection, target):
+    estado = inspect(target)
+    campos = ('usuario_id', 'evento_id', 'horas', 'fecha_participacion')
+    if not any(estado.attrs[campo].history.has_changes() for campo in campos):
+        return
+    
+    def anterior(campo):
+        historia = estado.attrs[campo].history
+        return historia.deleted[0] if historia.deleted else getattr(target, campo)
+    
+    # Se descuenta el registro con sus valores anteriores y se suma con los nuevos
+    organizacion_anterior = _registrar(connection, anterior('usuario_id'), anterior('evento_id'),
+                                       -(anterior('horas') or 0), -1, None)
+    _registrar(connection, target.usuario_id, target.evento_id, target.horas, 1, target.fecha_participacion)
+    _recalcular_ultima(connection, anterior('usuario_id'), organizacion_anterior)
+    if anterior('usuario_id') != target.usuario_id or anterior('evento_id') != target.evento_id:
+        _recalcular_ultima(connection, target.usuario_id, _organizacion_de_evento(connection, target.evento_id))
+
+
+def rebuild_summaries():
+    """Reconstruye por completo las tablas de resumen a partir del historial"""
+    from .event import Evento
+    hist = HistorialActividad.__table__
+    eventos = Evento.__table__
+    
+    db.session.execute(ResumenVoluntario.__table__.delete())
+    db.session.execute(ResumenOrganizacion.__table__.delete())
+    
+    ahora = datetime.utcnow()
+    por_usuario = db.session.execute(
+        db.select(
+            hist.c.usuario_id,
+            db.func.coalesce(db.func.sum(hist.c.horas), 0),
+            db.func.count(hist.c.id),
+            db.func.max(hist.c.fecha_participacion)
+        ).group_by(hist.c.usuario_id)
+    ).all()
+    if por_usuario:
+        db.session.execute(ResumenVoluntario.__table__.insert(), [
+            {'usuario_id': u, 'total_horas': h, 'eventos_asistidos': c,
+             'ultima_participacion': f, 'actualizado_en': ahora}
+            for u, h, c, f in por_usuario
+        ])
+    
+    por_organizacion = db.session.execute(
+        db.select(
+            eventos.c.organizacion_id,
+            db.func.coalesce(db.func.sum(hist.c.horas), 0),
+            db.func.count(hist.c.id),
+            db.func.max(hist.c.fecha_participacion)
+        ).join(eventos, eventos.c.id == hist.c.evento_id).group_by(eventos.c.organizacion_id)
+    ).all()
+    if por_organizacion:
+        db.session.execute(ResumenOrganizacion.__table__.insert(), [
+            {'organizacion_id': o, 'total_horas': h, 'participaciones': c,
+             'ultima_participacion': f, 'actualizado_en': ahora}
+            for o, h, c, f in por_organizacion
+        ])
+    
+    db.session.commit()
+    return len(por_usuario), len(por_organizacion)
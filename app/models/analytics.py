@@ -0,0 +1,36 @@
+from .. import db
+
+
+class ResumenEventos(db.Model):
+    """
+    Eventos y solicitudes agregados por mes, localidad y tipo de organización.
+    Cada evento aporta una fila sin área (area_id NULL) y una por cada una de sus áreas:
+    los totales se calculan sobre las primeras y el desglose por área sobre las segundas,
+    así un evento con varias áreas no se cuenta dos veces.
+    Son datos derivados que se recalculan completos: sin claves foráneas, para no impedir
+    eliminar un área o un tipo de organización.
+    """
+    __tablename__ = 'resumen_eventos'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mes = db.Column(db.Date, nullable=False)  # primer día del mes del evento
+    localidad = db.Column(db.String(255))
+    tipo_organizacion_id = db.Column(db.Integer)
+    area_id = db.Column(db.Integer)
+    eventos = db.Column(db.Integer, nullable=False, default=0)
+    solicitudes = db.Column(db.Integer, nullable=False, default=0)
+    aprobadas = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ResumenEventos {self.mes} {self.localidad} {self.area_id}>'
+
+
+class ResumenSolicitudesDia(db.Model):
+    """Solicitudes de participación recibidas por día"""
+    __tablename__ = 'resumen_solicitudes_dia'
+    
+    fecha = db.Column(db.Date, primary_key=True)
+    solicitudes = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ResumenSolicitudesDia {self.fecha}>'
@@ -33,6 +33,9 @@ class Evento(db.Model):
     organizacion_id = db.Column(db.Integer, db.ForeignKey('organizaciones.id'), nullable=False)
     requisitos = db.Column(db.Text)
     estado = db.Column(db.String(50), default='pendiente')  # pendiente, activo, cancelado, finalizado
+    imagen = db.Column(db.String(64))  # nombre con hash del contenido en UPLOAD_FOLDER/eventos
+    capacidad = db.Column(db.Integer)  # NULL = sin límite de voluntarios
+    cupos_ocupados = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relaciones
     solicitudes = db.relationship('SolicitudEvento', backref='evento', lazy='dynamic')
@@ -40,8 +43,19 @@ class Evento(db.Model):
     comentarios = db.relationship('ComentarioCalificacion', backref='evento', lazy='dynamic')
     recursos = db.relationship('GestionRecurso', backref='evento', lazy='dynamic')
     
+    __table_args__ = (
+        db.Index('ix_eventos_estado_fecha', 'estado', 'fecha'),
+    )
+    
     def __repr__(self):
         return f'<Evento {self.nombre}>'
+    
+    @property
+    def cupos_disponibles(self):
+        """Cupos libres del evento (None si no tiene límite)"""
+        if self.capacidad is None:
+            return None
+        return max(self.capacidad - self.cupos_ocupados, 0)
 
 
 # Tabla de asociación para la relación muchos a muchos entre eventos y áreas de intervención
@@ -72,10 +86,15 @@ class SolicitudEvento(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
     evento_id = db.Column(db.Integer, db.ForeignKey('eventos.id'), nullable=False)
-    estado = db.Column(db.String(50), default='pendiente')  # pendiente, aprobado, rechazado
+    estado = db.Column(db.String(50), default='pendiente')  # pendiente, en_espera, aprobado, rechazado, expirado
     solicitado_en = db.Column(db.DateTime, default=datetime.utcnow)
     decidido_en = db.Column(db.DateTime)
     
+    __table_args__ = (
+        db.Index('ix_solicitudes_evento_estado', 'estado', 'evento_id'),
+        db.UniqueConstraint('usuario_id', 'evento_id', name='unico_usuario_evento_solicitud'),
+    )
+    
     def __repr__(self):
         return f'<SolicitudEvento {self.id}>'
 
@@ -106,4 +125,32 @@ class ComentarioCalificacion(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('usuario_id', 'evento_id', name='unico_usuario_evento_comentario'),
-    )
\ No newline at end of file
+        db.Index('ix_comentarios_evento_creado', 'evento_id', 'creado_en'),
+    )
+
+
+class ResumenCalificacion(db.Model):
+    """Agregados de calificaciones por evento, mantenidos al comentar"""
+    __tablename__ = 'resumen_calificaciones'
+    
+    evento_id = db.Column(db.Integer, db.ForeignKey('eventos.id'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    suma = db.Column(db.Integer, nullable=False, default=0)
+    estrellas_1 = db.Column(db.Integer, nullable=False, default=0)
+    estrellas_2 = db.Column(db.Integer, nullable=False, default=0)
+    estrellas_3 = db.Column(db.Integer, nullable=False, default=0)
+    estrellas_4 = db.Column(db.Integer, nullable=False, default=0)
+    estrellas_5 = db.Column(db.Integer, nullable=False, default=0)
+    
+    @property
+    def promedio(self):
+        """Calificación promedio del evento"""
+        return round(self.suma / self.total, 1) if self.total else None
+    
+    @property
+    def histograma(self):
+        """Cantidad de calificaciones por estrella, de 1 a 5"""
+        return [getattr(self, f'estrellas_{i}') for i in range(1, 6)]
+    
+    def __repr__(self):
+        return f'<ResumenCalificacion {self.evento_id}>'
@@ -0,0 +1,56 @@
+from datetime import datetime
+from .. import db
+
+
+class LatidoReplica(db.Model):
+    """Marca de tiempo escrita en la base principal para medir el retraso de la réplica"""
+    __tablename__ = 'latido_replica'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    marca = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<LatidoReplica {self.marca}>'
+
+
+class MetadatoSistema(db.Model):
+    """Valores clave-valor internos de la aplicación (p. ej. la versión de los datos de referencia)"""
+    __tablename__ = 'metadatos_sistema'
+    
+    clave = db.Column(db.String(100), primary_key=True)
+    valor = db.Column(db.String(255), nullable=False)
+    actualizado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<MetadatoSistema {self.clave}={self.valor}>'
+
+
+class CorreoSaliente(db.Model):
+    """
+    Bandeja de salida de correos. Los mensajes se guardan en la misma transacción
+    que los origina y un proceso en segundo plano los envía (ver utils/mailer.py).
+    """
+    __tablename__ = 'correos_salientes'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    destinatario = db.Column(db.String(255), nullable=False)
+    dominio = db.Column(db.String(255), nullable=False)
+    asunto = db.Column(db.String(255), nullable=False)
+    cuerpo = db.Column(db.Text, nullable=False)
+    responder_a = db.Column(db.String(255))
+    estado = db.Column(db.String(20), nullable=False, default='pendiente')  # pendiente, enviando, enviado, fallido
+    intentos = db.Column(db.Integer, nullable=False, default=0)
+    proximo_intento = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    lote = db.Column(db.String(32))  # marca del envío que reclamó el mensaje
+    bloqueado_hasta = db.Column(db.DateTime)
+    ultimo_error = db.Column(db.String(500))
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    enviado_en = db.Column(db.DateTime)
+    
+    __table_args__ = (
+        db.Index('ix_correos_salientes_estado_proximo', 'estado', 'proximo_intento'),
+        db.Index('ix_correos_salientes_lote', 'lote'),
+    )
+    
+    def __repr__(self):
+        return f'<CorreoSaliente {self.id} {self.destinatario} {self.estado}>'
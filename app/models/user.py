@@ -35,6 +35,10 @@ class User(db.Model, UserMixin):
     # Campos adicionales para seguridad
     intentos_fallidos = db.Column(db.Integer, default=0)
     ultimo_intento_fallido = db.Column(db.DateTime)
+    # Se incrementa para revocar todos los tokens JWT emitidos al usuario
+    version_token = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Se incrementa al cambiar sus organizaciones, para invalidar las membresías cacheadas en su sesión
+    version_membresias = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relaciones
     actividades = db.relationship('RegistroActividadUsuario', backref='usuario', lazy='dynamic')
@@ -98,10 +102,27 @@ class RegistroActividadUsuario(db.Model):
     detalles = db.Column(db.String(255))
     creado_en = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_registro_actividad_creado', 'creado_en'),
+        db.Index('ix_registro_actividad_usuario_creado', 'usuario_id', 'creado_en'),
+    )
+    
     def __repr__(self):
         return f'<RegistroActividadUsuario {self.id}>'
 
 
+class ResumenActividadDiaria(db.Model):
+    """Cantidad de registros de actividad por día y acción, conservada al depurar los registros antiguos"""
+    __tablename__ = 'resumen_actividad_diaria'
+    
+    fecha = db.Column(db.Date, primary_key=True)
+    accion = db.Column(db.String(255), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<ResumenActividadDiaria {self.fecha} {self.accion}>'
+
+
 class HistorialCambiosUsuario(db.Model):
     """Modelo para el historial de cambios de los usuarios"""
     __tablename__ = 'historial_cambios_usuarios'
@@ -116,11 +137,34 @@ class HistorialCambiosUsuario(db.Model):
     usuario = db.relationship('User', foreign_keys=[usuario_id], backref='cambios_recibidos')
     administrador = db.relationship('User', foreign_keys=[administrador_id], backref='cambios_realizados')
     
+    __table_args__ = (
+        db.Index('ix_historial_cambios_fecha', 'fecha'),
+        db.Index('ix_historial_cambios_usuario_fecha', 'usuario_id', 'fecha'),
+    )
+    
     def __repr__(self):
         return f'<HistorialCambiosUsuario {self.id}>'
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Carga un usuario desde la base de datos"""
-    return User.query.get(int(user_id))
+    """Carga un usuario desde la base de datos junto con su rol"""
+    return User.query.options(db.joinedload(User.role)).get(int(user_id))
+
+
+class RevocacionToken(db.Model):
+    """
+    Revocaciones de tokens JWT: un jti concreto (cierre de sesión)
+    o todos los tokens de un usuario con versión anterior a version
+    """
+    __tablename__ = 'revocaciones_token'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False)
+    jti = db.Column(db.String(36), index=True)
+    version = db.Column(db.Integer)
+    creado_en = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expira_en = db.Column(db.DateTime, nullable=False, index=True)  # después ya no hay token que revocar
+    
+    def __repr__(self):
+        return f'<RevocacionToken {self.jti or self.version}>'
@@ -1,31 +1,11 @@
-from app import create_app, db
-from app.models.organization import TipoOrganizacion
+from app.utils.init_data import seed_reference_data
+from app.utils.startup import script_app_context
 
 def init_tipos_organizacion():
-    app = create_app()
-    with app.app_context():
-        # Verificar si ya existen tipos
-        if TipoOrganizacion.query.count() == 0:
-            tipos = [
-                ('ONG', 'Organización No Gubernamental'),
-                ('Colectivo', 'Grupo organizado de personas con objetivos comunes'),
-                ('Junta de Acción Comunal', 'Organización comunitaria local'),
-                ('Fundación', 'Entidad sin ánimo de lucro'),
-                ('Asociación', 'Grupo de personas unidas para un fin común')
-            ]
-            
-            for nombre, descripcion in tipos:
-                tipo = TipoOrganizacion(nombre=nombre, descripcion=descripcion)
-                db.session.add(tipo)
-            
-            try:
-                db.session.commit()
-                print("Tipos de organización creados exitosamente")
-            except Exception as e:
-                db.session.rollback()
-                print(f"Error al crear tipos de organización: {str(e)}")
-        else:
-            print("Los tipos de organización ya existen")
+    """Los tipos de organización forman parte de los datos de referencia (ver `flask seed`)"""
+    with script_app_context():
+        seed_reference_data(force=True)
+        print("Tipos de organización inicializados exitosamente")
 
 if __name__ == '__main__':
-    init_tipos_organizacion() 
\ No newline at end of file
+    init_tipos_organizacion() 
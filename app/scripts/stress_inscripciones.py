@@ -0,0 +1,172 @@
+"""
+Prueba de carga de la asignación de cupos: cientos de inscripciones y cancelaciones simultáneas
+sobre un evento con capacidad limitada. Comprueba que nunca se asignan más cupos que la capacidad,
+que el contador coincide con las solicitudes y que la lista de espera avanza por orden de llegada.
+
+Crea sus propios datos (organización, evento y voluntarios de prueba) y los elimina al terminar.
+Usa la base de datos configurada: con SQLite en memoria los hilos no comparten datos,
+así que conviene ejecutarlo contra un archivo o el servidor de desarrollo.
+
+    python -m app.scripts.stress_inscripciones --capacidad 20 --voluntarios 300 --hilos 50
+"""
+import argparse
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy.exc import DBAPIError
+from app import db
+from app.models.event import Evento, SolicitudEvento
+from app.models.organization import Organizacion, TipoOrganizacion
+from app.models.user import User, Role
+from app.utils.capacity import ESTADOS_CON_CUPO, CapacityError, enroll, cancel_request
+from app.utils.startup import script_app_context
+
+REINTENTOS = 20
+
+
+def _con_reintentos(app, operacion):
+    """Ejecuta la operación en su propio contexto (y sesión), reintentando bloqueos e interbloqueos"""
+    with app.app_context():
+        try:
+            for intento in range(REINTENTOS):
+                try:
+                    return operacion()
+                except DBAPIError:
+                    db.session.rollback()
+                    time.sleep(0.01 * (intento + 1))
+            raise RuntimeError('Demasiados reintentos por bloqueos de la base de datos')
+        finally:
+            db.session.remove()
+
+
+def _crear_datos(capacidad, voluntarios):
+    marca = uuid.uuid4().hex[:8]
+    rol = Role.query.filter_by(nombre='voluntario').first()
+    tipo = TipoOrganizacion.query.first()
+    if rol is None or tipo is None:
+        raise SystemExit('Faltan los datos de referencia: ejecuta antes `flask seed`')
+
+    organizacion = Organizacion(nombre=f'Prueba de carga {marca}', tipo_organizacion_id=tipo.id)
+    db.session.add(organizacion)
+    db.session.flush()
+    evento = Evento(nombre=f'Prueba de carga {marca}', fecha=datetime.utcnow().date() + timedelta(days=7),
+                    organizacion_id=organizacion.id, estado='activo', capacidad=capacidad)
+    db.session.add(evento)
+    usuarios = []
+    for i in range(voluntarios):
+        usuario = User(nombre='Voluntario', apellido=str(i), correo_electronico=f'carga-{marca}-{i}@example.invalid',
+                       rol_id=rol.id, estado='activo')
+        # Hash inválido: estas cuentas no pueden iniciar sesión
+        usuario._contrasena_hash = '!'
+        usuarios.append(usuario)
+    db.session.add_all(usuarios)
+    db.session.commit()
+    return organizacion.id, evento.id, [usuario.id for usuario in usuarios]
+
+
+def _eliminar_datos(organizacion_id, evento_id, usuario_ids):
+    SolicitudEvento.query.filter_by(evento_id=evento_id).delete(synchronize_session=False)
+    Evento.query.filter_by(id=evento_id).delete(synchronize_session=False)
+    for inicio in range(0, len(usuario_ids), 500):
+        User.query.filter(User.id.in_(usuario_ids[inicio:inicio + 500])).delete(synchronize_session=False)
+    Organizacion.query.filter_by(id=organizacion_id).delete(synchronize_session=False)
+    db.session.commit()
+
+
+def _comprobar(evento_id, esperados, fase):
+    """Devuelve la lista de errores encontrados en el estado de los cupos"""
+    db.session.expire_all()
+    evento = Evento.query.get(evento_id)
+    conteo = dict(db.session.query(SolicitudEvento.estado, db.func.count()).filter(
+        SolicitudEvento.evento_id == evento_id
+    ).group_by(SolicitudEvento.estado).all())
+    con_cupo = sum(conteo.get(estado, 0) for estado in ESTADOS_CON_CUPO)
+    duplicadas = db.session.query(SolicitudEvento.usuario_id).filter(
+        SolicitudEvento.evento_id == evento_id
+    ).group_by(SolicitudEvento.usuario_id).having(db.func.count() > 1).count()
+
+    print(f'{fase}: {con_cupo} con cupo, {conteo.get("en_espera", 0)} en espera, '
+          f'contador {evento.cupos_ocupados}/{evento.capacidad}')
+    errores = []
+    if con_cupo > evento.capacidad:
+        errores.append(f'{fase}: {con_cupo} solicitudes con cupo superan la capacidad {evento.capacidad}')
+    if con_cupo != evento.cupos_ocupados:
+        errores.append(f'{fase}: el contador ({evento.cupos_ocupados}) no coincide con las solicitudes ({con_cupo})')
+    if con_cupo != esperados:
+        errores.append(f'{fase}: se esperaban {esperados} cupos ocupados y hay {con_cupo}')
+    if duplicadas:
+        errores.append(f'{fase}: {duplicadas} voluntarios con solicitudes duplicadas')
+    return errores
+
+
+def stress_inscripciones(capacidad=20, voluntarios=300, hilos=50, cancelaciones=None, config_name=None):
+    cancelaciones = capacidad // 2 if cancelaciones is None else cancelaciones
+    with script_app_context(config_name) as app:
+        organizacion_id, evento_id, usuario_ids = _crear_datos(capacidad, voluntarios)
+        try:
+            # Cada voluntario envía su solicitud dos veces (doble clic): la segunda debe rechazarse
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(hilos) as executor:
+                resultados = list(executor.map(
+                    lambda usuario_id: _con_reintentos(app, lambda: enroll(usuario_id, evento_id) is not None),
+                    usuario_ids + usuario_ids
+                ))
+            print(f'{len(resultados)} inscripciones en {time.perf_counter() - inicio:.2f} s, '
+                  f'{resultados.count(False)} duplicadas rechazadas')
+            errores = _comprobar(evento_id, min(capacidad, voluntarios), 'Inscripciones')
+            if resultados.count(True) != voluntarios:
+                errores.append(f'Se crearon {resultados.count(True)} solicitudes para {voluntarios} voluntarios')
+
+            # Cancelaciones simultáneas de voluntarios con cupo: cada una promueve al siguiente en espera
+            en_espera = [fila[0] for fila in db.session.query(SolicitudEvento.id).filter(
+                SolicitudEvento.evento_id == evento_id, SolicitudEvento.estado == 'en_espera'
+            ).order_by(SolicitudEvento.solicitado_en, SolicitudEvento.id).all()]
+            a_cancelar = [fila[0] for fila in db.session.query(SolicitudEvento.id).filter(
+                SolicitudEvento.evento_id == evento_id, SolicitudEvento.estado.in_(ESTADOS_CON_CUPO)
+            ).limit(cancelaciones).all()]
+            db.session.commit()
+
+            def cancelar(solicitud_id):
+                solicitud = SolicitudEvento.query.get(solicitud_id)
+                try:
+                    return len(cancel_request(solicitud))
+                except CapacityError:
+                    return 0
+
+            with ThreadPoolExecutor(hilos) as executor:
+                promovidas = sum(executor.map(lambda solicitud_id: _con_reintentos(app, lambda: cancelar(solicitud_id)),
+                                              a_cancelar))
+            print(f'{len(a_cancelar)} cancelaciones, {promovidas} solicitudes promovidas desde la lista de espera')
+            restantes = voluntarios - len(a_cancelar)
+            errores += _comprobar(evento_id, min(capacidad, restantes), 'Cancelaciones')
+
+            # Las promovidas deben ser las primeras de la lista de espera
+            esperadas = set(en_espera[:promovidas])
+            promovidas_ids = {fila[0] for fila in db.session.query(SolicitudEvento.id).filter(
+                SolicitudEvento.id.in_(en_espera), SolicitudEvento.estado.in_(ESTADOS_CON_CUPO)
+            ).all()} if en_espera else set()
+            if promovidas_ids != esperadas:
+                errores.append('La lista de espera no se promovió por orden de llegada')
+        finally:
+            db.session.rollback()
+            _eliminar_datos(organizacion_id, evento_id, usuario_ids)
+
+    for error in errores:
+        print(f'ERROR: {error}')
+    print('Sin sobreasignación de cupos' if not errores else f'{len(errores)} errores')
+    return not errores
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Prueba de carga de inscripciones con capacidad limitada')
+    parser.add_argument('--capacidad', type=int, default=20)
+    parser.add_argument('--voluntarios', type=int, default=300)
+    parser.add_argument('--hilos', type=int, default=50)
+    parser.add_argument('--cancelaciones', type=int)
+    parser.add_argument('--config')
+    argumentos = parser.parse_args()
+    correcto = stress_inscripciones(argumentos.capacidad, argumentos.voluntarios, argumentos.hilos,
+                                    argumentos.cancelaciones, argumentos.config)
+    sys.exit(0 if correcto else 1)
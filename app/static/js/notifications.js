@@ -0,0 +1,70 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const panel = document.querySelector('[data-notifications-url]');
+    if (!panel || !window.EventSource) {
+        return;
+    }
+
+    const mensajes = {
+        pendiente: 'Se liberó un cupo en "{evento}": tu solicitud salió de la lista de espera.',
+        aprobado: 'Tu solicitud para "{evento}" fue aprobada.',
+        rechazado: 'Tu solicitud para "{evento}" fue rechazada.'
+    };
+
+    // Muestra un aviso con el mismo formato que los mensajes flash del servidor
+    function showMessage(texto, categoria) {
+        let contenedor = document.querySelector('.flash-messages');
+        if (!contenedor) {
+            contenedor = document.createElement('section');
+            contenedor.className = 'flash-messages';
+            document.querySelector('main').prepend(contenedor);
+        }
+        const aviso = document.createElement('article');
+        aviso.className = 'flash-message ' + categoria;
+        const span = document.createElement('span');
+        span.textContent = texto;
+        const cerrar = document.createElement('button');
+        cerrar.className = 'close-btn';
+        cerrar.innerHTML = '&times;';
+        cerrar.addEventListener('click', () => aviso.remove());
+        aviso.append(span, cerrar);
+        contenedor.append(aviso);
+    }
+
+    // Añade el evento aprobado a la lista de próximos eventos
+    function addUpcomingEvent(datos) {
+        const lista = document.getElementById('eventos-proximos');
+        if (!lista) {
+            return;
+        }
+        const item = document.createElement('li');
+        const nombre = document.createElement('strong');
+        nombre.textContent = datos.evento;
+        const fecha = document.createElement('span');
+        fecha.textContent = datos.fecha;
+        const enlace = document.createElement('a');
+        enlace.href = datos.url;
+        enlace.className = 'btn btn-sm';
+        enlace.textContent = 'Ver';
+        item.append(nombre, fecha, enlace);
+        lista.append(item);
+    }
+
+    const fuente = new EventSource(panel.dataset.notificationsUrl);
+
+    fuente.addEventListener('solicitud', function(evento) {
+        const datos = JSON.parse(evento.data);
+        const item = document.querySelector('[data-solicitud-id="' + datos.solicitud_id + '"]');
+        if (item) {
+            const badge = item.querySelector('.status-badge');
+            badge.className = 'status-badge ' + datos.estado;
+            badge.textContent = datos.estado;
+        }
+        if (datos.estado === 'aprobado') {
+            addUpcomingEvent(datos);
+        }
+        const plantilla = mensajes[datos.estado];
+        if (plantilla) {
+            showMessage(plantilla.replace('{evento}', datos.evento), datos.estado === 'aprobado' ? 'success' : 'info');
+        }
+    });
+});
@@ -0,0 +1,237 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import aliased
+from .. import db
+from ..models.user import User, RegistroActividadUsuario, HistorialCambiosUsuario
+from .data_structures import RingBuffer
+
+ActivityEntry = namedtuple('ActivityEntry', 'timestamp fuente id type message')
+
+# Tipo visual (clase CSS del registro) según la acción registrada
+TIPOS_ACCION = {
+    'registro': 'success',
+    'login': 'info',
+    'logout': 'info',
+    'cambio_contrasena': 'warning',
+    'solicitud_reset_contrasena': 'warning',
+    'reset_contrasena': 'warning',
+}
+
+
+def entry_key(entrada):
+    """Orden total de la actividad: instante, fuente e id (el id desempata dentro de una fuente)"""
+    return (entrada.timestamp, entrada.fuente, entrada.id)
+
+
+def _keyset(columna_fecha, columna_id, fuente, cursor, posteriores):
+    """
+    Condición de búsqueda por clave (keyset) para las filas anteriores (o posteriores)
+    al cursor (instante, fuente, id), de modo que la consulta use el índice sobre la fecha.
+    """
+    fecha, fuente_cursor, id_cursor = cursor
+    if fuente == fuente_cursor:
+        if posteriores:
+            return db.or_(columna_fecha > fecha, db.and_(columna_fecha == fecha, columna_id > id_cursor))
+        return db.or_(columna_fecha < fecha, db.and_(columna_fecha == fecha, columna_id < id_cursor))
+    # En el mismo instante, el orden entre fuentes lo decide su nombre
+    incluye_mismo_instante = fuente > fuente_cursor if posteriores else fuente < fuente_cursor
+    if posteriores:
+        return columna_fecha >= fecha if incluye_mismo_instante else columna_fecha > fecha
+    return columna_fecha <= fecha if incluye_mismo_instante else columna_fecha < fecha
+
+
+class ActivitySource:
+    """Tabla de auditoría que aporta entradas a la actividad, leídas de la más nueva a la más antigua"""
+    def __init__(self, nombre, fecha, id, usuario):
+        self.nombre = nombre
+        self.fecha = fecha
+        self.id = id
+        self.usuario = usuario
+
+    def select(self):
+        raise NotImplementedError
+
+    def entry(self, fila):
+        raise NotImplementedError
+
+    def fetch(self, limite, antes=None, despues=None, usuario_id=None):
+        """Las limite entradas más recientes anteriores a antes (o posteriores a despues), opcionalmente de un usuario"""
+        consulta = self.select().filter(self.fecha.isnot(None))
+        if usuario_id is not None:
+            consulta = consulta.filter(self.usuario == usuario_id)
+        if antes is not None:
+            consulta = consulta.filter(_keyset(self.fecha, self.id, self.nombre, antes, posteriores=False))
+        if despues is not None:
+            consulta = consulta.filter(_keyset(self.fecha, self.id, self.nombre, despues, posteriores=True))
+        filas = consulta.order_by(self.fecha.desc(), self.id.desc()).limit(limite).all()
+        return [self.entry(fila) for fila in filas]
+
+
+class UserActivitySource(ActivitySource):
+    def __init__(self):
+        super().__init__('actividad', RegistroActividadUsuario.creado_en, RegistroActividadUsuario.id,
+                         RegistroActividadUsuario.usuario_id)
+
+    def select(self):
+        return db.session.query(
+            RegistroActividadUsuario.id, RegistroActividadUsuario.creado_en,
+            RegistroActividadUsuario.accion, RegistroActividadUsuario.detalles,
+            User.nombre, User.apellido
+        ).outerjoin(User, User.id == RegistroActividadUsuario.usuario_id)
+
+    def entry(self, fila):
+        id, creado_en, accion, detalles, nombre, apellido = fila
+        texto = detalles or accion
+        if nombre:
+            texto = f'{nombre} {apellido}: {texto}'
+        return ActivityEntry(creado_en, self.nombre, id, TIPOS_ACCION.get(accion, 'info'), texto)
+
+
+class UserChangesSource(ActivitySource):
+    def __init__(self):
+        super().__init__('cambios', HistorialCambiosUsuario.fecha, HistorialCambiosUsuario.id,
+                         HistorialCambiosUsuario.usuario_id)
+
+    def select(self):
+        usuario = aliased(User)
+        administrador = aliased(User)
+        return db.session.query(
+            HistorialCambiosUsuario.id, HistorialCambiosUsuario.fecha, HistorialCambiosUsuario.cambio,
+            usuario.nombre, usuario.apellido, administrador.nombre, administrador.apellido
+        ).join(
+            usuario, usuario.id == HistorialCambiosUsuario.usuario_id
+        ).join(
+            administrador, administrador.id == HistorialCambiosUsuario.administrador_id
+        )
+
+    def entry(self, fila):
+        id, fecha, cambio, nombre, apellido, admin_nombre, admin_apellido = fila
+        texto = f'{admin_nombre} {admin_apellido} modificó a {nombre} {apellido}: {cambio}'
+        return ActivityEntry(fecha, self.nombre, id, 'success', texto)
+
+
+DEFAULT_SOURCES = (UserActivitySource(), UserChangesSource())
+
+
+def merge_activity(fuentes, limite, antes=None, despues=None, usuario_id=None):
+    """
+    Las limite entradas más recientes de todas las fuentes.
+    Cada fuente aporta como mucho limite filas ya ordenadas por su índice de fecha
+    y se combinan con una mezcla de k vías, sin UNION ni ordenar el conjunto completo.
+    """
+    flujos = [fuente.fetch(limite, antes, despues, usuario_id) for fuente in fuentes]
+    return list(itertools.islice(heapq.merge(*flujos, key=entry_key, reverse=True), limite))
+
+
+def encode_cursor(entrada):
+    return f'{entrada.timestamp.isoformat()}~{entrada.fuente}~{entrada.id}'
+
+
+def decode_cursor(texto):
+    """Cursor de paginación recibido en la URL (None si no es válido)"""
+    try:
+        fecha, fuente, id = texto.split('~')
+        return datetime.fromisoformat(fecha), fuente, int(id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def activity_page(limite, cursor=None, fuentes=DEFAULT_SOURCES):
+    """Una página de actividad anterior al cursor y el cursor de la página siguiente (o None)"""
+    entradas = merge_activity(fuentes, limite + 1, antes=cursor)
+    siguiente = encode_cursor(entradas[limite - 1]) if len(entradas) > limite else None
+    return entradas[:limite], siguiente
+
+
+def user_activity(usuario_id, limite=20, fuentes=DEFAULT_SOURCES):
+    """Últimas entradas de actividad de un usuario (usa los índices por usuario y fecha)"""
+    return merge_activity(fuentes, limite, usuario_id=usuario_id)
+
+
+class RecentActivity:
+    """
+    Últimas entradas de actividad en un búfer circular en memoria.
+    Tras una confirmación que registra actividad solo se consultan las entradas posteriores
+    a la más reciente del búfer; cada refresh segundos se recarga completo, lo que incorpora
+    también la actividad registrada por otros procesos.
+    """
+    def __init__(self, fuentes=DEFAULT_SOURCES, size=50, refresh=60):
+        self.fuentes = fuentes
+        self.size = size
+        self.refresh = refresh
+        self.buffer = RingBuffer(size)
+        self._lock = threading.Lock()
+        self._cargado = None
+        self._pendiente = False
+
+    def mark_dirty(self):
+        self._pendiente = True
+
+    def _reload(self):
+        self.buffer.clear()
+        for entrada in reversed(merge_activity(self.fuentes, self.size)):
+            self.buffer.append(entrada)
+        self._cargado = time.monotonic()
+
+    def _sync(self):
+        ultima = self.buffer.peek()
+        if ultima is None:
+            self._reload()
+            return
+        for entrada in reversed(merge_activity(self.fuentes, self.size, despues=entry_key(ultima))):
+            self.buffer.append(entrada)
+
+    def get(self, n=10):
+        """Las n entradas más recientes, de la más nueva a la más antigua"""
+        if n > self.size:
+            return merge_activity(self.fuentes, n)
+        with self._lock:
+            if self._cargado is None or time.monotonic() - self._cargado > self.refresh:
+                self._pendiente = False
+                self._reload()
+            elif self._pendiente:
+                self._pendiente = False
+                self._sync()
+            return self.buffer.newest(n)
+
+    def clear(self):
+        with self._lock:
+            self.buffer.clear()
+            self._cargado = None
+
+
+def _detect_activity(db_session, flush_context):
+    # Tras el flush, session.new todavía contiene los objetos insertados
+    if any(isinstance(objeto, (RegistroActividadUsuario, HistorialCambiosUsuario)) for objeto in db_session.new):
+        db_session.info['_actividad_nueva'] = True
+
+
+def _mark_feed(db_session):
+    if not db_session.info.pop('_actividad_nueva', False):
+        return
+    feed = current_app.extensions.get('activity_feed')
+    if feed is not None:
+        feed.mark_dirty()
+
+
+def init_activity_feed(app):
+    """Crea el búfer de actividad reciente y lo marca para actualizar al registrar actividad"""
+    feed = RecentActivity(
+        size=app.config.get('ACTIVITY_FEED_SIZE', 50),
+        refresh=app.config.get('ACTIVITY_FEED_REFRESH', 60)
+    )
+    app.extensions['activity_feed'] = feed
+    if not event.contains(db.session, 'after_flush', _detect_activity):
+        event.listen(db.session, 'after_flush', _detect_activity)
+        event.listen(db.session, 'after_commit', _mark_feed)
+    return feed
+
+
+def get_recent_activity(n=10):
+    return current_app.extensions['activity_feed'].get(n)
@@ -0,0 +1,231 @@
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from .. import db
+from ..models.analytics import ResumenEventos, ResumenSolicitudesDia
+from ..models.event import Evento, AreaIntervencion, SolicitudEvento, intervenciones_evento
+from ..models.organization import Organizacion, TipoOrganizacion
+from ..models.system import MetadatoSistema
+from .preload import count_solicitudes
+
+# Dimensiones por las que se puede agrupar y filtrar, en el orden del desglose
+DIMENSIONES = ('mes', 'area', 'localidad', 'tipo_organizacion')
+MEDIDAS = ('eventos', 'solicitudes', 'aprobadas')
+
+ANALYTICS_VERSION_KEY = 'analitica_actualizada'
+
+_Fila = namedtuple('_Fila', DIMENSIONES + MEDIDAS)
+
+
+def _mes(fecha):
+    return fecha.strftime('%Y-%m')
+
+
+def rebuild_analytics(batch_size=1000):
+    """
+    Recalcula los resúmenes analíticos completos (lote nocturno).
+    Recorre los eventos por lotes de id, con sus solicitudes y áreas en una consulta por lote,
+    y reemplaza los resúmenes en una sola transacción: las lecturas ven los anteriores hasta confirmar.
+    """
+    cubo = defaultdict(lambda: [0, 0, 0])
+    ultimo_id = 0
+    while True:
+        eventos = db.session.query(
+            Evento.id, Evento.fecha, Evento.localidad, Organizacion.tipo_organizacion_id
+        ).join(
+            Organizacion, Organizacion.id == Evento.organizacion_id
+        ).filter(Evento.id > ultimo_id).order_by(Evento.id).limit(batch_size).all()
+        if not eventos:
+            break
+        ids = [evento[0] for evento in eventos]
+        solicitudes = count_solicitudes(ids)
+        areas = defaultdict(list)
+        for evento_id, area_id in db.session.query(
+            intervenciones_evento.c.evento_id, intervenciones_evento.c.area_intervencion_id
+        ).filter(intervenciones_evento.c.evento_id.in_(ids)):
+            areas[evento_id].append(area_id)
+
+        for evento_id, fecha, localidad, tipo_id in eventos:
+            mes = fecha.replace(day=1)
+            localidad = (localidad or '').strip() or None
+            conteo = solicitudes[evento_id]
+            # Una fila sin área para los totales y una por área para su desglose
+            for area_id in [None] + areas[evento_id]:
+                fila = cubo[(mes, localidad, tipo_id, area_id)]
+                fila[0] += 1
+                fila[1] += conteo['total']
+                fila[2] += conteo['aprobadas']
+        ultimo_id = ids[-1]
+        if len(eventos) < batch_size:
+            break
+
+    por_dia = Counter(
+        solicitado_en.date() for (solicitado_en,) in db.session.query(SolicitudEvento.solicitado_en).filter(
+            SolicitudEvento.solicitado_en.isnot(None)
+        ).yield_per(5000)
+    )
+
+    db.session.execute(ResumenEventos.__table__.delete())
+    db.session.execute(ResumenSolicitudesDia.__table__.delete())
+    if cubo:
+        db.session.execute(ResumenEventos.__table__.insert(), [
+            {'mes': mes, 'localidad': localidad, 'tipo_organizacion_id': tipo_id, 'area_id': area_id,
+             'eventos': eventos, 'solicitudes': solicitudes, 'aprobadas': aprobadas}
+            for (mes, localidad, tipo_id, area_id), (eventos, solicitudes, aprobadas) in cubo.items()
+        ])
+    if por_dia:
+        db.session.execute(ResumenSolicitudesDia.__table__.insert(), [
+            {'fecha': fecha, 'solicitudes': total} for fecha, total in por_dia.items()
+        ])
+    db.session.merge(MetadatoSistema(clave=ANALYTICS_VERSION_KEY, valor=datetime.utcnow().isoformat()))
+    db.session.commit()
+
+    cache = current_app.extensions.get('analytics')
+    if cache is not None:
+        cache.clear()
+    return {'filas': len(cubo), 'dias': len(por_dia)}
+
+
+def analytics_updated_at():
+    """Momento del último recálculo de los resúmenes (None si nunca se calcularon)"""
+    metadato = db.session.get(MetadatoSistema, ANALYTICS_VERSION_KEY)
+    return datetime.fromisoformat(metadato.valor) if metadato else None
+
+
+def refresh_analytics(batch_size=1000):
+    """Transición del ciclo de vida: recalcula si pasaron ANALYTICS_REBUILD_INTERVAL segundos"""
+    intervalo = current_app.config.get('ANALYTICS_REBUILD_INTERVAL', 86400)
+    actualizado = analytics_updated_at()
+    if actualizado is not None and datetime.utcnow() - actualizado < timedelta(seconds=intervalo):
+        return 0
+    return rebuild_analytics(batch_size)['filas']
+
+
+def parse_filters(args):
+    """Filtros de desglose recibidos en la URL; se ignoran los valores no válidos"""
+    filtros = {}
+    for dimension in DIMENSIONES:
+        valor = args.get(dimension)
+        if valor is None or valor == '':
+            continue
+        if dimension in ('area', 'tipo_organizacion'):
+            try:
+                valor = int(valor)
+            except ValueError:
+                continue
+        filtros[dimension] = valor
+    return filtros
+
+
+class AnalyticsCube:
+    """
+    Resúmenes analíticos en memoria: son pocas filas (meses × localidades × tipos × áreas),
+    así cada corte se calcula agrupando en Python sin consultar la base de datos.
+    Se recargan cada timeout segundos o tras un recálculo en este proceso.
+    """
+    def __init__(self, timeout=300):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._datos = None
+        self._cargado = 0
+
+    def _load(self):
+        filas = [
+            _Fila(_mes(mes), area_id, localidad or '', tipo_id, eventos, solicitudes, aprobadas)
+            for mes, localidad, tipo_id, area_id, eventos, solicitudes, aprobadas in db.session.query(
+                ResumenEventos.mes, ResumenEventos.localidad, ResumenEventos.tipo_organizacion_id,
+                ResumenEventos.area_id, ResumenEventos.eventos, ResumenEventos.solicitudes,
+                ResumenEventos.aprobadas
+            )
+        ]
+        return {
+            # Filas sin área (totales) y filas por área (desglose), separadas una sola vez
+            'totales': [fila for fila in filas if fila.area is None],
+            'areas': [fila for fila in filas if fila.area is not None],
+            'dias': db.session.query(ResumenSolicitudesDia.fecha, ResumenSolicitudesDia.solicitudes).order_by(
+                ResumenSolicitudesDia.fecha).all(),
+            'etiquetas': {
+                'area': dict(db.session.query(AreaIntervencion.id, AreaIntervencion.nombre).all()),
+                'tipo_organizacion': dict(db.session.query(TipoOrganizacion.id, TipoOrganizacion.nombre).all()),
+            },
+            'actualizado': analytics_updated_at(),
+        }
+
+    def data(self):
+        ahora = time.monotonic()
+        with self._lock:
+            if self._datos is None or ahora - self._cargado > self.timeout:
+                self._datos = self._load()
+                self._cargado = ahora
+            return self._datos
+
+    def clear(self):
+        with self._lock:
+            self._datos = None
+
+    def _rows(self, dimension, filtros):
+        datos = self.data()
+        filas = datos['areas'] if dimension == 'area' or 'area' in filtros else datos['totales']
+        if filtros:
+            filas = [fila for fila in filas
+                     if all(getattr(fila, campo) == valor for campo, valor in filtros.items())]
+        return filas
+
+    def label(self, dimension, clave):
+        if clave in (None, ''):
+            return 'Sin especificar'
+        return self.data()['etiquetas'].get(dimension, {}).get(clave, clave)
+
+    def slice(self, dimension, filtros=None):
+        """Medidas agrupadas por dimension dentro de los filtros (un nivel del desglose)"""
+        if dimension not in DIMENSIONES:
+            raise ValueError(f'Dimensión desconocida: {dimension}')
+        filtros = filtros or {}
+        grupos = defaultdict(lambda: [0, 0, 0])
+        for fila in self._rows(dimension, filtros):
+            grupo = grupos[getattr(fila, dimension)]
+            grupo[0] += fila.eventos
+            grupo[1] += fila.solicitudes
+            grupo[2] += fila.aprobadas
+        resultado = [
+            {'clave': clave, 'etiqueta': self.label(dimension, clave),
+             **dict(zip(MEDIDAS, medidas))}
+            for clave, medidas in grupos.items()
+        ]
+        if dimension == 'mes':
+            resultado.sort(key=lambda fila: fila['clave'])
+        else:
+            resultado.sort(key=lambda fila: (-fila['eventos'], str(fila['etiqueta'])))
+        return resultado
+
+    def totals(self, filtros=None):
+        filtros = filtros or {}
+        totales = dict.fromkeys(MEDIDAS, 0)
+        for fila in self._rows(None, filtros):
+            for medida in MEDIDAS:
+                totales[medida] += getattr(fila, medida)
+        return totales
+
+    def signups_per_day(self, dias=30):
+        """Solicitudes recibidas en cada uno de los últimos dias días (0 en los días sin solicitudes)"""
+        hoy = datetime.utcnow().date()
+        conteos = dict(self.data()['dias'])
+        return [(fecha, conteos.get(fecha, 0))
+                for fecha in (hoy - timedelta(days=i) for i in range(dias - 1, -1, -1))]
+
+    @property
+    def updated_at(self):
+        return self.data()['actualizado']
+
+
+def init_analytics(app):
+    """Crea la caché de resúmenes analíticos de la aplicación"""
+    cubo = AnalyticsCube(app.config.get('ANALYTICS_CACHE_TIMEOUT', 300))
+    app.extensions['analytics'] = cubo
+    return cubo
+
+
+def get_analytics():
+    return current_app.extensions['analytics']
@@ -0,0 +1,191 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from flask import current_app, request, send_file, url_for, abort
+from werkzeug.security import safe_join
+
+# Paquetes de recursos: nombre lógico -> archivos de app/static que se concatenan en orden
+BUNDLES = {
+    'css/base.css': ['css/styles.css', 'css/messages.css', 'css/admin.css'],
+    'css/admin.css': ['css/admin.css'],
+    'css/detalle_proyecto.css': ['css/detalle_proyecto.css'],
+    'js/notifications.js': ['js/notifications.js'],
+}
+
+DIST_FOLDER = 'dist'
+MANIFEST_NAME = 'manifest.json'
+
+# Variantes precomprimidas por orden de preferencia
+_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Cadenas entre comillas y comentarios de CSS; lo que aparezca primero gana
+_CSS_LITERAL = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/', re.S)
+
+
+def minify_css(source):
+    """
+    Minificación conservadora de CSS: comentarios, espacios y el último punto y coma de cada bloque.
+    Las cadenas entre comillas se apartan antes y se restauran sin tocar.
+    """
+    cadenas = []
+
+    def _apartar(match):
+        literal = match.group()
+        if literal.startswith('/*'):
+            return ''
+        cadenas.append(literal)
+        return f'\x00{len(cadenas) - 1}\x00'
+
+    source = _CSS_LITERAL.sub(_apartar, source)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    source = source.replace(';}', '}')
+    return re.sub(r'\x00(\d+)\x00', lambda match: cadenas[int(match.group(1))], source.strip())
+
+
+def minify_js(source):
+    """
+    Minificación conservadora de JavaScript: elimina sangrías, líneas vacías y comentarios de línea completa.
+    Se conservan los saltos de línea para no depender de la inserción automática de punto y coma.
+    """
+    lineas = []
+    for linea in source.splitlines():
+        linea = linea.strip()
+        if linea and not linea.startswith('//'):
+            lineas.append(linea)
+    return '\n'.join(lineas)
+
+
+def _minify(nombre, source):
+    if nombre.endswith('.css'):
+        return minify_css(source)
+    if nombre.endswith('.js'):
+        return minify_js(source)
+    return source
+
+
+def _compress(ruta, contenido):
+    """Escribe las variantes gzip y, si está disponible, brotli junto al archivo"""
+    with open(ruta + '.gz', 'wb') as f:
+        # mtime fijo para que la misma entrada produzca el mismo archivo
+        f.write(gzip.compress(contenido, compresslevel=9, mtime=0))
+    try:
+        import brotli  # Dependencia opcional
+    except ImportError:
+        return
+    with open(ruta + '.br', 'wb') as f:
+        f.write(brotli.compress(contenido, quality=11))
+
+
+def build_assets(static_folder, bundles=None):
+    """
+    Genera los paquetes minificados con el hash del contenido en el nombre,
+    sus variantes comprimidas y el manifiesto. Devuelve el manifiesto.
+    """
+    bundles = bundles or BUNDLES
+    dist = os.path.join(static_folder, DIST_FOLDER)
+    os.makedirs(dist, exist_ok=True)
+
+    manifest = {}
+    for nombre, fuentes in bundles.items():
+        partes = []
+        for fuente in fuentes:
+            with open(os.path.join(static_folder, fuente), encoding='utf-8') as f:
+                partes.append(_minify(fuente, f.read()))
+        contenido = '\n'.join(partes).encode('utf-8')
+
+        base, extension = os.path.splitext(nombre)
+        huella = hashlib.sha256(contenido).hexdigest()[:12]
+        destino = f'{base}.{huella}{extension}'
+        ruta = os.path.join(dist, destino)
+        if not os.path.exists(ruta):
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'wb') as f:
+                f.write(contenido)
+            _compress(ruta, contenido)
+        manifest[nombre] = destino
+
+    # Eliminar versiones anteriores que ya no están en el manifiesto
+    vigentes = set(manifest.values())
+    for directorio, _, archivos in os.walk(dist):
+        for archivo in archivos:
+            relativo = os.path.relpath(os.path.join(directorio, archivo), dist).replace(os.sep, '/')
+            if archivo == MANIFEST_NAME or re.sub(r'\.(gz|br)$', '', relativo) in vigentes:
+                continue
+            os.remove(os.path.join(directorio, archivo))
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class AssetManifest:
+    """Manifiesto de recursos generados; se relee si el archivo cambia"""
+    def __init__(self, path):
+        self.path = path
+        self._mtime = None
+        self._data = {}
+
+    def get(self, nombre):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        if mtime != self._mtime:
+            with open(self.path, encoding='utf-8') as f:
+                self._data = json.load(f)
+            self._mtime = mtime
+        return self._data.get(nombre)
+
+
+def asset_urls(nombre):
+    """
+    URLs de un paquete: la versión generada con huella si existe,
+    o sus archivos originales de app/static si no se ha ejecutado `flask assets`.
+    """
+    generado = current_app.extensions['asset_manifest'].get(nombre)
+    if generado:
+        return [url_for('assets', filename=generado)]
+    return [url_for('static', filename=fuente) for fuente in BUNDLES.get(nombre, [nombre])]
+
+
+def asset_url(nombre):
+    """URL de un recurso de un solo archivo (ver asset_urls)"""
+    return asset_urls(nombre)[0]
+
+
+def serve_asset(filename):
+    """Sirve un recurso generado con caché inmutable y la mejor variante comprimida aceptada"""
+    dist = os.path.join(current_app.static_folder, DIST_FOLDER)
+    ruta = safe_join(dist, filename)
+    if ruta is None or not os.path.isfile(ruta):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for nombre, sufijo in _ENCODINGS:
+        if nombre in request.accept_encodings and os.path.isfile(ruta + sufijo):
+            ruta, encoding = ruta + sufijo, nombre
+            break
+
+    # El nombre cambia con el contenido, así que el navegador puede conservarlo indefinidamente
+    response = send_file(ruta, mimetype=mimetype, conditional=True, etag=True,
+                         max_age=current_app.config.get('ASSETS_MAX_AGE', 31536000))
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.cache_control.immutable = True
+    return response
+
+
+def init_assets(app):
+    """Registra la ruta de recursos generados y las funciones asset_url/asset_urls en las plantillas"""
+    manifest_path = os.path.join(app.static_folder, DIST_FOLDER, MANIFEST_NAME)
+    app.extensions['asset_manifest'] = AssetManifest(manifest_path)
+    app.add_url_rule(f'{app.static_url_path}/{DIST_FOLDER}/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.jinja_env.globals['asset_urls'] = asset_urls
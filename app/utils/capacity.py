@@ -0,0 +1,172 @@
+from datetime import datetime
+from flask import url_for
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..models.event import Evento, SolicitudEvento
+from .notifications import notify_user
+
+# Estados de solicitud que ocupan un cupo del evento
+ESTADOS_CON_CUPO = ('pendiente', 'aprobado')
+
+
+class CapacityError(Exception):
+    """No quedan cupos en el evento o la solicitud cambió mientras tanto"""
+
+
+def reserve_seat(evento_id):
+    """
+    Ocupa un cupo con un UPDATE condicional: la comprobación y el incremento son una sola
+    sentencia, así dos peticiones simultáneas no pueden quedarse con el último cupo.
+    Devuelve True si se consiguió el cupo.
+    """
+    tabla = Evento.__table__
+    resultado = db.session.execute(
+        tabla.update().where(
+            tabla.c.id == evento_id,
+            db.or_(tabla.c.capacidad.is_(None), tabla.c.cupos_ocupados < tabla.c.capacidad)
+        ).values(cupos_ocupados=tabla.c.cupos_ocupados + 1)
+    )
+    return resultado.rowcount == 1
+
+
+def release_seat(evento_id):
+    tabla = Evento.__table__
+    db.session.execute(
+        tabla.update().where(
+            tabla.c.id == evento_id,
+            tabla.c.cupos_ocupados > 0
+        ).values(cupos_ocupados=tabla.c.cupos_ocupados - 1)
+    )
+
+
+def promote_waitlist(evento_id):
+    """
+    Pasa a pendiente las solicitudes en espera, por orden de llegada, mientras queden cupos.
+    No confirma la transacción. Devuelve los ids de las solicitudes promovidas.
+    """
+    promovidas = []
+    while True:
+        candidato = db.session.query(SolicitudEvento.id).filter(
+            SolicitudEvento.evento_id == evento_id,
+            SolicitudEvento.estado == 'en_espera'
+        ).order_by(SolicitudEvento.solicitado_en, SolicitudEvento.id).first()
+        if candidato is None or not reserve_seat(evento_id):
+            break
+        actualizadas = SolicitudEvento.query.filter(
+            SolicitudEvento.id == candidato[0],
+            SolicitudEvento.estado == 'en_espera'
+        ).update({SolicitudEvento.estado: 'pendiente'}, synchronize_session=False)
+        if actualizadas:
+            promovidas.append(candidato[0])
+        else:
+            # Otra petición la promovió o la canceló: se devuelve el cupo y se prueba con la siguiente
+            release_seat(evento_id)
+    return promovidas
+
+
+def enroll(usuario_id, evento_id):
+    """
+    Crea la solicitud de un voluntario: pendiente si queda cupo, en espera si el evento está lleno.
+    Confirma la transacción. Devuelve None si el usuario ya tenía una solicitud para el evento.
+    """
+    con_cupo = reserve_seat(evento_id)
+    solicitud = SolicitudEvento(
+        usuario_id=usuario_id,
+        evento_id=evento_id,
+        estado='pendiente' if con_cupo else 'en_espera',
+        solicitado_en=datetime.utcnow()
+    )
+    db.session.add(solicitud)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Solicitud duplicada (doble envío): el rollback también devuelve el cupo
+        db.session.rollback()
+        return None
+    return solicitud
+
+
+def change_request_state(solicitud, nuevo_estado):
+    """
+    Cambia el estado de una solicitud (o la elimina si nuevo_estado es None) ajustando los cupos:
+    si libera un cupo, lo ocupa la primera solicitud en espera.
+    Siempre se actualiza primero el evento y después la solicitud, para que todas las
+    operaciones tomen los bloqueos en el mismo orden.
+    Confirma la transacción y devuelve los ids de las solicitudes promovidas.
+    """
+    anterior = solicitud.estado
+    evento_id = solicitud.evento_id
+    ocupaba = anterior in ESTADOS_CON_CUPO
+    ocupara = nuevo_estado in ESTADOS_CON_CUPO
+
+    if ocupara and not ocupaba and not reserve_seat(evento_id):
+        db.session.rollback()
+        raise CapacityError('No quedan cupos disponibles en este evento')
+    if ocupaba and not ocupara:
+        release_seat(evento_id)
+
+    # La condición sobre el estado anterior evita aplicar dos veces el mismo cambio
+    consulta = SolicitudEvento.query.filter(
+        SolicitudEvento.id == solicitud.id,
+        SolicitudEvento.estado == anterior
+    )
+    if nuevo_estado is None:
+        afectadas = consulta.delete(synchronize_session=False)
+    else:
+        afectadas = consulta.update({
+            SolicitudEvento.estado: nuevo_estado,
+            SolicitudEvento.decidido_en: datetime.utcnow()
+        }, synchronize_session=False)
+    if not afectadas:
+        db.session.rollback()
+        raise CapacityError('La solicitud fue modificada por otra operación')
+
+    promovidas = promote_waitlist(evento_id) if ocupaba and not ocupara else []
+    db.session.commit()
+    if nuevo_estado is None:
+        db.session.expunge(solicitud)
+    else:
+        db.session.expire(solicitud)
+    return promovidas
+
+
+def cancel_request(solicitud):
+    """Elimina la solicitud de un voluntario y cede su cupo a la lista de espera"""
+    return change_request_state(solicitud, None)
+
+
+def waitlist_position(solicitud):
+    """Posición de una solicitud en la lista de espera de su evento (1 = la siguiente)"""
+    return SolicitudEvento.query.filter(
+        SolicitudEvento.evento_id == solicitud.evento_id,
+        SolicitudEvento.estado == 'en_espera',
+        db.or_(
+            SolicitudEvento.solicitado_en < solicitud.solicitado_en,
+            db.and_(SolicitudEvento.solicitado_en == solicitud.solicitado_en,
+                    SolicitudEvento.id < solicitud.id)
+        )
+    ).count() + 1
+
+
+def notify_request_state(solicitud):
+    """Avisa al voluntario del nuevo estado de su solicitud (después de confirmar)"""
+    evento = solicitud.evento
+    notify_user(solicitud.usuario_id, 'solicitud', {
+        'solicitud_id': solicitud.id,
+        'evento_id': evento.id,
+        'evento': evento.nombre,
+        'fecha': evento.fecha.strftime('%d/%m/%Y'),
+        'url': url_for('volunteer.event_detail', event_id=evento.id),
+        'estado': solicitud.estado
+    })
+
+
+def notify_promotions(ids):
+    """Avisa a los voluntarios cuyas solicitudes salieron de la lista de espera"""
+    if not ids:
+        return
+    solicitudes = SolicitudEvento.query.options(
+        db.joinedload(SolicitudEvento.evento)
+    ).filter(SolicitudEvento.id.in_(ids)).all()
+    for solicitud in solicitudes:
+        notify_request_state(solicitud)
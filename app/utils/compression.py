@@ -0,0 +1,225 @@
+import gzip
+import time
+import threading
+from functools import wraps
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+from .data_structures import LRUCache
+
+# Tipos de contenido que vale la pena comprimir
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/xml', 'text/javascript',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+}
+
+# Nunca se comprimen: deben llegar al cliente según se generan
+STREAMING_TYPES = {'text/event-stream'}
+
+
+def available_encodings():
+    """Codificaciones disponibles por orden de preferencia (brotli solo si está instalado)"""
+    try:
+        import brotli  # noqa: F401  Dependencia opcional
+        return ['br', 'gzip']
+    except ImportError:
+        return ['gzip']
+
+
+def negotiate_encoding(accept_encoding, encodings):
+    """Elige la primera codificación soportada que el cliente acepta (sin q=0)"""
+    aceptadas = set()
+    for parte in (accept_encoding or '').lower().split(','):
+        nombre, _, parametros = parte.strip().partition(';')
+        if parametros.strip().replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        aceptadas.add(nombre.strip())
+    for encoding in encodings:
+        if encoding in aceptadas:
+            return encoding
+    return None
+
+
+def compress(data, encoding, level=6):
+    if encoding == 'br':
+        import brotli
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level)
+
+
+def _header(headers, nombre):
+    nombre = nombre.lower()
+    for clave, valor in headers:
+        if clave.lower() == nombre:
+            return valor
+    return None
+
+
+class CompressionMiddleware:
+    """
+    Middleware WSGI que comprime las respuestas con gzip o brotli según Accept-Encoding.
+    Solo comprime respuestas completas con Content-Length conocido y por encima de min_size;
+    las respuestas en streaming, ya codificadas o con no-transform pasan sin cambios.
+    """
+    def __init__(self, app, min_size=500, level=6):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.encodings = available_encodings()
+
+    def _should_compress(self, status, headers):
+        codigo = int(status.split(' ', 1)[0])
+        if codigo < 200 or codigo in (204, 206, 304):
+            return False
+        if _header(headers, 'Content-Encoding'):
+            return False
+        if 'no-transform' in (_header(headers, 'Cache-Control') or ''):
+            return False
+        tipo = (_header(headers, 'Content-Type') or '').split(';')[0].strip().lower()
+        if tipo in STREAMING_TYPES or tipo not in COMPRESSIBLE_TYPES:
+            return False
+        longitud = _header(headers, 'Content-Length')
+        return longitud is not None and int(longitud) >= self.min_size
+
+    def __call__(self, environ, start_response):
+        encoding = None
+        if environ.get('REQUEST_METHOD') != 'HEAD':
+            encoding = negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING'), self.encodings)
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        capturado = {}
+
+        def start_capture(status, headers, exc_info=None):
+            if not capturado.get('tarde') and self._should_compress(status, headers):
+                capturado.update(status=status, headers=headers)
+                return capturado.setdefault('cuerpo', []).append
+            capturado['directo'] = True
+            return start_response(status, headers, exc_info)
+
+        app_iter = self.app(environ, start_capture)
+        if 'status' not in capturado:
+            # Respuesta en streaming o que no se comprime: se entrega tal cual
+            capturado['tarde'] = True
+            return app_iter
+
+        try:
+            cuerpo = b''.join(capturado.get('cuerpo', []) + list(app_iter))
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+        headers = [(k, v) for k, v in capturado['headers'] if k.lower() != 'content-length']
+        comprimido = compress(cuerpo, encoding, self.level)
+        if len(comprimido) < len(cuerpo):
+            cuerpo = comprimido
+            headers.append(('Content-Encoding', encoding))
+            headers = [(k, _etag_with_encoding(v, encoding) if k.lower() == 'etag' else v) for k, v in headers]
+        headers = _add_vary(headers, 'Accept-Encoding')
+        headers.append(('Content-Length', str(len(cuerpo))))
+        start_response(capturado['status'], headers)
+        return [cuerpo]
+
+
+def _etag_with_encoding(etag, encoding):
+    """La representación comprimida necesita un ETag distinto del original"""
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def _add_vary(headers, valor):
+    vary = _header(headers, 'Vary')
+    if vary is None:
+        return headers + [('Vary', valor)]
+    if valor.lower() in (v.strip().lower() for v in vary.split(',')):
+        return headers
+    return [(k, f'{v}, {valor}' if k.lower() == 'vary' else v) for k, v in headers]
+
+
+class PageCache:
+    """
+    Caché de páginas públicas: guarda el HTML junto con sus versiones comprimidas,
+    de modo que los aciertos no repiten el renderizado ni la compresión.
+    """
+    def __init__(self, max_entries=200, level=6):
+        self._lock = threading.Lock()
+        self._entradas = LRUCache(max_entries)
+        self.level = level
+
+    def get(self, key):
+        with self._lock:
+            entrada = self._entradas.get(key)
+        if entrada is None or entrada['expira'] < time.time():
+            return None
+        return entrada
+
+    def set(self, key, response, timeout):
+        cuerpo = response.get_data()
+        variantes = {None: cuerpo}
+        for encoding in available_encodings():
+            comprimido = compress(cuerpo, encoding, self.level)
+            if len(comprimido) < len(cuerpo):
+                variantes[encoding] = comprimido
+        with self._lock:
+            self._entradas.set(key, {
+                'variantes': variantes,
+                'mimetype': response.mimetype,
+                'expira': time.time() + timeout,
+            })
+
+    def clear(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+def _response_from_cache(entrada):
+    variantes = entrada['variantes']
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding'), [e for e in variantes if e])
+    response = current_app.response_class(variantes[encoding], mimetype=entrada['mimetype'])
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    response.headers['X-Page-Cache'] = 'HIT'
+    return response
+
+
+def cached_page(timeout=None):
+    """
+    Cachea una página pública para visitantes anónimos.
+    No se cachea si la vista modifica la sesión (mensajes flash, token CSRF) ni si la respuesta no es 200.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache = current_app.extensions.get('page_cache')
+            if (cache is None or request.method != 'GET'
+                    or current_user.is_authenticated or '_flashes' in session):
+                return f(*args, **kwargs)
+
+            key = request.full_path
+            entrada = cache.get(key)
+            if entrada is not None:
+                return _response_from_cache(entrada)
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not session.modified and not response.direct_passthrough:
+                cache.set(key, response, timeout or current_app.config.get('PAGE_CACHE_TIMEOUT', 60))
+                response.headers['X-Page-Cache'] = 'MISS'
+            return response
+        return decorated_function
+    return decorator
+
+
+def init_compression(app):
+    """Activa la compresión de respuestas y la caché de páginas públicas según la configuración"""
+    if app.config.get('PAGE_CACHE_ENABLED', True):
+        app.extensions['page_cache'] = PageCache(
+            app.config.get('PAGE_CACHE_MAX_ENTRIES', 200),
+            app.config.get('COMPRESSION_LEVEL', 6)
+        )
+    if app.config.get('COMPRESSION_ENABLED', True):
+        app.wsgi_app = CompressionMiddleware(
+            app.wsgi_app,
+            min_size=app.config.get('COMPRESSION_MIN_SIZE', 500),
+            level=app.config.get('COMPRESSION_LEVEL', 6)
+        )
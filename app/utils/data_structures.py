@@ -1,3 +1,8 @@
+import hashlib
+import math
+from collections import OrderedDict
+
+
 class Stack:
     """
     Implementación de una pila (LIFO) 
@@ -273,3 +278,127 @@ class ActionQueue:
     def clear(self):
         """Vacía la cola"""
         self.queue.clear()
+
+
+class LRUCache:
+    """
+    Diccionario de tamaño acotado que descarta la entrada usada hace más tiempo
+    cuando se alcanza la capacidad.
+    """
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.items = OrderedDict()
+    
+    def get(self, key, default=None):
+        """Devuelve el valor de una clave y la marca como usada recientemente"""
+        if key not in self.items:
+            return default
+        self.items.move_to_end(key)
+        return self.items[key]
+    
+    def set(self, key, value):
+        """Guarda un valor, descartando la entrada más antigua si no hay espacio"""
+        if key in self.items:
+            self.items.move_to_end(key)
+        self.items[key] = value
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+    
+    def delete(self, key):
+        """Elimina una clave si existe"""
+        self.items.pop(key, None)
+    
+    def __contains__(self, key):
+        return key in self.items
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def clear(self):
+        """Vacía la caché"""
+        self.items.clear()
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom: conjunto aproximado y compacto.
+    Puede dar falsos positivos (con probabilidad error_rate) pero nunca falsos negativos.
+    """
+    def __init__(self, capacity=10000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        """Posiciones de bits del elemento (doble hash sobre un único resumen)"""
+        digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item):
+        """Añade un elemento al filtro"""
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        """Vacía el filtro"""
+        self.bits = bytearray(len(self.bits))
+        self.count = 0
+
+
+class RingBuffer:
+    """
+    Búfer circular de capacidad fija: al llenarse, cada elemento nuevo sobrescribe al más antiguo.
+    Añadir es O(1) y no mueve elementos en memoria.
+    """
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.items = [None] * capacity
+        self.start = 0
+        self.count = 0
+    
+    def append(self, item):
+        """Añade un elemento, descartando el más antiguo si no hay espacio"""
+        end = (self.start + self.count) % self.capacity
+        self.items[end] = item
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+    
+    def newest(self, n=None):
+        """Los n elementos más recientes, del más nuevo al más antiguo"""
+        n = self.count if n is None else min(n, self.count)
+        return [self.items[(self.start + self.count - 1 - i) % self.capacity] for i in range(n)]
+    
+    def peek(self):
+        """Devuelve el elemento más reciente sin eliminarlo"""
+        if self.count:
+            return self.items[(self.start + self.count - 1) % self.capacity]
+        return None
+    
+    def __iter__(self):
+        """Recorre los elementos del más antiguo al más nuevo"""
+        for i in range(self.count):
+            yield self.items[(self.start + i) % self.capacity]
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        """Vacía el búfer"""
+        self.items = [None] * self.capacity
+        self.start = 0
+        self.count = 0
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Esperas por encima de este umbral (segundos) se cuentan como lentas
+SLOW_WAIT_THRESHOLD = 0.1
+
+
+class PoolMetrics:
+    """Contadores acumulados del pool de conexiones de un proceso"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connections_created = 0
+        self.timeouts = 0
+        self.slow_waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, segundos, timeout=False):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += segundos
+            self.wait_max = max(self.wait_max, segundos)
+            if segundos >= SLOW_WAIT_THRESHOLD:
+                self.slow_waits += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connections_created += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'connections_created': self.connections_created,
+                'timeouts': self.timeouts,
+                'slow_waits': self.slow_waits,
+                'wait_avg_ms': round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'wait_max_ms': round(self.wait_max * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mide el tiempo de espera para obtener una conexión
+    y cuenta las conexiones nuevas abiertas contra el servidor.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # dispose() recrea el pool; se conservan los contadores acumulados
+        nuevo = super().recreate()
+        nuevo.metrics = self.metrics
+        return nuevo
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_wait(time.perf_counter() - inicio, timeout=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - inicio)
+        return conexion
+
+    def _create_connection(self):
+        self.metrics.record_connect()
+        return super()._create_connection()
+
+
+def build_engine_options(config):
+    """
+    Construye SQLALCHEMY_ENGINE_OPTIONS a partir de las claves DB_POOL_* de la configuración.
+    Las opciones definidas explícitamente en SQLALCHEMY_ENGINE_OPTIONS tienen prioridad.
+    """
+    explicitas = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri:
+        return explicitas
+    url = make_url(uri)
+
+    # SQLite en memoria usa un pool estático de una sola conexión
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return explicitas
+
+    opciones = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', -1),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', False),
+    }
+    # fast_executemany solo existe en el dialecto de SQL Server con pyodbc
+    if url.drivername == 'mssql+pyodbc' and config.get('DB_FAST_EXECUTEMANY'):
+        opciones['fast_executemany'] = True
+
+    opciones.update(explicitas)
+    return opciones
+
+
+def get_pool_metrics(engine):
+    """Estado actual y contadores acumulados del pool del engine"""
+    pool = engine.pool
+    estado = {
+        'pid': os.getpid(),
+        'pool': type(pool).__name__,
+        'status': pool.status(),
+    }
+    if isinstance(pool, QueuePool):
+        estado.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+            'timeout': pool.timeout(),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        estado.update(pool.metrics.snapshot())
+    return estado
@@ -0,0 +1,144 @@
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+from flask import current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, select
+
+# Clave de la sesión con la hora de la última escritura del usuario
+_LAST_WRITE_KEY = '_ultima_escritura'
+
+
+def read_only(f):
+    """Marca una vista como de solo lectura: sus consultas pueden ir a la réplica"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g._solo_lectura = True
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+class ReplicaRouter:
+    """
+    Decide si la réplica está disponible midiendo su retraso con un latido:
+    se escribe la hora en la base principal y se lee en la réplica.
+    El resultado se reutiliza durante check_interval segundos.
+    """
+    def __init__(self, primary, replica, max_lag, check_interval):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag = None
+        self._lock = threading.Lock()
+        self._comprobado = 0.0
+        self._disponible = False
+        self._ultimo_latido = None
+
+    def available(self):
+        with self._lock:
+            if time.monotonic() - self._comprobado >= self.check_interval:
+                self._disponible = self._probe()
+                self._comprobado = time.monotonic()
+            return self._disponible
+
+    def _probe(self):
+        from ..models.system import LatidoReplica
+        tabla = LatidoReplica.__table__
+        ahora = datetime.utcnow()
+        try:
+            with self.replica.connect() as conn:
+                marca = conn.execute(select(tabla.c.marca).where(tabla.c.id == 1)).scalar()
+            with self.primary.begin() as conn:
+                if not conn.execute(tabla.update().where(tabla.c.id == 1).values(marca=ahora)).rowcount:
+                    conn.execute(tabla.insert().values(id=1, marca=ahora))
+        except Exception as e:
+            current_app.logger.warning(f'Réplica no disponible: {str(e)}')
+            self.lag = None
+            return False
+
+        # Si la réplica ya tiene el latido anterior, está al día hasta ese momento
+        if marca is None:
+            self.lag = None
+        elif self._ultimo_latido is not None and marca >= self._ultimo_latido:
+            self.lag = 0.0
+        else:
+            self.lag = (ahora - marca).total_seconds()
+        self._ultimo_latido = ahora
+        return self.lag is not None and self.lag <= self.max_lag
+
+
+def _replica_for_request():
+    """Motor de la réplica si la petición actual puede leer de ella, o None"""
+    if not has_request_context() or not g.get('_solo_lectura'):
+        return None
+    if '_motor_lectura' not in g:
+        router = current_app.extensions.get('replica_router')
+        motor = None
+        if router is not None:
+            # Lecturas de las propias escrituras: tras escribir, el usuario lee de la principal
+            ultima = session.get(_LAST_WRITE_KEY, 0)
+            ventana = current_app.config.get('REPLICA_READ_YOUR_WRITES', 10)
+            if time.time() - ultima > ventana and router.available():
+                motor = router.replica
+        g._motor_lectura = motor
+    return g._motor_lectura
+
+
+class RoutingSession(Session):
+    """Sesión que envía las consultas SELECT de vistas de solo lectura a la réplica"""
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        motor = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if (bind is None and not self._flushing and clause is not None
+                and getattr(clause, 'is_select', False) and motor is self._db.engine):
+            replica = _replica_for_request()
+            if replica is not None:
+                return replica
+        return motor
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _registrar_flush(db_session, flush_context):
+    db_session.info['hubo_escrituras'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _registrar_dml(orm_execute_state):
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.info['hubo_escrituras'] = True
+
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _marcar_escritura(db_session):
+    if db_session.info.pop('hubo_escrituras', False) and has_request_context():
+        session[_LAST_WRITE_KEY] = time.time()
+
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _descartar_escritura(db_session):
+    db_session.info.pop('hubo_escrituras', None)
+
+
+def replica_bind_options(config):
+    """Configuración del bind 'replica' a partir de REPLICA_DATABASE_URL"""
+    from .db_pool import build_engine_options
+    uri = config['REPLICA_DATABASE_URL']
+    opciones = build_engine_options({**config, 'SQLALCHEMY_DATABASE_URI': uri, 'SQLALCHEMY_ENGINE_OPTIONS': None})
+    return {'url': uri, **opciones}
+
+
+def init_replica_routing(app, db):
+    """Crea el enrutador de réplica si REPLICA_DATABASE_URL está configurada"""
+    from ..models import system  # noqa: F401  registra la tabla de latido
+    if not app.config.get('REPLICA_DATABASE_URL'):
+        return None
+    with app.app_context():
+        router = ReplicaRouter(
+            db.engine,
+            db.engines['replica'],
+            app.config.get('REPLICA_MAX_LAG', 5),
+            app.config.get('REPLICA_LAG_CHECK_INTERVAL', 5)
+        )
+    app.extensions['replica_router'] = router
+    return router
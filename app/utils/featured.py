@@ -0,0 +1,128 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from .. import db
+from ..models.event import Evento, ResumenCalificacion, SolicitudEvento
+from .lifecycle import ESTADOS_ABIERTOS
+from .preload import count_by
+
+# Peso de cada criterio en la puntuación de un evento destacado
+DEFAULT_WEIGHTS = {'proximidad': 0.4, 'demanda': 0.3, 'valoracion': 0.3}
+
+# Promedio bayesiano: las organizaciones con pocos votos se acercan a PRIOR_RATING
+PRIOR_RATING = 3.0
+PRIOR_VOTES = 5
+
+
+def organization_ratings(organizacion_ids, hoy):
+    """
+    Votos y suma de calificaciones de los eventos ya realizados de cada organización,
+    sumando los agregados precalculados por evento en una sola consulta
+    """
+    if not organizacion_ids:
+        return {}
+    filas = db.session.query(
+        Evento.organizacion_id, db.func.sum(ResumenCalificacion.total), db.func.sum(ResumenCalificacion.suma)
+    ).join(
+        ResumenCalificacion, ResumenCalificacion.evento_id == Evento.id
+    ).filter(
+        Evento.organizacion_id.in_(organizacion_ids),
+        Evento.fecha < hoy
+    ).group_by(Evento.organizacion_id).all()
+    return {organizacion_id: (total, suma) for organizacion_id, total, suma in filas}
+
+
+def score_candidates(candidatos, solicitudes, valoraciones, weights, hoy):
+    """
+    Puntúa cada candidato (id, fecha, organizacion_id) con valores entre 0 y 1 por criterio:
+    - proximidad: decrece con los días que faltan para el evento;
+    - demanda: solicitudes recibidas respecto al evento más solicitado de la ventana;
+    - valoracion: promedio bayesiano de las calificaciones de la organización en sus eventos
+      pasados. Los candidatos aún no se han realizado y no tienen calificaciones propias.
+    """
+    max_solicitudes = max(solicitudes.values(), default=0) or 1
+    puntuados = []
+    for evento_id, fecha, organizacion_id in candidatos:
+        proximidad = 1 / (1 + max((fecha - hoy).days, 0))
+        demanda = solicitudes.get(evento_id, 0) / max_solicitudes
+        total, suma = valoraciones.get(organizacion_id, (0, 0))
+        valoracion = ((suma or 0) + PRIOR_RATING * PRIOR_VOTES) / ((total or 0) + PRIOR_VOTES) / 5
+        puntuacion = (weights['proximidad'] * proximidad
+                      + weights['demanda'] * demanda
+                      + weights['valoracion'] * valoracion)
+        # A igual puntuación gana el evento más cercano
+        puntuados.append((puntuacion, -fecha.toordinal(), -evento_id))
+    return puntuados
+
+
+class FeaturedEvents:
+    """
+    Eventos destacados de la página de inicio.
+    La clasificación se calcula sobre una ventana acotada de los próximos eventos abiertos
+    y solo se guardan los ids, que comparten todos los visitantes durante timeout segundos.
+    """
+    def __init__(self, candidates=50, timeout=60, weights=None):
+        self.candidates = candidates
+        self.timeout = timeout
+        self.weights = weights or DEFAULT_WEIGHTS
+        self._lock = threading.Lock()
+        self._cache = {}
+
+    def ranked_ids(self, limit):
+        """Ids de los limit eventos mejor puntuados: tres consultas acotadas, sin cargar objetos ORM"""
+        hoy = datetime.utcnow().date()
+        candidatos = db.session.query(
+            Evento.id, Evento.fecha, Evento.organizacion_id
+        ).filter(
+            Evento.estado.in_(ESTADOS_ABIERTOS),
+            Evento.fecha >= hoy
+        ).order_by(Evento.fecha.asc(), Evento.id.asc()).limit(self.candidates).all()
+        if not candidatos:
+            return []
+
+        solicitudes = count_by(SolicitudEvento.evento_id, [c[0] for c in candidatos])
+        valoraciones = organization_ratings(list({c[2] for c in candidatos}), hoy)
+        puntuados = score_candidates(candidatos, solicitudes, valoraciones, self.weights, hoy)
+        return [-evento_id for _, _, evento_id in heapq.nlargest(limit, puntuados)]
+
+    def get_ids(self, limit):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._cache.get(limit)
+            if entrada is not None and entrada[0] > ahora:
+                return entrada[1]
+        ids = self.ranked_ids(limit)
+        with self._lock:
+            self._cache[limit] = (ahora + self.timeout, ids)
+        return ids
+
+    def get(self, limit):
+        """Eventos destacados en orden de puntuación"""
+        ids = self.get_ids(limit)
+        if not ids:
+            return []
+        eventos = {evento.id: evento for evento in Evento.query.filter(Evento.id.in_(ids)).all()}
+        # Un evento cacheado pudo eliminarse o cerrarse desde la última clasificación
+        return [eventos[evento_id] for evento_id in ids
+                if evento_id in eventos and eventos[evento_id].estado in ESTADOS_ABIERTOS]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def init_featured_events(app):
+    """Crea el servicio de eventos destacados de la aplicación"""
+    destacados = FeaturedEvents(
+        candidates=app.config.get('FEATURED_CANDIDATES', 50),
+        timeout=app.config.get('FEATURED_CACHE_TIMEOUT', 60),
+        weights=app.config.get('FEATURED_WEIGHTS')
+    )
+    app.extensions['featured_events'] = destacados
+    return destacados
+
+
+def get_featured_events(limit=3):
+    return current_app.extensions['featured_events'].get(limit)
@@ -1,51 +1,145 @@
+import hashlib
+import json
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
 from .. import db
 from ..models.user import Role, User
-from datetime import datetime
-
-def init_roles():
-    """Inicializa los roles básicos del sistema"""
-    roles = [
-        {
-            'nombre': 'administrador',
-            'descripcion': 'Administrador del sistema con acceso total'
-        },
-        {
-            'nombre': 'organizador',
-            'descripcion': 'Organizador de eventos'
-        },
-        {
-            'nombre': 'voluntario',
-            'descripcion': 'Voluntario que participa en eventos'
-        }
+from ..models.event import RolEvento, AreaIntervencion
+from ..models.organization import TipoOrganizacion
+from ..models.system import MetadatoSistema
+
+# Datos de referencia que deben existir en toda instalación, identificados por su nombre.
+# Cualquier cambio aquí cambia la versión de la semilla y provoca una nueva sincronización.
+ROLES = [
+    ('administrador', 'Administrador del sistema con acceso total'),
+    ('organizador', 'Organizador de eventos'),
+    ('voluntario', 'Voluntario que participa en eventos'),
+]
+
+ROLES_EVENTO = ['Coordinador', 'Asistente', 'Logística', 'Comunicación', 'Facilitador']
+
+AREAS_INTERVENCION = [
+    ('Medio Ambiente', 'Actividades enfocadas en la protección y conservación del medio ambiente'),
+    ('Educación', 'Proyectos educativos y de formación para la comunidad'),
+    ('Salud', 'Iniciativas relacionadas con la salud y el bienestar comunitario'),
+    ('Cultura', 'Actividades culturales y artísticas para el desarrollo comunitario'),
+    ('Deporte', 'Eventos deportivos y recreativos para la comunidad'),
+    ('Desarrollo Comunitario', 'Proyectos para el mejoramiento integral de la comunidad'),
+]
+
+TIPOS_ORGANIZACION = [
+    ('ONG', 'Organización No Gubernamental'),
+    ('Fundación', 'Fundación sin ánimo de lucro'),
+    ('Asociación', 'Asociación comunitaria'),
+    ('Colectivo', 'Grupo organizado de personas con objetivos comunes'),
+    ('Junta de Acción Comunal', 'Organización comunitaria local'),
+    ('Cooperativa', 'Cooperativa de trabajo'),
+    ('Empresa Social', 'Empresa con enfoque social'),
+    ('Institución Educativa', 'Centro educativo o universidad'),
+    ('Gobierno Local', 'Entidad gubernamental local'),
+    ('Grupo Comunitario', 'Grupo organizado de la comunidad'),
+]
+
+ADMIN_EMAIL = 'admin@landlink.com'
+
+SEED_VERSION_KEY = 'version_semilla'
+
+
+def _reference_data():
+    """Filas deseadas por modelo: lista de diccionarios con 'nombre' y, si aplica, 'descripcion'"""
+    return [
+        (Role, [{'nombre': n, 'descripcion': d} for n, d in ROLES]),
+        (RolEvento, [{'nombre': n} for n in ROLES_EVENTO]),
+        (AreaIntervencion, [{'nombre': n, 'descripcion': d} for n, d in AREAS_INTERVENCION]),
+        (TipoOrganizacion, [{'nombre': n, 'descripcion': d} for n, d in TIPOS_ORGANIZACION]),
     ]
-    
-    for rol_data in roles:
-        if not Role.query.filter_by(nombre=rol_data['nombre']).first():
-            rol = Role(**rol_data)
-            db.session.add(rol)
-    
+
+
+def seed_version():
+    """Huella de los datos de referencia declarados en este módulo"""
+    datos = {modelo.__tablename__: filas for modelo, filas in _reference_data()}
+    datos['admin'] = ADMIN_EMAIL
+    contenido = json.dumps(datos, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(contenido).hexdigest()[:16]
+
+
+def stored_seed_version():
+    metadato = db.session.get(MetadatoSistema, SEED_VERSION_KEY)
+    return metadato.valor if metadato else None
+
+
+def _sync_table(modelo, deseadas):
+    """
+    Compara las filas deseadas con las existentes (una sola consulta por tabla)
+    e inserta o actualiza en bloque las que faltan o difieren. No elimina filas.
+    Devuelve (insertadas, actualizadas).
+    """
+    columnas = [getattr(modelo, campo) for campo in deseadas[0]]
+    existentes = {}
+    for fila in db.session.execute(db.select(modelo.id, *columnas)).mappings():
+        existentes.setdefault(fila['nombre'], fila)
+
+    nuevas, cambios = [], []
+    for deseada in deseadas:
+        actual = existentes.get(deseada['nombre'])
+        if actual is None:
+            nuevas.append(deseada)
+        elif any(actual[campo] != valor for campo, valor in deseada.items()):
+            cambios.append({'id': actual['id'], **deseada})
+
+    if nuevas:
+        db.session.execute(insert(modelo), nuevas)
+    if cambios:
+        db.session.execute(update(modelo), cambios)
+    return len(nuevas), len(cambios)
+
+
+def _ensure_admin_user():
+    """Crea el usuario administrador por defecto si no existe"""
+    if db.session.query(User.query.filter_by(correo_electronico=ADMIN_EMAIL).exists()).scalar():
+        return False
+    admin_role = Role.query.filter_by(nombre='administrador').one()
+    admin = User(
+        nombre='Administrador',
+        apellido='Sistema',
+        correo_electronico=ADMIN_EMAIL,
+        rol_id=admin_role.id,
+        estado='activo'
+    )
+    admin.contrasena = 'Admin123!'  # Contraseña por defecto
+    db.session.add(admin)
+    return True
+
+
+def seed_reference_data(force=False):
+    """
+    Sincroniza los datos de referencia (roles, roles de evento, áreas y tipos de organización)
+    y el usuario administrador en una sola transacción.
+    Si la versión guardada coincide con la actual no se consulta nada más, salvo con force.
+    Devuelve {tabla: (insertadas, actualizadas)}, o None si no fue necesario sincronizar.
+    """
+    version = seed_version()
+    if not force and stored_seed_version() == version:
+        return None
+
+    resultado = {}
+    for modelo, deseadas in _reference_data():
+        resultado[modelo.__tablename__] = _sync_table(modelo, deseadas)
+    resultado['usuarios'] = (int(_ensure_admin_user()), 0)
+
+    db.session.merge(MetadatoSistema(clave=SEED_VERSION_KEY, valor=version))
     db.session.commit()
+    return resultado
+
+
+def seed_if_needed():
+    """
+    Variante para el arranque de la aplicación: si otro proceso sembró los datos
+    al mismo tiempo, la violación de unicidad se descarta y se conserva su resultado.
+    """
+    try:
+        return seed_reference_data()
+    except IntegrityError:
+        db.session.rollback()
+        return None
 
-def create_admin_user():
-    """Crea un usuario administrador por defecto"""
-    # Verificar si ya existe un administrador
-    admin_role = Role.query.filter_by(nombre='administrador').first()
-    if not admin_role:
-        init_roles()
-        admin_role = Role.query.filter_by(nombre='administrador').first()
-    
-    # Verificar si ya existe el usuario admin
-    if not User.query.filter_by(correo_electronico='admin@landlink.com').first():
-        admin = User(
-            nombre='Administrador',
-            apellido='Sistema',
-            correo_electronico='admin@landlink.com',
-            rol_id=admin_role.id,
-            estado='activo'
-        )
-        admin.contrasena = 'Admin123!'  # Contraseña por defecto
-        db.session.add(admin)
-        db.session.commit()
-        print('Usuario administrador creado exitosamente')
-    else:
-        print('El usuario administrador ya existe') 
\ No newline at end of file
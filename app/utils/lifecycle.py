@@ -0,0 +1,205 @@
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from flask import current_app
+from .. import db
+from ..models.event import Evento, SolicitudEvento
+from ..models.user import RevocacionToken, RegistroActividadUsuario, ResumenActividadDiaria
+from .analytics import refresh_analytics
+
+# Estados en los que un evento sigue visible en los listados públicos
+ESTADOS_ABIERTOS = ('pendiente', 'activo', 'aprobado')
+
+# Estados de solicitud que expiran si el evento pasa sin que el organizador decida
+ESTADOS_SIN_DECIDIR = ('pendiente', 'en_espera')
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _update_in_batches(select_ids, apply_update, batch_size):
+    """
+    Ejecuta una transición por lotes: selecciona hasta batch_size ids,
+    los actualiza con una sola sentencia UPDATE y confirma cada lote.
+    """
+    total = 0
+    while True:
+        ids = [fila[0] for fila in select_ids().limit(batch_size).all()]
+        if not ids:
+            break
+        total += apply_update(ids)
+        db.session.commit()
+        if len(ids) < batch_size:
+            break
+    return total
+
+
+def finalize_past_events(today=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Marca como finalizados los eventos abiertos cuya fecha ya pasó"""
+    today = today or datetime.utcnow().date()
+
+    def select_ids():
+        return db.session.query(Evento.id).filter(
+            Evento.estado.in_(ESTADOS_ABIERTOS),
+            Evento.fecha < today
+        ).order_by(Evento.id)
+
+    def apply_update(ids):
+        return Evento.query.filter(
+            Evento.id.in_(ids),
+            Evento.estado.in_(ESTADOS_ABIERTOS)
+        ).update({Evento.estado: 'finalizado'}, synchronize_session=False)
+
+    return _update_in_batches(select_ids, apply_update, batch_size)
+
+
+def expire_pending_requests(today=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Marca como expiradas las solicitudes pendientes o en espera de eventos que ya pasaron"""
+    today = today or datetime.utcnow().date()
+    ahora = datetime.utcnow()
+
+    def select_ids():
+        return db.session.query(SolicitudEvento.id).join(
+            Evento, Evento.id == SolicitudEvento.evento_id
+        ).filter(
+            SolicitudEvento.estado.in_(ESTADOS_SIN_DECIDIR),
+            Evento.fecha < today
+        ).order_by(SolicitudEvento.id)
+
+    def apply_update(ids):
+        return SolicitudEvento.query.filter(
+            SolicitudEvento.id.in_(ids),
+            SolicitudEvento.estado.in_(ESTADOS_SIN_DECIDIR)
+        ).update({
+            SolicitudEvento.estado: 'expirado',
+            SolicitudEvento.decidido_en: ahora
+        }, synchronize_session=False)
+
+    return _update_in_batches(select_ids, apply_update, batch_size)
+
+
+def purge_expired_revocations(batch_size=DEFAULT_BATCH_SIZE):
+    """Elimina las revocaciones de tokens JWT que ya caducaron"""
+    ahora = datetime.utcnow()
+
+    def select_ids():
+        return db.session.query(RevocacionToken.id).filter(
+            RevocacionToken.expira_en <= ahora
+        ).order_by(RevocacionToken.id)
+
+    def apply_delete(ids):
+        return RevocacionToken.query.filter(
+            RevocacionToken.id.in_(ids)
+        ).delete(synchronize_session=False)
+
+    return _update_in_batches(select_ids, apply_delete, batch_size)
+
+
+def _add_daily_counts(conteos):
+    """Suma cantidades al resumen diario con UPDATE incremental (o INSERT si el día aún no existe)"""
+    tabla = ResumenActividadDiaria.__table__
+    for (fecha, accion), cantidad in conteos.items():
+        resultado = db.session.execute(
+            tabla.update().where(tabla.c.fecha == fecha, tabla.c.accion == accion)
+            .values(total=tabla.c.total + cantidad)
+        )
+        if resultado.rowcount == 0:
+            db.session.execute(tabla.insert().values(fecha=fecha, accion=accion, total=cantidad))
+
+
+def compact_user_activity(batch_size=DEFAULT_BATCH_SIZE, retention_days=None):
+    """
+    Compacta los registros de actividad más antiguos que retention_days (AUDIT_RETENTION_DAYS):
+    cada lote se resume en cantidades por día y acción y se elimina en la misma transacción,
+    así una ejecución interrumpida no cuenta dos veces ni pierde registros.
+    Solo se suma un lote si este proceso eliminó todas sus filas: si otro proceso que ejecuta la
+    misma transición ya eliminó alguna, el lote se deshace y sus filas no se cuentan otra vez.
+    """
+    if retention_days is None:
+        retention_days = current_app.config.get('AUDIT_RETENTION_DAYS')
+    if not retention_days:
+        return 0
+    limite = datetime.utcnow() - timedelta(days=retention_days)
+
+    def select_ids():
+        return db.session.query(RegistroActividadUsuario.id).filter(
+            RegistroActividadUsuario.creado_en < limite
+        ).order_by(RegistroActividadUsuario.creado_en, RegistroActividadUsuario.id)
+
+    def apply_compaction(ids):
+        filas = db.session.query(RegistroActividadUsuario.creado_en, RegistroActividadUsuario.accion).filter(
+            RegistroActividadUsuario.id.in_(ids)
+        ).all()
+        # El DELETE bloquea las filas: un proceso concurrente que las leyó elimina menos de las que leyó
+        eliminadas = RegistroActividadUsuario.query.filter(
+            RegistroActividadUsuario.id.in_(ids)
+        ).delete(synchronize_session=False)
+        if eliminadas != len(filas):
+            db.session.rollback()
+            return 0
+        _add_daily_counts(Counter((creado_en.date(), accion) for creado_en, accion in filas))
+        return eliminadas
+
+    return _update_in_batches(select_ids, apply_compaction, batch_size)
+
+
+# Transiciones que ejecuta el motor, en orden
+TRANSITIONS = [
+    ('eventos_finalizados', finalize_past_events),
+    ('solicitudes_expiradas', expire_pending_requests),
+    ('revocaciones_caducadas', purge_expired_revocations),
+    ('actividad_compactada', compact_user_activity),
+    ('analitica_recalculada', refresh_analytics),
+]
+
+
+def run_lifecycle(batch_size=None):
+    """Ejecuta todas las transiciones de estado y devuelve cuántas filas cambió cada una"""
+    batch_size = batch_size or current_app.config.get('LIFECYCLE_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    resultado = {}
+    for nombre, transicion in TRANSITIONS:
+        try:
+            resultado[nombre] = transicion(batch_size=batch_size)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f'Error en la transición {nombre}: {str(e)}')
+            resultado[nombre] = None
+    return resultado
+
+
+class LifecycleScheduler:
+    """
+    Planificador en segundo plano que ejecuta las transiciones periódicamente.
+    Las transiciones son idempotentes, por lo que varios procesos pueden ejecutarlo a la vez.
+    """
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='lifecycle-scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                resultado = run_lifecycle()
+                self.app.logger.info(f'Transiciones de eventos ejecutadas: {resultado}')
+                db.session.remove()
+            self._stop.wait(self.interval)
+
+
+def init_lifecycle_scheduler(app):
+    """Inicia el planificador si LIFECYCLE_SCHEDULER_ENABLED está activo"""
+    if not app.config.get('LIFECYCLE_SCHEDULER_ENABLED'):
+        return None
+    scheduler = LifecycleScheduler(app, app.config.get('LIFECYCLE_INTERVAL', 3600))
+    app.extensions['lifecycle_scheduler'] = scheduler
+    scheduler.start()
+    return scheduler
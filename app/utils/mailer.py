@@ -0,0 +1,251 @@
+import random
+import smtplib
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from email.utils import make_msgid
+from flask import current_app
+from sqlalchemy import event
+from .. import db
+from ..models.system import CorreoSaliente
+from .rate_limit import MemoryRateLimitBackend
+
+# Errores que indican un problema con el servidor o la conexión: se reintenta todo el lote
+_CONNECTION_ERRORS = (smtplib.SMTPConnectError, smtplib.SMTPServerDisconnected,
+                      smtplib.SMTPHeloError, smtplib.SMTPAuthenticationError, OSError)
+
+
+def queue_email(destinatario, asunto, cuerpo, responder_a=None):
+    """
+    Añade un correo a la bandeja de salida. Se guarda con la transacción del llamador,
+    de modo que solo se envía si la operación que lo origina se confirma.
+    """
+    correo = CorreoSaliente(
+        destinatario=destinatario,
+        dominio=destinatario.rsplit('@', 1)[-1].lower(),
+        # Sin saltos de línea: el asunto puede venir de un formulario
+        asunto=' '.join(asunto.split())[:255],
+        cuerpo=cuerpo,
+        responder_a=responder_a
+    )
+    db.session.add(correo)
+    # El hilo de envío se despierta cuando se confirme la transacción
+    db.session.info['_correos_encolados'] = True
+    return correo
+
+
+def backoff_delay(intentos, base, maximo):
+    """Espera exponencial con variación aleatoria para no reintentar todos a la vez"""
+    espera = min(base * (2 ** max(intentos - 1, 0)), maximo)
+    return espera * random.uniform(0.8, 1.2)
+
+
+class OutboxSender:
+    """
+    Envía los correos pendientes de la bandeja de salida:
+    - reclama un lote con una sola sentencia UPDATE, así varios procesos no envían el mismo mensaje;
+    - envía el lote por una única conexión SMTP;
+    - limita el ritmo por dominio de destino con una cubeta de fichas;
+    - reintenta los fallos temporales con espera exponencial y descarta los permanentes.
+    """
+    def __init__(self, config, rate_backend=None):
+        self.config = config
+        self.rate_backend = rate_backend or MemoryRateLimitBackend()
+
+    def _claim(self, limit):
+        ahora = datetime.utcnow()
+        lote = uuid.uuid4().hex
+        disponibles = db.session.query(CorreoSaliente.id).filter(
+            db.or_(
+                db.and_(CorreoSaliente.estado == 'pendiente', CorreoSaliente.proximo_intento <= ahora),
+                # Mensajes de un envío que se interrumpió sin terminar
+                db.and_(CorreoSaliente.estado == 'enviando', CorreoSaliente.bloqueado_hasta <= ahora)
+            )
+        ).order_by(CorreoSaliente.proximo_intento, CorreoSaliente.id).limit(limit)
+        ids = [fila[0] for fila in disponibles.all()]
+        if not ids:
+            return []
+        CorreoSaliente.query.filter(
+            CorreoSaliente.id.in_(ids),
+            db.or_(CorreoSaliente.estado == 'pendiente', CorreoSaliente.bloqueado_hasta <= ahora)
+        ).update({
+            CorreoSaliente.estado: 'enviando',
+            CorreoSaliente.lote: lote,
+            CorreoSaliente.bloqueado_hasta: ahora + timedelta(seconds=self.config.get('MAIL_LEASE_SECONDS', 300))
+        }, synchronize_session=False)
+        db.session.commit()
+        # Solo los que este proceso consiguió reclamar
+        return CorreoSaliente.query.filter_by(lote=lote).order_by(CorreoSaliente.id).all()
+
+    def _build_message(self, correo):
+        mensaje = EmailMessage()
+        mensaje['From'] = self.config.get('MAIL_DEFAULT_SENDER')
+        mensaje['To'] = correo.destinatario
+        mensaje['Subject'] = correo.asunto
+        mensaje['Message-ID'] = make_msgid(domain=self.config.get('MAIL_MESSAGE_ID_DOMAIN'))
+        if correo.responder_a:
+            mensaje['Reply-To'] = correo.responder_a
+        mensaje.set_content(correo.cuerpo)
+        return mensaje
+
+    def _connect(self):
+        clase = smtplib.SMTP_SSL if self.config.get('MAIL_USE_SSL') else smtplib.SMTP
+        conexion = clase(self.config.get('MAIL_SERVER', 'localhost'), self.config.get('MAIL_PORT', 25),
+                         timeout=self.config.get('MAIL_TIMEOUT', 10))
+        if self.config.get('MAIL_USE_TLS'):
+            conexion.starttls()
+        if self.config.get('MAIL_USERNAME'):
+            conexion.login(self.config['MAIL_USERNAME'], self.config.get('MAIL_PASSWORD'))
+        return conexion
+
+    def _retry(self, correo, error, ahora, permanente=False):
+        correo.intentos += 1
+        correo.ultimo_error = str(error)[:500]
+        correo.lote = None
+        correo.bloqueado_hasta = None
+        if permanente or correo.intentos >= self.config.get('MAIL_MAX_ATTEMPTS', 6):
+            correo.estado = 'fallido'
+            return 'fallidos'
+        correo.estado = 'pendiente'
+        correo.proximo_intento = ahora + timedelta(seconds=backoff_delay(
+            correo.intentos, self.config.get('MAIL_RETRY_BASE', 30), self.config.get('MAIL_RETRY_MAX', 3600)))
+        return 'reintentos'
+
+    def _defer(self, correo, segundos, ahora):
+        """Devuelve el mensaje a la cola sin contar un intento (límite del dominio alcanzado)"""
+        correo.estado = 'pendiente'
+        correo.lote = None
+        correo.bloqueado_hasta = None
+        correo.proximo_intento = ahora + timedelta(seconds=segundos)
+        return 'aplazados'
+
+    def send_batch(self, limit=None):
+        """Envía un lote y devuelve cuántos mensajes se enviaron, aplazaron, reintentarán o fallaron"""
+        resultado = {'enviados': 0, 'aplazados': 0, 'reintentos': 0, 'fallidos': 0}
+        correos = self._claim(limit or self.config.get('MAIL_BATCH_SIZE', 50))
+        if not correos:
+            return resultado
+
+        ahora = datetime.utcnow()
+        a_enviar = []
+        for correo in correos:
+            permitido, espera = self.rate_backend.consume(
+                'smtp:' + correo.dominio,
+                self.config.get('MAIL_DOMAIN_BURST', 20),
+                self.config.get('MAIL_DOMAIN_RATE', 1)
+            )
+            if permitido:
+                a_enviar.append(correo)
+            else:
+                resultado[self._defer(correo, espera, ahora)] += 1
+
+        conexion = None
+        try:
+            if a_enviar:
+                conexion = self._connect()
+            for correo in a_enviar:
+                try:
+                    conexion.send_message(self._build_message(correo))
+                except smtplib.SMTPRecipientsRefused as e:
+                    codigo = next(iter(e.recipients.values()))[0]
+                    resultado[self._retry(correo, e, ahora, permanente=codigo >= 500)] += 1
+                except (smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                    resultado[self._retry(correo, e, ahora, permanente=e.smtp_code >= 500)] += 1
+                else:
+                    correo.estado = 'enviado'
+                    correo.enviado_en = datetime.utcnow()
+                    correo.intentos += 1
+                    correo.lote = None
+                    correo.bloqueado_hasta = None
+                    resultado['enviados'] += 1
+        except _CONNECTION_ERRORS as e:
+            # Sin conexión: los mensajes que quedaban se reintentan más tarde
+            for correo in a_enviar:
+                if correo.estado == 'enviando':
+                    resultado[self._retry(correo, e, ahora)] += 1
+            current_app.logger.warning(f'Error de conexión SMTP: {e}')
+        finally:
+            if conexion is not None:
+                try:
+                    conexion.quit()
+                except _CONNECTION_ERRORS:
+                    pass
+            db.session.commit()
+        return resultado
+
+    def send_pending(self, max_batches=None):
+        """Envía lotes hasta vaciar los mensajes disponibles (o hasta max_batches)"""
+        total = {'enviados': 0, 'aplazados': 0, 'reintentos': 0, 'fallidos': 0}
+        lotes = 0
+        while max_batches is None or lotes < max_batches:
+            resultado = self.send_batch()
+            lotes += 1
+            for clave, valor in resultado.items():
+                total[clave] += valor
+            # Lote vacío o formado solo por mensajes aplazados: no hay más trabajo por ahora
+            if not resultado['enviados'] and not resultado['reintentos'] and not resultado['fallidos']:
+                break
+        return total
+
+
+class OutboxWorker:
+    """Hilo que vacía la bandeja de salida periódicamente o cuando se encola un correo"""
+    def __init__(self, app, sender, interval):
+        self.app = app
+        self.sender = sender
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name='outbox-worker', daemon=True)
+        self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    self.sender.send_pending()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('Error al enviar la bandeja de salida')
+                finally:
+                    db.session.remove()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+def _wake_worker(db_session):
+    if not db_session.info.pop('_correos_encolados', False):
+        return
+    worker = current_app.extensions.get('outbox_worker')
+    if worker is not None:
+        worker.wake()
+
+
+def get_outbox_sender():
+    return current_app.extensions['outbox_sender']
+
+
+def init_mailer(app):
+    """Crea el remitente de la bandeja de salida y, si MAIL_WORKER_ENABLED está activo, su hilo de envío"""
+    sender = OutboxSender(app.config, MemoryRateLimitBackend(app.config.get('RATELIMIT_MAX_KEYS', 10000)))
+    app.extensions['outbox_sender'] = sender
+    if app.config.get('MAIL_WORKER_ENABLED'):
+        worker = OutboxWorker(app, sender, app.config.get('MAIL_POLL_INTERVAL', 30))
+        app.extensions['outbox_worker'] = worker
+        worker.start()
+        if not event.contains(db.session, 'after_commit', _wake_worker):
+            event.listen(db.session, 'after_commit', _wake_worker)
+    return sender
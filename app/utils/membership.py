@@ -0,0 +1,113 @@
+from flask import abort, current_app, g, has_request_context
+from flask_login import current_user
+from sqlalchemy import event
+from .. import db
+from ..models.event import Evento
+from ..models.organization import Organizacion, organizadores
+from ..models.user import User
+from .session_store import session_cache_get, session_cache_set, session_cache_delete
+
+_SESSION_KEY = 'organizaciones_ids'
+
+
+def _load_organization_ids(user_id):
+    """Consulta los ids de las organizaciones del usuario directamente en la tabla organizadores"""
+    filas = db.session.query(organizadores.c.organizacion_id).filter(
+        organizadores.c.usuario_id == user_id
+    ).all()
+    return sorted(fila[0] for fila in filas)
+
+
+def _is_current_user(user_id):
+    return has_request_context() and current_user.is_authenticated and current_user.id == user_id
+
+
+def get_organization_ids(user_id=None):
+    """
+    Devuelve el conjunto de ids de organizaciones de un usuario.
+    Se cachea durante la petición y, para el usuario actual, en la sesión junto con
+    la versión de membresías de su fila: un cambio hecho desde otra sesión incrementa
+    la versión y la entrada cacheada deja de valer en la petición siguiente.
+    """
+    if user_id is None:
+        user_id = current_user.id
+
+    cache = g.setdefault('_membresias', {}) if has_request_context() else {}
+    if user_id in cache:
+        return cache[user_id]
+
+    if _is_current_user(user_id):
+        version = current_user.version_membresias
+        cacheado = session_cache_get(_SESSION_KEY)
+        if cacheado is None or cacheado[0] != version:
+            cacheado = [version, _load_organization_ids(user_id)]
+            session_cache_set(_SESSION_KEY, cacheado, current_app.config.get('SESSION_CACHE_TTL', 300))
+        ids = frozenset(cacheado[1])
+    else:
+        ids = frozenset(_load_organization_ids(user_id))
+
+    cache[user_id] = ids
+    return ids
+
+
+def invalidate_organization_ids(user_id):
+    """Invalida la caché de membresías de un usuario"""
+    if has_request_context():
+        g.setdefault('_membresias', {}).pop(user_id, None)
+        if _is_current_user(user_id):
+            session_cache_delete(_SESSION_KEY)
+
+
+def belongs_to_organization(org_id, user_id=None):
+    """Verifica si el usuario es organizador de la organización"""
+    try:
+        org_id = int(org_id)
+    except (TypeError, ValueError):
+        return False
+    return org_id in get_organization_ids(user_id)
+
+
+def get_user_organizations(*options):
+    """Organizaciones del usuario actual a partir de los ids cacheados"""
+    ids = get_organization_ids()
+    if not ids:
+        return []
+    return Organizacion.query.options(*options).filter(Organizacion.id.in_(ids)).order_by(Organizacion.id).all()
+
+
+def get_owned_organization_or_404(org_id, *options):
+    """Obtiene una organización del usuario actual o responde 404"""
+    if not belongs_to_organization(org_id):
+        abort(404)
+    return Organizacion.query.options(*options).filter(Organizacion.id == org_id).first_or_404()
+
+
+def get_owned_event_or_404(event_id, *options):
+    """Obtiene un evento de una organización del usuario actual o responde 404"""
+    evento = Evento.query.options(*options).filter(Evento.id == event_id).first_or_404()
+    if evento.organizacion_id not in get_organization_ids():
+        abort(404)
+    return evento
+
+
+@event.listens_for(Organizacion.usuarios, 'append')
+@event.listens_for(Organizacion.usuarios, 'remove')
+def _track_membership_change(organizacion, usuario, initiator):
+    """
+    Registra los usuarios cuyas membresías cambian en la transacción actual e incrementa
+    su versión de membresías en la misma transacción (con una expresión SQL, sin leerla antes)
+    """
+    if usuario.id is not None:
+        usuario.version_membresias = User.version_membresias + 1
+        db.session.info.setdefault('membresias_modificadas', set()).add(usuario.id)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_after_commit(session):
+    for user_id in session.info.pop('membresias_modificadas', set()):
+        invalidate_organization_ids(user_id)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_after_rollback(session):
+    session.info.pop('membresias_modificadas', None)
@@ -0,0 +1,189 @@
+import itertools
+import json
+import queue
+import threading
+import time
+from collections import deque
+from flask import current_app
+
+
+def user_channel(usuario_id):
+    return f'usuario:{usuario_id}'
+
+
+def format_sse(datos, evento=None, id=None, retry=None):
+    """Serializa un mensaje con el formato de Server-Sent Events"""
+    lineas = []
+    if id is not None:
+        lineas.append(f'id: {id}')
+    if evento:
+        lineas.append(f'event: {evento}')
+    if retry is not None:
+        lineas.append(f'retry: {retry}')
+    for linea in json.dumps(datos, ensure_ascii=False).splitlines():
+        lineas.append(f'data: {linea}')
+    return '\n'.join(lineas) + '\n\n'
+
+
+class Subscription:
+    """Suscripción a un canal: get() espera el siguiente mensaje (o None si vence el tiempo)"""
+    def get(self, timeout):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class NotificationBroker:
+    """Interfaz de publicación/suscripción de notificaciones"""
+    def publish(self, canal, tipo, datos):
+        raise NotImplementedError
+
+    def subscribe(self, canal, last_event_id=None):
+        raise NotImplementedError
+
+
+class _MemorySubscription(Subscription):
+    def __init__(self, broker, canal, cola):
+        self.broker = broker
+        self.canal = canal
+        self.cola = cola
+
+    def get(self, timeout):
+        try:
+            return self.cola.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._unsubscribe(self.canal, self.cola)
+
+
+class MemoryNotificationBroker(NotificationBroker):
+    """
+    Publicación en memoria del proceso. Sirve con un solo proceso (o con sesiones fijas a un worker);
+    con varios workers hay que usar el backend de Redis.
+    Conserva los últimos mensajes de cada canal para reenviarlos al reconectar (Last-Event-ID).
+    """
+    def __init__(self, history=20, queue_size=100):
+        self._lock = threading.Lock()
+        self._suscriptores = {}
+        self._historial = {}
+        self._ids = itertools.count(1)
+        self.history = history
+        self.queue_size = queue_size
+
+    def publish(self, canal, tipo, datos):
+        with self._lock:
+            mensaje = {'id': next(self._ids), 'tipo': tipo, 'datos': datos}
+            self._historial.setdefault(canal, deque(maxlen=self.history)).append(mensaje)
+            suscriptores = list(self._suscriptores.get(canal, ()))
+        for cola in suscriptores:
+            try:
+                cola.put_nowait(mensaje)
+            except queue.Full:
+                # Cliente que no consume: se descarta el mensaje en lugar de bloquear al publicador
+                pass
+
+    def subscribe(self, canal, last_event_id=None):
+        cola = queue.Queue(self.queue_size)
+        with self._lock:
+            self._suscriptores.setdefault(canal, set()).add(cola)
+            if last_event_id is not None:
+                for mensaje in self._historial.get(canal, ()):
+                    if mensaje['id'] > last_event_id:
+                        cola.put_nowait(mensaje)
+        return _MemorySubscription(self, canal, cola)
+
+    def _unsubscribe(self, canal, cola):
+        with self._lock:
+            suscriptores = self._suscriptores.get(canal)
+            if suscriptores is not None:
+                suscriptores.discard(cola)
+                if not suscriptores:
+                    del self._suscriptores[canal]
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def get(self, timeout):
+        mensaje = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if mensaje is None:
+            return None
+        return json.loads(mensaje['data'])
+
+    def close(self):
+        self.pubsub.close()
+
+
+class RedisNotificationBroker(NotificationBroker):
+    """Publicación compartida entre procesos mediante Redis Pub/Sub (sin reenvío al reconectar)"""
+    def __init__(self, url, prefix='landlink:notificaciones:'):
+        import redis  # Dependencia opcional, solo necesaria con este backend
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def publish(self, canal, tipo, datos):
+        mensaje = {'id': time.time_ns(), 'tipo': tipo, 'datos': datos}
+        self.client.publish(self.prefix + canal, json.dumps(mensaje, ensure_ascii=False))
+
+    def subscribe(self, canal, last_event_id=None):
+        pubsub = self.client.pubsub()
+        pubsub.subscribe(self.prefix + canal)
+        return _RedisSubscription(pubsub)
+
+
+def event_stream(subscription, heartbeat=15, max_duration=300, retry=3000):
+    """
+    Genera la respuesta SSE de una suscripción. Envía un comentario cada heartbeat segundos
+    para mantener viva la conexión y termina tras max_duration segundos: el navegador reconecta
+    solo y así no se retiene un worker indefinidamente.
+    """
+    fin = time.monotonic() + max_duration
+    try:
+        yield f'retry: {retry}\n\n'
+        while True:
+            restante = fin - time.monotonic()
+            if restante <= 0:
+                return
+            mensaje = subscription.get(timeout=min(heartbeat, restante))
+            if mensaje is None:
+                yield ': ping\n\n'
+            else:
+                yield format_sse(mensaje['datos'], evento=mensaje['tipo'], id=mensaje['id'])
+    finally:
+        subscription.close()
+
+
+def create_notification_broker(app):
+    """Crea el backend configurado en NOTIFICATIONS_BACKEND"""
+    nombre = app.config.get('NOTIFICATIONS_BACKEND', 'memory')
+    if nombre == 'memory':
+        return MemoryNotificationBroker()
+    if nombre == 'redis':
+        return RedisNotificationBroker(app.config['NOTIFICATIONS_REDIS_URL'])
+    raise ValueError(f'Backend de notificaciones desconocido: {nombre}')
+
+
+def init_notifications(app):
+    """Crea el canal de notificaciones de la aplicación"""
+    broker = create_notification_broker(app)
+    app.extensions['notifications'] = broker
+    return broker
+
+
+def get_notification_broker():
+    return current_app.extensions['notifications']
+
+
+def notify_user(usuario_id, tipo, datos):
+    """
+    Publica una notificación para un usuario. Debe llamarse después de confirmar la transacción,
+    para no anunciar cambios que luego se deshacen. Un fallo del canal no afecta a la operación.
+    """
+    try:
+        get_notification_broker().publish(user_channel(usuario_id), tipo, datos)
+    except Exception as e:
+        current_app.logger.warning(f'No se pudo publicar la notificación: {e}')
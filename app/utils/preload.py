@@ -0,0 +1,60 @@
+from .. import db
+from ..models.event import AreaIntervencion, SolicitudEvento, intervenciones_evento
+from ..models.organization import organizadores
+
+
+def count_by(column, ids, *criteria):
+    """
+    Cuenta filas agrupadas por column para varios ids en una sola consulta.
+    Los ids sin filas aparecen con 0.
+    """
+    conteos = dict.fromkeys(ids, 0)
+    if not ids:
+        return conteos
+    filas = db.session.query(column, db.func.count()).filter(
+        column.in_(ids), *criteria
+    ).group_by(column).all()
+    conteos.update(filas)
+    return conteos
+
+
+def count_solicitudes(evento_ids):
+    """Total de solicitudes y solicitudes aprobadas por evento en una sola consulta"""
+    conteos = {evento_id: {'total': 0, 'aprobadas': 0} for evento_id in evento_ids}
+    if not evento_ids:
+        return conteos
+    filas = db.session.query(
+        SolicitudEvento.evento_id,
+        db.func.count(SolicitudEvento.id),
+        db.func.sum(db.case((SolicitudEvento.estado == 'aprobado', 1), else_=0))
+    ).filter(
+        SolicitudEvento.evento_id.in_(evento_ids)
+    ).group_by(SolicitudEvento.evento_id).all()
+    for evento_id, total, aprobadas in filas:
+        conteos[evento_id] = {'total': total, 'aprobadas': aprobadas or 0}
+    return conteos
+
+
+def count_organization_members(organizacion_ids):
+    """Cantidad de organizadores por organización en una sola consulta"""
+    return count_by(organizadores.c.organizacion_id, organizacion_ids)
+
+
+def load_event_areas(evento_ids):
+    """
+    Carga las áreas de varios eventos en una sola consulta.
+    La relación Evento.areas es dinámica y no admite carga anticipada.
+    """
+    areas_por_evento = {evento_id: [] for evento_id in evento_ids}
+    if not evento_ids:
+        return areas_por_evento
+    filas = db.session.query(
+        intervenciones_evento.c.evento_id, AreaIntervencion
+    ).join(
+        AreaIntervencion, AreaIntervencion.id == intervenciones_evento.c.area_intervencion_id
+    ).filter(
+        intervenciones_evento.c.evento_id.in_(evento_ids)
+    ).order_by(AreaIntervencion.nombre).all()
+    for evento_id, area in filas:
+        areas_por_evento[evento_id].append(area)
+    return areas_por_evento
@@ -0,0 +1,51 @@
+from flask import before_render_template, template_rendered, current_app, g, has_app_context, has_request_context
+from flask_login import current_user
+from sqlalchemy import event
+from .. import db
+
+
+class QueryDuringRenderError(RuntimeError):
+    """Consulta a la base de datos ejecutada mientras se renderiza una plantilla"""
+
+
+def _template_actual():
+    if not has_request_context():
+        return None
+    pila = g.get('_plantillas_en_render')
+    return pila[-1] if pila else None
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _detectar_consulta(orm_execute_state):
+    """Avisa de las consultas (cargas perezosas, relaciones dinámicas) lanzadas desde una plantilla"""
+    if not has_app_context() or not current_app.config.get('TEMPLATE_QUERY_GUARD'):
+        return
+    plantilla = _template_actual()
+    if plantilla is None:
+        return
+    tipo = 'carga perezosa' if orm_execute_state.is_relationship_load else 'consulta'
+    sentencia = ' '.join(str(orm_execute_state.statement).split())[:200]
+    mensaje = f'{tipo} durante el renderizado de {plantilla}: {sentencia}'
+    if current_app.config['TEMPLATE_QUERY_GUARD'] == 'raise':
+        raise QueryDuringRenderError(mensaje)
+    current_app.logger.warning(mensaje)
+
+
+def init_query_guard(app):
+    """Activa el control de consultas en plantillas según TEMPLATE_QUERY_GUARD ('warn' o 'raise')"""
+    if not app.config.get('TEMPLATE_QUERY_GUARD'):
+        return
+    
+    def inicio_render(sender, template, context, **extra):
+        if not has_request_context():
+            return
+        # El usuario actual se carga antes para no contarlo como consulta de la plantilla
+        current_user._get_current_object()
+        g.setdefault('_plantillas_en_render', []).append(template.name or '<plantilla en línea>')
+    
+    def fin_render(sender, template, context, **extra):
+        if has_request_context() and g.get('_plantillas_en_render'):
+            g._plantillas_en_render.pop()
+    
+    before_render_template.connect(inicio_render, app, weak=False)
+    template_rendered.connect(fin_render, app, weak=False)
@@ -0,0 +1,202 @@
+import math
+import threading
+import time
+from collections import deque
+from flask import current_app
+from .data_structures import LRUCache
+
+
+class RateLimitBackend:
+    """Interfaz de almacenamiento de los contadores de limitación"""
+    def consume(self, key, capacity, rate):
+        """
+        Cubeta de fichas: consume una ficha de key.
+        Devuelve (permitido, segundos hasta la próxima ficha).
+        """
+        raise NotImplementedError
+
+    def add_failure(self, key, window):
+        """Registra un fallo en la ventana deslizante de key y devuelve cuántos hay"""
+        raise NotImplementedError
+
+    def failures(self, key, window):
+        """Devuelve (fallos en la ventana, segundos hasta que caduque el más antiguo)"""
+        raise NotImplementedError
+
+    def reset(self, key):
+        raise NotImplementedError
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Backend en memoria del proceso. Las claves se guardan en cachés LRU,
+    por lo que una ráfaga de IPs o correos distintos no hace crecer la memoria sin límite.
+    """
+    def __init__(self, max_keys=10000):
+        self._lock = threading.Lock()
+        self._cubetas = LRUCache(max_keys)
+        self._fallos = LRUCache(max_keys)
+
+    def consume(self, key, capacity, rate):
+        ahora = time.monotonic()
+        with self._lock:
+            fichas, ultimo = self._cubetas.get(key, (capacity, ahora))
+            fichas = min(capacity, fichas + (ahora - ultimo) * rate)
+            if fichas >= 1:
+                self._cubetas.set(key, (fichas - 1, ahora))
+                return True, 0
+            self._cubetas.set(key, (fichas, ahora))
+            return False, math.ceil((1 - fichas) / rate)
+
+    def _ventana(self, key, window, ahora):
+        marcas = self._fallos.get(key)
+        if marcas is None:
+            marcas = deque()
+            self._fallos.set(key, marcas)
+        while marcas and marcas[0] <= ahora - window:
+            marcas.popleft()
+        return marcas
+
+    def add_failure(self, key, window):
+        ahora = time.time()
+        with self._lock:
+            marcas = self._ventana(key, window, ahora)
+            marcas.append(ahora)
+            return len(marcas)
+
+    def failures(self, key, window):
+        ahora = time.time()
+        with self._lock:
+            if key not in self._fallos:
+                return 0, 0
+            marcas = self._ventana(key, window, ahora)
+            if not marcas:
+                return 0, 0
+            return len(marcas), math.ceil(marcas[0] + window - ahora)
+
+    def reset(self, key):
+        with self._lock:
+            self._cubetas.delete(key)
+            self._fallos.delete(key)
+
+
+# Cubeta de fichas atómica en Redis: KEYS[1] = clave, ARGV = capacidad, ritmo, ahora
+_TOKEN_BUCKET_SCRIPT = """
+local datos = redis.call('HMGET', KEYS[1], 'fichas', 'ultimo')
+local capacidad = tonumber(ARGV[1])
+local ritmo = tonumber(ARGV[2])
+local ahora = tonumber(ARGV[3])
+local fichas = tonumber(datos[1]) or capacidad
+local ultimo = tonumber(datos[2]) or ahora
+fichas = math.min(capacidad, fichas + (ahora - ultimo) * ritmo)
+local permitido = 0
+if fichas >= 1 then
+    fichas = fichas - 1
+    permitido = 1
+end
+redis.call('HSET', KEYS[1], 'fichas', fichas, 'ultimo', ahora)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidad / ritmo) + 1)
+return {permitido, tostring(fichas)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Backend compartido entre workers; las claves caducan solas en Redis"""
+    def __init__(self, url, prefix='landlink:limite:'):
+        import redis  # Dependencia opcional, solo necesaria con este backend
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._bucket = self.client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    def consume(self, key, capacity, rate):
+        permitido, fichas = self._bucket(keys=[self.prefix + 'c:' + key], args=[capacity, rate, time.time()])
+        if permitido:
+            return True, 0
+        return False, math.ceil((1 - float(fichas)) / rate)
+
+    def add_failure(self, key, window):
+        clave = self.prefix + 'f:' + key
+        ahora = time.time()
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(clave, 0, ahora - window)
+        pipe.zadd(clave, {f'{ahora}:{threading.get_ident()}': ahora})
+        pipe.zcard(clave)
+        pipe.expire(clave, int(window) + 1)
+        return pipe.execute()[2]
+
+    def failures(self, key, window):
+        clave = self.prefix + 'f:' + key
+        ahora = time.time()
+        pipe = self.client.pipeline()
+        pipe.zremrangebyscore(clave, 0, ahora - window)
+        pipe.zrange(clave, 0, 0, withscores=True)
+        pipe.zcard(clave)
+        _, primero, total = pipe.execute()
+        if not total:
+            return 0, 0
+        return total, math.ceil(primero[0][1] + window - ahora)
+
+    def reset(self, key):
+        self.client.delete(self.prefix + 'c:' + key, self.prefix + 'f:' + key)
+
+
+class LoginLimiter:
+    """
+    Limitación de intentos de inicio de sesión:
+    - por IP, una cubeta de fichas que frena ráfagas de peticiones;
+    - por correo, una ventana deslizante de intentos fallidos que bloquea la cuenta temporalmente.
+    Ambas comprobaciones se hacen antes de consultar la base de datos o verificar la contraseña.
+    """
+    def __init__(self, backend, ip_burst, ip_rate, max_failures, window):
+        self.backend = backend
+        self.ip_burst = ip_burst
+        self.ip_rate = ip_rate
+        self.max_failures = max_failures
+        self.window = window
+
+    def check(self, ip, email):
+        """Devuelve (permitido, segundos de espera)"""
+        permitido, espera = self.backend.consume('ip:' + (ip or '-'), self.ip_burst, self.ip_rate)
+        if not permitido:
+            return False, espera
+        fallos, espera = self.backend.failures(self._email_key(email), self.window)
+        if fallos >= self.max_failures:
+            return False, espera
+        return True, 0
+
+    def register_failure(self, email):
+        return self.backend.add_failure(self._email_key(email), self.window)
+
+    def register_success(self, email):
+        self.backend.reset(self._email_key(email))
+
+    @staticmethod
+    def _email_key(email):
+        return 'email:' + (email or '').strip().lower()
+
+
+def create_rate_limit_backend(app):
+    """Crea el backend configurado en RATELIMIT_BACKEND"""
+    nombre = app.config.get('RATELIMIT_BACKEND', 'memory')
+    if nombre == 'memory':
+        return MemoryRateLimitBackend(app.config.get('RATELIMIT_MAX_KEYS', 10000))
+    if nombre == 'redis':
+        return RedisRateLimitBackend(app.config['RATELIMIT_REDIS_URL'])
+    raise ValueError(f'Backend de limitación desconocido: {nombre}')
+
+
+def init_rate_limiter(app):
+    """Crea el limitador de inicio de sesión de la aplicación"""
+    limiter = LoginLimiter(
+        create_rate_limit_backend(app),
+        ip_burst=app.config.get('LOGIN_IP_BURST', 10),
+        ip_rate=app.config.get('LOGIN_IP_RATE', 10 / 60),
+        max_failures=app.config.get('MAX_LOGIN_ATTEMPTS', 5),
+        window=app.config['LOCKOUT_TIME'].total_seconds()
+    )
+    app.extensions['login_limiter'] = limiter
+    return limiter
+
+
+def get_login_limiter():
+    return current_app.extensions['login_limiter']
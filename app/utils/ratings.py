@@ -0,0 +1,81 @@
+from sqlalchemy.exc import IntegrityError
+from .. import db
+from ..models.event import ResumenCalificacion
+from .validators import validate_rating
+
+
+def _delta(calificacion, signo):
+    """Incrementos de columnas que aporta (o retira) una calificación"""
+    if calificacion is None or not validate_rating(calificacion):
+        return {}
+    return {
+        'total': signo,
+        'suma': signo * calificacion,
+        f'estrellas_{calificacion}': signo,
+    }
+
+
+def apply_rating_change(evento_id, anterior=None, nueva=None):
+    """
+    Actualiza los agregados de un evento al crear o modificar una calificación.
+    Se usa un UPDATE con incrementos para no perder cambios concurrentes; si la fila aún
+    no existe se inserta dentro de un savepoint, y si otra transacción la creó a la vez
+    se repite el UPDATE.
+    Debe llamarse dentro de la misma transacción que guarda el comentario.
+    """
+    cambios = {}
+    for columna, valor in list(_delta(anterior, -1).items()) + list(_delta(nueva, 1).items()):
+        cambios[columna] = cambios.get(columna, 0) + valor
+    cambios = {columna: valor for columna, valor in cambios.items() if valor}
+    if not cambios:
+        return
+    
+    tabla = ResumenCalificacion.__table__
+    actualizar = tabla.update().where(tabla.c.evento_id == evento_id).values(**{
+        columna: tabla.c[columna] + valor for columna, valor in cambios.items()
+    })
+    if db.session.execute(actualizar).rowcount:
+        return
+    
+    valores = {columna: 0 for columna in ['total', 'suma'] + [f'estrellas_{i}' for i in range(1, 6)]}
+    valores.update({columna: max(valor, 0) for columna, valor in cambios.items()})
+    punto = db.session.begin_nested()
+    try:
+        db.session.execute(tabla.insert().values(evento_id=evento_id, **valores))
+        punto.commit()
+    except IntegrityError:
+        # Otra transacción creó la fila entre el UPDATE y el INSERT: se vuelve a incrementar
+        punto.rollback()
+        db.session.execute(actualizar)
+
+
+def get_rating_summary(evento_id):
+    """Devuelve los agregados de calificaciones de un evento (o None si no tiene)"""
+    return ResumenCalificacion.query.get(evento_id)
+
+
+def rebuild_rating_summaries():
+    """Reconstruye los agregados de calificaciones de todos los eventos"""
+    from ..models.event import ComentarioCalificacion
+    
+    db.session.execute(ResumenCalificacion.__table__.delete())
+    columnas = [
+        db.func.count(ComentarioCalificacion.calificacion),
+        db.func.coalesce(db.func.sum(ComentarioCalificacion.calificacion), 0),
+    ] + [
+        db.func.sum(db.case((ComentarioCalificacion.calificacion == i, 1), else_=0))
+        for i in range(1, 6)
+    ]
+    filas = db.session.query(ComentarioCalificacion.evento_id, *columnas).filter(
+        ComentarioCalificacion.calificacion.between(1, 5)
+    ).group_by(ComentarioCalificacion.evento_id).all()
+    if filas:
+        db.session.execute(ResumenCalificacion.__table__.insert(), [
+            {
+                'evento_id': fila[0], 'total': fila[1], 'suma': fila[2],
+                **{f'estrellas_{i}': fila[2 + i] for i in range(1, 6)}
+            }
+            for fila in filas
+        ])
+    db.session.commit()
+    return len(filas)
@@ -0,0 +1,287 @@
+import os
+import random
+import secrets
+import sqlite3
+import time
+import zlib
+from flask import session
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import Signer, BadSignature
+from werkzeug.datastructures import CallbackDict
+
+# Prefijos del formato de serialización: JSON plano o JSON comprimido con zlib
+_RAW = b'j'
+_ZLIB = b'z'
+_COMPRESS_THRESHOLD = 256
+
+# Clave de la sesión donde se guardan los datos derivados cacheados
+_CACHE_KEY = '_cache'
+
+
+class SessionSerializer:
+    """
+    Serialización compacta de sesiones.
+    Usa el serializador JSON etiquetado de Flask (admite fechas, bytes y tuplas)
+    y comprime con zlib solo cuando el contenido supera un umbral.
+    """
+    def __init__(self):
+        self._json = TaggedJSONSerializer()
+
+    def dumps(self, data):
+        raw = self._json.dumps(dict(data)).encode('utf-8')
+        if len(raw) >= _COMPRESS_THRESHOLD:
+            compressed = zlib.compress(raw, 6)
+            if len(compressed) < len(raw):
+                return _ZLIB + compressed
+        return _RAW + raw
+
+    def loads(self, payload):
+        prefix, body = payload[:1], payload[1:]
+        if prefix == _ZLIB:
+            body = zlib.decompress(body)
+        return self._json.loads(body.decode('utf-8'))
+
+
+class SessionBackend:
+    """Interfaz de almacenamiento para las sesiones del servidor"""
+    def get(self, sid):
+        raise NotImplementedError
+
+    def set(self, sid, payload, ttl):
+        raise NotImplementedError
+
+    def delete(self, sid):
+        raise NotImplementedError
+
+    def touch(self, sid, ttl):
+        """Renueva la caducidad de una sesión sin reescribir su contenido"""
+        raise NotImplementedError
+
+    def purge_expired(self):
+        """Elimina las sesiones caducadas (los backends con TTL nativo no lo necesitan)"""
+        return 0
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """
+    Backend local basado en un archivo SQLite.
+    Pensado para desarrollo y pruebas como sustituto del almacén compartido.
+    """
+    def __init__(self, path, purge_probability=0.01):
+        self.path = path
+        self.purge_probability = purge_probability
+        directorio = os.path.dirname(path)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sesiones ('
+                'sid TEXT PRIMARY KEY, datos BLOB NOT NULL, expira REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_sesiones_expira ON sesiones (expira)')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5)
+
+    def get(self, sid):
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT datos FROM sesiones WHERE sid = ? AND expira > ?',
+                (sid, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, payload, ttl):
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sesiones (sid, datos, expira) VALUES (?, ?, ?)',
+                (sid, sqlite3.Binary(payload), time.time() + ttl)
+            )
+        # Limpieza ocasional para no recorrer la tabla en cada escritura
+        if random.random() < self.purge_probability:
+            self.purge_expired()
+
+    def delete(self, sid):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM sesiones WHERE sid = ?', (sid,))
+
+    def touch(self, sid, ttl):
+        with self._connect() as conn:
+            conn.execute('UPDATE sesiones SET expira = ? WHERE sid = ?', (time.time() + ttl, sid))
+
+    def purge_expired(self):
+        with self._connect() as conn:
+            return conn.execute('DELETE FROM sesiones WHERE expira <= ?', (time.time(),)).rowcount
+
+
+class RedisSessionBackend(SessionBackend):
+    """Backend compartido para producción; la caducidad la gestiona Redis"""
+    def __init__(self, url, prefix='landlink:sesion:'):
+        import redis  # Dependencia opcional, solo necesaria con este backend
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, sid):
+        return self.client.get(self.prefix + sid)
+
+    def set(self, sid, payload, ttl):
+        self.client.setex(self.prefix + sid, max(1, int(ttl)), payload)
+
+    def delete(self, sid):
+        self.client.delete(self.prefix + sid)
+
+    def touch(self, sid, ttl):
+        self.client.expire(self.prefix + sid, max(1, int(ttl)))
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Sesión cuyo contenido vive en el servidor; la cookie solo lleva el id"""
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.sid_anterior = None
+
+    def regenerate(self):
+        """Asigna un id nuevo conservando el contenido; el registro anterior se elimina al guardar"""
+        if not self.new and self.sid_anterior is None:
+            self.sid_anterior = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Interfaz de sesiones de Flask respaldada por un SessionBackend"""
+    def __init__(self, backend, serializer=None):
+        self.backend = backend
+        self.serializer = serializer or SessionSerializer()
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt='landlink-session')
+
+    def _ttl(self, app):
+        return int(app.permanent_session_lifetime.total_seconds())
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode('utf-8')
+            except BadSignature:
+                sid = None
+            if sid:
+                payload = self.backend.get(sid)
+                if payload is not None:
+                    try:
+                        return ServerSideSession(self.serializer.loads(payload), sid=sid)
+                    except (ValueError, zlib.error):
+                        self.backend.delete(sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.sid_anterior:
+            self.backend.delete(session.sid_anterior)
+
+        if not session:
+            if session.modified and not session.new:
+                self.backend.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        if not self.should_set_cookie(app, session):
+            # Caducidad deslizante: mientras se use, la sesión no caduca aunque no cambie
+            # (Flask no vuelve a guardar las sesiones no permanentes que no se modifican)
+            if session.accessed and not session.new:
+                self.backend.touch(session.sid, self._ttl(app))
+            return
+
+        self.backend.set(session.sid, self.serializer.dumps(session), self._ttl(app))
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode('utf-8'),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+
+def create_session_backend(app):
+    """Crea el backend configurado en SESSION_BACKEND (None para cookies firmadas)"""
+    nombre = app.config.get('SESSION_BACKEND', 'cookie')
+    if nombre == 'sqlite':
+        return SQLiteSessionBackend(app.config['SESSION_SQLITE_PATH'])
+    if nombre == 'redis':
+        return RedisSessionBackend(app.config['SESSION_REDIS_URL'])
+    if nombre == 'cookie':
+        return None
+    raise ValueError(f'Backend de sesión desconocido: {nombre}')
+
+
+def init_session_store(app):
+    """Sustituye la sesión por cookie firmada por la sesión del servidor si está configurada"""
+    backend = create_session_backend(app)
+    if backend is not None:
+        app.session_interface = ServerSideSessionInterface(backend)
+    return backend
+
+
+def regenerate_session():
+    """
+    Cambia el id de la sesión del servidor al iniciar o cerrar sesión, para que un id
+    fijado de antemano por un atacante no quede asociado a la cuenta (fijación de sesión).
+    Con sesiones por cookie firmada no hay id que rotar.
+    """
+    actual = session._get_current_object()
+    if isinstance(actual, ServerSideSession):
+        actual.regenerate()
+
+
+def session_cache_get(key):
+    """Devuelve un dato derivado cacheado en la sesión, o None si no existe o caducó"""
+    entrada = session.get(_CACHE_KEY, {}).get(key)
+    if not entrada:
+        return None
+    expira, valor = entrada
+    if expira < time.time():
+        session_cache_delete(key)
+        return None
+    return valor
+
+
+def session_cache_set(key, value, ttl):
+    """Guarda un dato derivado en la sesión con un tiempo de vida en segundos"""
+    cache = dict(session.get(_CACHE_KEY, {}))
+    cache[key] = [time.time() + ttl, value]
+    session[_CACHE_KEY] = cache
+
+
+def session_cache_delete(key):
+    """Invalida un dato derivado de la sesión"""
+    cache = session.get(_CACHE_KEY)
+    if cache and key in cache:
+        cache = dict(cache)
+        del cache[key]
+        session[_CACHE_KEY] = cache
+
+
+def cached_in_session(key, loader, ttl):
+    """Obtiene un dato derivado de la sesión o lo calcula con loader y lo guarda"""
+    valor = session_cache_get(key)
+    if valor is None:
+        valor = loader()
+        session_cache_set(key, valor, ttl)
+    return valor
@@ -0,0 +1,85 @@
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+import click
+from flask import current_app, has_app_context
+
+
+class StartupProfile:
+    """Tiempos de cada fase de create_app, para detectar qué retrasa el arranque en frío"""
+    def __init__(self):
+        self.phases = []
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def phase(self, nombre):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((nombre, time.perf_counter() - inicio))
+
+    @property
+    def total(self):
+        return time.perf_counter() - self._inicio
+
+    def report(self):
+        lineas = [f'{nombre:<28} {segundos * 1000:8.1f} ms' for nombre, segundos in self.phases]
+        lineas.append(f'{"total":<28} {sum(s for _, s in self.phases) * 1000:8.1f} ms')
+        return '\n'.join(lineas)
+
+
+def init_migrations(app, db):
+    """
+    Registra Flask-Migrate solo al ejecutar la CLI de Flask (o con MIGRATIONS_ENABLED).
+    Importar Flask-Migrate carga Alembic, que los workers web no necesitan.
+    """
+    if click.get_current_context(silent=True) is None and not app.config.get('MIGRATIONS_ENABLED'):
+        return None
+    from flask_migrate import Migrate
+    return Migrate(app, db)
+
+
+@contextmanager
+def script_app_context(config_name=None):
+    """
+    Contexto de aplicación para scripts de inicialización: reutiliza el contexto activo
+    o crea una sola aplicación sin blueprints para todo el script.
+    """
+    if has_app_context():
+        yield current_app._get_current_object()
+        return
+    from .. import create_app
+    app = create_app(config_name or os.getenv('FLASK_CONFIG') or 'default', blueprints=())
+    with app.app_context():
+        yield app
+
+
+def import_times(config_name, limit=20):
+    """Módulos que más tardan en importarse al crear la aplicación (python -X importtime)"""
+    codigo = f'from app import create_app; create_app({config_name!r})'
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', codigo],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    )
+    tiempos = []
+    for linea in resultado.stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        propio, acumulado, modulo = [parte.strip() for parte in linea.split(':', 1)[1].split('|')]
+        tiempos.append((int(acumulado), int(propio), modulo))
+    return sorted(tiempos, reverse=True)[:limit]
+
+
+if __name__ == '__main__':
+    # Uso: python -m app.utils.startup [configuración]
+    nombre = sys.argv[1] if len(sys.argv) > 1 else os.getenv('FLASK_CONFIG') or 'default'
+    from app import create_app
+    app = create_app(nombre)
+    print('Fases de create_app:')
+    print(app.extensions['startup_profile'].report())
+    print('\nImportaciones más lentas (acumulado / propio, µs):')
+    for acumulado, propio, modulo in import_times(nombre):
+        print(f'{acumulado:>9} {propio:>9}  {modulo}')
@@ -0,0 +1,234 @@
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, url_for, send_from_directory, abort
+from .. import db
+from ..models.event import Evento
+
+# Firmas de los formatos de imagen aceptados -> extensión del original
+_FIRMAS = [
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+]
+
+# Variantes por defecto: nombre -> ancho máximo en píxeles
+DEFAULT_VARIANTS = {'thumb': 320, 'medium': 800, 'large': 1600}
+
+VARIANT_FORMAT = 'webp'
+
+
+class UploadError(ValueError):
+    """Archivo subido inválido (tipo no permitido o vacío)"""
+
+
+def sniff_image_extension(cabecera):
+    """Extensión según el contenido del archivo; no se confía en el nombre ni en el Content-Type"""
+    for firma, extension in _FIRMAS:
+        if cabecera.startswith(firma):
+            return extension
+    if cabecera[:4] == b'RIFF' and cabecera[8:12] == b'WEBP':
+        return '.webp'
+    return None
+
+
+def save_upload(file_storage, carpeta, chunk_size=64 * 1024):
+    """
+    Copia el archivo subido a carpeta por bloques, calculando su hash a la vez,
+    y lo guarda con el hash del contenido como nombre. Devuelve el nombre del archivo.
+    Un archivo idéntico ya subido se reutiliza.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    stream = file_storage.stream
+    cabecera = stream.read(chunk_size)
+    extension = sniff_image_extension(cabecera)
+    if extension is None:
+        raise UploadError('El archivo no es una imagen PNG, JPEG, GIF o WebP')
+
+    huella = hashlib.sha256()
+    descriptor, temporal = tempfile.mkstemp(dir=carpeta, suffix='.part')
+    try:
+        with os.fdopen(descriptor, 'wb') as destino:
+            bloque = cabecera
+            while bloque:
+                huella.update(bloque)
+                destino.write(bloque)
+                bloque = stream.read(chunk_size)
+        nombre = huella.hexdigest()[:20] + extension
+        ruta = os.path.join(carpeta, nombre)
+        if os.path.exists(ruta):
+            os.remove(temporal)
+        else:
+            os.replace(temporal, ruta)
+        return nombre
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def variant_name(nombre, variante):
+    return f'{os.path.splitext(nombre)[0]}-{variante}.{VARIANT_FORMAT}'
+
+
+def generate_variants(carpeta, nombre, variantes):
+    """
+    Genera las variantes reducidas de una imagen (sin ampliar las pequeñas).
+    Requiere Pillow; sin él no se generan y las plantillas usan el original.
+    Devuelve los nombres de las variantes creadas.
+    """
+    try:
+        from PIL import Image, ImageOps  # Dependencia opcional
+    except ImportError:
+        return []
+
+    creadas = []
+    with Image.open(os.path.join(carpeta, nombre)) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ('RGB', 'RGBA'):
+            original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+        for variante, ancho in sorted(variantes.items(), key=lambda item: item[1]):
+            destino = os.path.join(carpeta, variant_name(nombre, variante))
+            if os.path.exists(destino):
+                creadas.append(variant_name(nombre, variante))
+                continue
+            copia = original.copy()
+            copia.thumbnail((ancho, ancho * 4))
+            # Se escribe con otro nombre y se renombra para no servir archivos a medio escribir
+            copia.save(destino + '.part', VARIANT_FORMAT.upper(), quality=80, method=4)
+            os.replace(destino + '.part', destino)
+            creadas.append(variant_name(nombre, variante))
+    return creadas
+
+
+class ImageProcessor:
+    """
+    Genera las variantes de las imágenes subidas en un grupo de hilos,
+    para que la petición que sube la imagen no espere al redimensionado.
+    Con workers=0 se generan en la misma petición (útil en pruebas).
+    Recuerda qué variantes existen de cada imagen para no consultar el disco en cada renderizado.
+    Si faltan variantes (otro proceso puede estar generándolas) se vuelve a mirar cada recheck segundos.
+    """
+    def __init__(self, carpeta, variantes, workers=2, logger=None, recheck=30):
+        self.carpeta = carpeta
+        self.variantes = variantes
+        self.logger = logger
+        self.recheck = recheck
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='imagenes') if workers else None
+        self._disponibles = {}  # nombre -> (variantes, instante de la próxima revisión o None)
+
+    def _scan(self, nombre):
+        return tuple(
+            (variante, ancho) for variante, ancho in sorted(self.variantes.items(), key=lambda item: item[1])
+            if os.path.exists(os.path.join(self.carpeta, variant_name(nombre, variante)))
+        )
+
+    def available(self, nombre):
+        """Variantes existentes de una imagen como pares (variante, ancho), de menor a mayor"""
+        entrada = self._disponibles.get(nombre)
+        if entrada is None or (entrada[1] is not None and time.monotonic() >= entrada[1]):
+            disponibles = self._scan(nombre)
+            completa = len(disponibles) == len(self.variantes)
+            entrada = (disponibles, None if completa else time.monotonic() + self.recheck)
+            self._disponibles[nombre] = entrada
+        return entrada[0]
+
+    def forget(self, nombre):
+        self._disponibles.pop(nombre, None)
+
+    def _procesar(self, nombre):
+        try:
+            return generate_variants(self.carpeta, nombre, self.variantes)
+        except Exception:
+            if self.logger:
+                self.logger.exception('No se pudieron generar las variantes de %s', nombre)
+            return []
+        finally:
+            # Terminado el trabajo, lo que haya en disco ya no cambia (tampoco sin Pillow)
+            self._disponibles[nombre] = (self._scan(nombre), None)
+
+    def submit(self, nombre):
+        if self.executor is None:
+            return self._procesar(nombre)
+        return self.executor.submit(self._procesar, nombre)
+
+
+def _processor():
+    return current_app.extensions['image_processor']
+
+
+def save_event_image(file_storage):
+    """
+    Guarda la imagen de un evento. Devuelve el nombre a almacenar en Evento.imagen.
+    Tras confirmar la transacción se llama a process_event_image; si falla, a discard_event_image.
+    """
+    processor = _processor()
+    return save_upload(file_storage, processor.carpeta, current_app.config.get('UPLOAD_CHUNK_SIZE', 64 * 1024))
+
+
+def process_event_image(nombre):
+    """Encarga las variantes de una imagen ya asociada a un evento confirmado"""
+    if nombre:
+        _processor().submit(nombre)
+
+
+def discard_event_image(nombre):
+    """
+    Elimina una imagen que ningún evento usa, con sus variantes: la guardada para una
+    transacción que no se confirmó (después del rollback) o la reemplazada al editar
+    (después del commit). Se conserva si otro evento usa el mismo archivo
+    (los nombres son el hash del contenido).
+    """
+    if not nombre:
+        return
+    if db.session.query(Evento.query.filter(Evento.imagen == nombre).exists()).scalar():
+        return
+    processor = _processor()
+    for archivo in [nombre] + [variant_name(nombre, variante) for variante in processor.variantes]:
+        try:
+            os.remove(os.path.join(processor.carpeta, archivo))
+        except FileNotFoundError:
+            pass
+    processor.forget(nombre)
+
+
+def image_url(nombre, variante=None):
+    """URL de una variante de la imagen, o del original si la variante aún no existe"""
+    if variante and variante in dict(_processor().available(nombre)):
+        return url_for('media', filename=variant_name(nombre, variante))
+    return url_for('media', filename=nombre)
+
+
+def image_srcset(nombre):
+    """Atributo srcset con las variantes disponibles (vacío si todavía no se generaron)"""
+    return ', '.join(
+        f"{url_for('media', filename=variant_name(nombre, variante))} {ancho}w"
+        for variante, ancho in _processor().available(nombre)
+    )
+
+
+def serve_media(filename):
+    """Sirve las imágenes subidas; el nombre incluye el hash del contenido, así que son inmutables"""
+    if filename.endswith('.part'):
+        abort(404)
+    response = send_from_directory(_processor().carpeta, filename,
+                                   max_age=current_app.config.get('ASSETS_MAX_AGE', 31536000))
+    response.cache_control.immutable = True
+    return response
+
+
+def init_uploads(app):
+    """Crea el procesador de imágenes y registra la ruta /media y las funciones de plantilla"""
+    carpeta = os.path.join(app.config['UPLOAD_FOLDER'], 'eventos')
+    app.extensions['image_processor'] = ImageProcessor(
+        carpeta,
+        app.config.get('IMAGE_VARIANTS', DEFAULT_VARIANTS),
+        workers=app.config.get('IMAGE_WORKERS', 2),
+        logger=app.logger
+    )
+    app.add_url_rule('/media/<path:filename>', 'media', serve_media)
+    app.jinja_env.globals['image_url'] = image_url
+    app.jinja_env.globals['image_srcset'] = image_srcset
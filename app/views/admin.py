@@ -4,25 +4,27 @@ from ..utils.security import admin_required
 from ..models.user import User, Role, HistorialCambiosUsuario
 from ..models.organization import Organizacion, TipoOrganizacion
 from ..models.event import Evento, AreaIntervencion
+from ..models.activity import ResumenOrganizacion
 from .. import db
-from datetime import datetime, timedelta
+from datetime import datetime
 from flask_wtf import FlaskForm
 from ..utils.data_structures import Stack, Queue, DynamicArray
+from ..utils.preload import count_by, count_solicitudes, count_organization_members, load_event_areas
+from ..utils.db_pool import get_pool_metrics
+from ..utils.db_routing import read_only
+from ..utils.activity_feed import get_recent_activity, activity_page, decode_cursor, user_activity
+from ..utils.analytics import DIMENSIONES, get_analytics, parse_filters
+from ..auth.revocation import revoke_user_tokens
 
 admin_bp = Blueprint('admin', __name__)
 
 class EventForm(FlaskForm):
     pass  # El formulario solo se usa para el token CSRF
 
-class EventLog:
-    def __init__(self, timestamp, type, message):
-        self.timestamp = timestamp
-        self.type = type
-        self.message = message
-
 @admin_bp.route('/dashboard')
 @login_required
 @admin_required
+@read_only
 def dashboard():
     """Panel de administración"""
     # Obtener estadísticas para el dashboard
@@ -31,39 +33,13 @@ def dashboard():
     total_eventos = Evento.query.count()
     
     # Obtener usuarios recientes
-    usuarios_recientes = User.query.order_by(User.id.desc()).limit(5).all()
+    usuarios_recientes = User.query.options(db.joinedload(User.role)).order_by(User.id.desc()).limit(5).all()
     
     # Obtener eventos recientes
-    eventos_recientes = Evento.query.order_by(Evento.id.desc()).limit(5).all()
+    eventos_recientes = Evento.query.options(db.joinedload(Evento.organizacion)).order_by(Evento.id.desc()).limit(5).all()
     
-    # Generar logs de ejemplo (en una implementación real, estos vendrían de la base de datos)
-    logs = [
-        EventLog(
-            datetime.now() - timedelta(minutes=5),
-            'info',
-            'Nuevo evento creado: Limpieza de Playa'
-        ),
-        EventLog(
-            datetime.now() - timedelta(minutes=15),
-            'success',
-            'Evento actualizado: Reforestación Parque Central'
-        ),
-        EventLog(
-            datetime.now() - timedelta(minutes=30),
-            'warning',
-            'Evento próximo a iniciar: Taller de Reciclaje'
-        ),
-        EventLog(
-            datetime.now() - timedelta(hours=1),
-            'error',
-            'Error al procesar solicitudes del evento: Limpieza de Río'
-        ),
-        EventLog(
-            datetime.now() - timedelta(hours=2),
-            'info',
-            'Nuevo organizador registrado: Fundación Verde'
-        )
-    ]
+    # Actividad reciente desde el búfer en memoria
+    logs = get_recent_activity(10)
     
     return render_template('admin/dashboard.html', 
                           total_usuarios=total_usuarios,
@@ -73,6 +49,74 @@ def dashboard():
                           eventos_recientes=eventos_recientes,
                           logs=logs)
 
+@admin_bp.route('/activity')
+@login_required
+@admin_required
+@read_only
+def activity():
+    """Actividad de usuarios y cambios administrativos, paginada por cursor"""
+    cursor = decode_cursor(request.args.get('antes'))
+    entradas, siguiente = activity_page(25, cursor)
+    
+    return render_template('admin/activity.html',
+                          entradas=entradas,
+                          siguiente=siguiente,
+                          primera_pagina=cursor is None)
+
+def _siguiente_dimension(filtros):
+    """Primera dimensión del desglose (mes → área → localidad → tipo) que aún no está filtrada"""
+    return next((dimension for dimension in DIMENSIONES if dimension not in filtros), None)
+
+@admin_bp.route('/analytics')
+@login_required
+@admin_required
+@read_only
+def analytics():
+    """Analítica de eventos y solicitudes desde los resúmenes precalculados"""
+    cubo = get_analytics()
+    filtros = parse_filters(request.args)
+    dimension = request.args.get('dimension')
+    if dimension not in DIMENSIONES or dimension in filtros:
+        dimension = _siguiente_dimension(filtros)
+    
+    filas = cubo.slice(dimension, filtros) if dimension else []
+    por_dia = cubo.signups_per_day(30)
+    migas = [(campo, cubo.label(campo, valor), {c: v for c, v in filtros.items() if c != campo})
+             for campo, valor in filtros.items()]
+    
+    return render_template('admin/analytics.html',
+                          dimension=dimension,
+                          dimensiones=[d for d in DIMENSIONES if d not in filtros],
+                          filtros=filtros,
+                          migas=migas,
+                          filas=filas,
+                          maximo=max((fila['eventos'] for fila in filas), default=0),
+                          totales=cubo.totals(filtros),
+                          por_dia=por_dia,
+                          maximo_dia=max((total for _, total in por_dia), default=0),
+                          actualizado=cubo.updated_at)
+
+@admin_bp.route('/analytics/data')
+@login_required
+@admin_required
+@read_only
+def analytics_data():
+    """Un corte de los resúmenes analíticos en JSON (para gráficos o exportación)"""
+    cubo = get_analytics()
+    filtros = parse_filters(request.args)
+    dimension = request.args.get('dimension') or _siguiente_dimension(filtros)
+    if dimension not in DIMENSIONES:
+        return jsonify({'error': f'Dimensión desconocida: {dimension}'}), 400
+    
+    actualizado = cubo.updated_at
+    return jsonify({
+        'dimension': dimension,
+        'filtros': filtros,
+        'filas': cubo.slice(dimension, filtros),
+        'totales': cubo.totals(filtros),
+        'actualizado': actualizado.isoformat() if actualizado else None
+    })
+
 @admin_bp.route('/users')
 @login_required
 @admin_required
@@ -151,6 +195,10 @@ def edit_user(user_id):
                 flash('El rol seleccionado no existe', 'danger')
                 return render_template('admin/edit_user.html', user=user, roles=roles)
             
+            # Los tokens JWT llevan el rol y el estado: si cambian, se revocan los emitidos
+            if user.rol_id != int(rol_id) or user.estado != request.form.get('estado'):
+                revoke_user_tokens(user)
+            
             # Actualizar datos del usuario
             user.nombre = request.form.get('nombre')
             user.apellido = request.form.get('apellido')
@@ -176,7 +224,7 @@ def edit_user(user_id):
             flash(f'Error al actualizar el usuario: {str(e)}', 'danger')
             return render_template('admin/edit_user.html', user=user, roles=roles)
     
-    return render_template('admin/edit_user.html', user=user, roles=roles)
+    return render_template('admin/edit_user.html', user=user, roles=roles, actividad=user_activity(user.id))
 
 @admin_bp.route('/organizations')
 @login_required
@@ -186,10 +234,24 @@ def organizations():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    organizations = Organizacion.query.order_by(Organizacion.id.desc()).paginate(page=page, per_page=per_page)
+    organizations = Organizacion.query.options(
+        db.joinedload(Organizacion.tipo_organizacion)
+    ).order_by(Organizacion.id.desc()).paginate(page=page, per_page=per_page)
     tipos = TipoOrganizacion.query.all()
     
-    return render_template('admin/organizations.html', organizations=organizations, tipos=tipos)
+    # Conteos de la página en una consulta por relación, no por fila
+    ids = [org.id for org in organizations.items]
+    resumenes = {
+        resumen.organizacion_id: resumen
+        for resumen in ResumenOrganizacion.query.filter(ResumenOrganizacion.organizacion_id.in_(ids))
+    } if ids else {}
+    
+    return render_template('admin/organizations.html',
+                         organizations=organizations,
+                         tipos=tipos,
+                         miembros=count_organization_members(ids),
+                         eventos_por_org=count_by(Evento.organizacion_id, ids),
+                         resumenes=resumenes)
 
 @admin_bp.route('/events')
 @login_required
@@ -199,10 +261,18 @@ def events():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     
-    events = Evento.query.order_by(Evento.id.desc()).paginate(page=page, per_page=per_page)
+    events = Evento.query.options(
+        db.joinedload(Evento.organizacion)
+    ).order_by(Evento.id.desc()).paginate(page=page, per_page=per_page)
     areas = AreaIntervencion.query.all()
     
-    return render_template('admin/events.html', events=events, areas=areas)
+    # Conteos de solicitudes de la página en una sola consulta agrupada
+    conteos_solicitudes = count_solicitudes([evento.id for evento in events.items])
+    
+    return render_template('admin/events.html',
+                         events=events,
+                         areas=areas,
+                         conteos_solicitudes=conteos_solicitudes)
 
 @admin_bp.route('/events/<int:event_id>/edit', methods=['GET', 'POST'])
 @login_required
@@ -249,6 +319,7 @@ def edit_event(event_id):
                          evento=evento,
                          organizaciones=organizaciones,
                          areas=areas,
+                         areas_evento={area.id for area in load_event_areas([evento.id])[evento.id]},
                          form=form)
 
 @admin_bp.route('/settings')
@@ -258,6 +329,13 @@ def settings():
     """Configuración del sistema"""
     return render_template('admin/settings.html')
 
+@admin_bp.route('/db-pool')
+@login_required
+@admin_required
+def db_pool():
+    """Métricas del pool de conexiones de este proceso"""
+    return jsonify(get_pool_metrics(db.engine))
+
 @admin_bp.route('/data-structures')
 @login_required
 @admin_required
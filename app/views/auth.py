@@ -7,27 +7,36 @@ from ..utils.security import validate_password
 from ..models.event import Evento, AreaIntervencion, SolicitudEvento
 from ..models.event import ComentarioCalificacion
 from ..models.user import User
+from ..models.activity import HistorialActividad, ResumenVoluntario
 from datetime import datetime
 from ..forms.login_form import LoginForm
 from urllib.parse import urlparse
 from .. import db
+from ..utils.db_routing import read_only
+from ..utils.session_store import regenerate_session
+from ..utils.compression import cached_page
+from ..utils.mailer import queue_email
 from flask import current_app
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/')
+@cached_page()
+@read_only
 def index():
     """Página de inicio"""
     # Obtener estadísticas para la página de inicio
     stats = ProjectController.get_project_stats()
     # Obtener eventos destacados
-    eventos_destacados = ProjectController.get_projects({'limit': 3})
+    eventos_destacados = ProjectController.get_featured_projects(3)
     
     return render_template('index.html', 
                          eventos_destacados=eventos_destacados,
                          stats=stats)
 
 @auth_bp.route('/proyectos')
+@cached_page()
+@read_only
 def proyectos():
     """Lista de proyectos/eventos"""
     # Obtener filtros de la URL
@@ -49,6 +58,7 @@ def proyectos():
                          filters=filters)
 
 @auth_bp.route('/proyectos/<int:project_id>')
+@cached_page()
 def detalle_proyecto(project_id):
     """Detalle de un proyecto/evento"""
     proyecto = ProjectController.get_project_details(project_id)
@@ -99,8 +109,18 @@ def contacto():
         asunto = request.form.get('asunto')
         mensaje = request.form.get('mensaje')
         
-        # Aquí se procesaría el formulario de contacto
-        # Por ejemplo, enviar un correo electrónico
+        if not all([nombre, asunto, mensaje]) or not validate_email(email):
+            flash('Por favor complete todos los campos con un correo electrónico válido', 'danger')
+            return render_template('contacto.html')
+        
+        # El mensaje se reenvía al equipo desde la bandeja de salida
+        queue_email(
+            current_app.config['MAIL_CONTACT_ADDRESS'],
+            f'[Contacto] {asunto}',
+            f'De: {nombre} <{email}>\n\n{mensaje}',
+            responder_a=email
+        )
+        db.session.commit()
         
         flash('Tu mensaje ha sido enviado correctamente. Nos pondremos en contacto contigo pronto.', 'success')
         return redirect(url_for('auth.contacto'))
@@ -145,6 +165,10 @@ def login():
         try:
             result = AuthController.login(form.email.data, form.password.data, form.remember.data)
             
+            if result.get('retry_after'):
+                flash(result['message'], 'error')
+                return render_template('auth/login.html', form=form), 429
+            
             if result['success']:
                 next_page = request.args.get('next')
                 if not next_page or urlparse(next_page).netloc != '':
@@ -168,13 +192,37 @@ def login():
 def logout():
     session.clear()  # Limpiar toda la sesión
     logout_user()
+    regenerate_session()
     return redirect(url_for('auth.index'))
 
 @auth_bp.route('/profile')
 @login_required
 def profile():
     """Perfil del usuario"""
-    return render_template('auth/profile.html')
+    resumen = None
+    historial_reciente = []
+    solicitudes = []
+    if current_user.is_volunteer():
+        solicitudes = SolicitudEvento.query.options(
+            db.joinedload(SolicitudEvento.evento)
+        ).filter(
+            SolicitudEvento.usuario_id == current_user.id
+        ).order_by(SolicitudEvento.solicitado_en.desc()).all()
+        resumen = ResumenVoluntario.query.get(current_user.id)
+        historial_reciente = HistorialActividad.query.options(
+            db.joinedload(HistorialActividad.evento),
+            db.joinedload(HistorialActividad.rol_evento)
+        ).filter(
+            HistorialActividad.usuario_id == current_user.id
+        ).order_by(
+            HistorialActividad.fecha_participacion.desc(),
+            HistorialActividad.id.desc()
+        ).limit(5).all()
+    
+    return render_template('auth/profile.html',
+                         resumen=resumen,
+                         historial_reciente=historial_reciente,
+                         solicitudes=solicitudes)
 
 @auth_bp.route('/change-password', methods=['GET', 'POST'])
 @login_required
@@ -1,9 +1,17 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
 from flask_login import login_required, current_user
 from ..utils.security import organizer_required
+from ..utils.preload import count_by, count_solicitudes, count_organization_members, load_event_areas
+from ..utils.uploads import save_event_image, process_event_image, discard_event_image
+from ..utils.capacity import CapacityError, change_request_state, promote_waitlist, notify_request_state, notify_promotions
+from ..utils.membership import (
+    get_organization_ids, get_user_organizations, belongs_to_organization,
+    get_owned_event_or_404, get_owned_organization_or_404
+)
 from ..models.organization import Organizacion, TipoOrganizacion
 from ..models.event import Evento, AreaIntervencion, SolicitudEvento
 from ..models.user import User
+from ..models.activity import ResumenOrganizacion
 from .. import db
 from datetime import datetime
 
@@ -15,36 +23,27 @@ organizer_bp = Blueprint('organizer', __name__)
 def dashboard():
     """Panel de organizador"""
     # Obtener organizaciones del usuario con sus relaciones
-    organizaciones = Organizacion.query.join(
-        Organizacion.usuarios
-    ).filter(
-        User.id == current_user.id
-    ).all()
+    organizaciones = get_user_organizations()
     
-    # Preparar datos de organizaciones con conteos
+    # Preparar datos de organizaciones con conteos agrupados en una consulta por tabla
+    org_ids = [org.id for org in organizaciones]
+    miembros = count_organization_members(org_ids)
+    eventos_por_org = count_by(Evento.organizacion_id, org_ids)
     orgs_data = []
     for org in organizaciones:
         orgs_data.append({
             'id': org.id,
             'nombre': org.nombre,
             'tipo': org.tipo_organizacion,
-            'usuarios_count': db.session.query(User).join(
-                Organizacion.usuarios
-            ).filter(
-                Organizacion.id == org.id
-            ).count(),
-            'eventos_count': Evento.query.filter_by(
-                organizacion_id=org.id
-            ).count()
+            'usuarios_count': miembros[org.id],
+            'eventos_count': eventos_por_org[org.id]
         })
     
     # Obtener todos los eventos de las organizaciones del usuario
-    eventos = Evento.query.join(
-        Organizacion
-    ).join(
-        Organizacion.usuarios
+    eventos = Evento.query.options(
+        db.joinedload(Evento.organizacion)
     ).filter(
-        User.id == current_user.id
+        Evento.organizacion_id.in_(get_organization_ids())
     ).order_by(
         Evento.fecha
     ).all()
@@ -60,23 +59,24 @@ def dashboard():
 def events():
     """Gestión de eventos"""
     # Obtener eventos de las organizaciones del usuario
-    eventos = Evento.query.join(
-        Organizacion
-    ).join(
-        Organizacion.usuarios
+    eventos = Evento.query.options(
+        db.joinedload(Evento.organizacion)
     ).filter(
-        User.id == current_user.id
+        Evento.organizacion_id.in_(get_organization_ids())
     ).order_by(
         Evento.fecha
     ).all()
     
-    return render_template('organizer/events.html', eventos=eventos)
+    return render_template('organizer/events.html',
+                          eventos=eventos,
+                          conteos_solicitudes=count_solicitudes([evento.id for evento in eventos]))
 
 @organizer_bp.route('/eventos/crear', methods=['GET', 'POST'])
 @login_required
 @organizer_required
 def create_event():
     if request.method == 'POST':
+        imagen = None
         try:
             # Obtener datos del formulario
             nombre = request.form.get('nombre')
@@ -95,25 +95,27 @@ def create_event():
             latitud = request.form.get('latitud')
             longitud = request.form.get('longitud')
             areas = request.form.getlist('areas')
+            capacidad = request.form.get('capacidad', type=int)
+            if capacidad is not None and capacidad < 1:
+                flash('La capacidad debe ser de al menos un voluntario', 'error')
+                return redirect(url_for('organizer.create_event'))
 
             # Validar que el usuario pertenece a la organización
-            organizacion = Organizacion.query.join(
-                Organizacion.usuarios
-            ).filter(
-                Organizacion.id == organizacion_id,
-                User.id == current_user.id
-            ).first()
-            
-            if not organizacion:
+            if not belongs_to_organization(organizacion_id):
                 flash('No tienes permiso para crear eventos en esta organización', 'error')
                 return redirect(url_for('organizer.create_event'))
 
+            # Guardar la imagen una vez validado el formulario
+            archivo = request.files.get('imagen')
+            if archivo and archivo.filename:
+                imagen = save_event_image(archivo)
+
             # Crear el evento usando SQL nativo
             stmt = db.text("""
                 INSERT INTO eventos (nombre, fecha, descripcion, ubicacion, latitud, longitud, 
-                                   localidad, organizacion_id, requisitos, estado)
+                                   localidad, organizacion_id, requisitos, estado, imagen, capacidad)
                 VALUES (:nombre, :fecha, :descripcion, :ubicacion, :latitud, :longitud,
-                        :localidad, :organizacion_id, :requisitos, :estado)
+                        :localidad, :organizacion_id, :requisitos, :estado, :imagen, :capacidad)
             """)
             
             db.session.execute(stmt, {
@@ -126,7 +128,9 @@ def create_event():
                 'localidad': localidad,
                 'organizacion_id': organizacion_id,
                 'requisitos': requisitos,
-                'estado': 'pendiente'
+                'estado': 'pendiente',
+                'imagen': imagen,
+                'capacidad': capacidad
             })
             
             # Obtener el ID del evento insertado
@@ -144,21 +148,20 @@ def create_event():
                         )
 
             db.session.commit()
+            # Las variantes se generan en segundo plano, solo para imágenes de eventos confirmados
+            process_event_image(imagen)
 
             flash('Evento creado exitosamente', 'success')
             return redirect(url_for('organizer.events'))
 
         except Exception as e:
             db.session.rollback()
+            discard_event_image(imagen)
             flash(f'Error al crear el evento: {str(e)}', 'error')
             return redirect(url_for('organizer.create_event'))
 
     # GET request - mostrar formulario
-    organizaciones = Organizacion.query.join(
-        Organizacion.usuarios
-    ).filter(
-        User.id == current_user.id
-    ).all()
+    organizaciones = get_user_organizations()
     
     areas = AreaIntervencion.query.all()
     
@@ -171,15 +174,18 @@ def create_event():
 @organizer_required
 def organization_detail(org_id):
     """Ver detalles de una organización"""
-    organizacion = Organizacion.query.join(
-        Organizacion.usuarios
-    ).filter(
-        Organizacion.id == org_id,
-        User.id == current_user.id
-    ).first_or_404()
+    organizacion = get_owned_organization_or_404(
+        org_id,
+        db.selectinload(Organizacion.areas_trabajo),
+        db.selectinload(Organizacion.usuarios)
+    )
+    eventos = organizacion.eventos.order_by(Evento.fecha).all()
     
     return render_template('organizer/organization_detail.html', 
                           organizacion=organizacion,
+                          eventos=eventos,
+                          resumen=ResumenOrganizacion.query.get(organizacion.id),
+                          conteos_solicitudes=count_solicitudes([evento.id for evento in eventos]),
                           now=datetime.utcnow())
 
 @organizer_bp.route('/event/<int:event_id>')
@@ -187,57 +193,41 @@ def organization_detail(org_id):
 @organizer_required
 def event_detail(event_id):
     """Ver detalles de un evento"""
-    evento = Evento.query.join(
-        Organizacion
-    ).join(
-        Organizacion.usuarios
-    ).filter(
-        Evento.id == event_id,
-        User.id == current_user.id
-    ).first_or_404()
+    evento = get_owned_event_or_404(event_id, db.joinedload(Evento.organizacion))
     
-    # Obtener solicitudes pendientes
-    solicitudes_pendientes = evento.solicitudes.filter_by(estado='pendiente').all()
+    # Solicitudes pendientes y aprobadas con su voluntario cargado en la misma consulta
+    solicitudes = SolicitudEvento.query.options(
+        db.joinedload(SolicitudEvento.usuario)
+    ).filter(
+        SolicitudEvento.evento_id == evento.id,
+        SolicitudEvento.estado.in_(('pendiente', 'aprobado'))
+    ).order_by(SolicitudEvento.solicitado_en, SolicitudEvento.id).all()
     
     return render_template('organizer/event_detail.html', 
                           evento=evento,
-                          solicitudes_pendientes=solicitudes_pendientes)
+                          areas=load_event_areas([evento.id])[evento.id],
+                          solicitudes_pendientes=[s for s in solicitudes if s.estado == 'pendiente'],
+                          voluntarios_aprobados=[s for s in solicitudes if s.estado == 'aprobado'],
+                          en_espera=evento.solicitudes.filter_by(estado='en_espera').count())
 
 @organizer_bp.route('/event/<int:event_id>/edit', methods=['GET', 'POST'])
 @login_required
 @organizer_required
 def edit_event(event_id):
     """Editar evento"""
-    evento = Evento.query.join(
-        Organizacion
-    ).join(
-        Organizacion.usuarios
-    ).filter(
-        Evento.id == event_id,
-        User.id == current_user.id
-    ).first_or_404()
+    evento = get_owned_event_or_404(event_id)
     
     # Obtener organizaciones del usuario y áreas de intervención
-    organizaciones = Organizacion.query.join(
-        Organizacion.usuarios
-    ).filter(
-        User.id == current_user.id
-    ).all()
+    organizaciones = get_user_organizations()
     
     areas = AreaIntervencion.query.all()
     
     if request.method == 'POST':
+        nueva_imagen = None
         try:
             # Validar que el usuario pertenezca a la organización
             org_id = request.form.get('organizacion_id', type=int)
-            organizacion = Organizacion.query.join(
-                Organizacion.usuarios
-            ).filter(
-                Organizacion.id == org_id,
-                User.id == current_user.id
-            ).first()
-            
-            if not organizacion:
+            if not belongs_to_organization(org_id):
                 flash('No tienes permiso para asignar este evento a esta organización', 'danger')
                 return redirect(url_for('organizer.edit_event', event_id=event_id))
             
@@ -247,6 +237,11 @@ def edit_event(event_id):
                 flash('La fecha del evento debe ser la fecha actual o una fecha posterior', 'error')
                 return redirect(url_for('organizer.edit_event', event_id=event_id))
             
+            capacidad = request.form.get('capacidad', type=int)
+            if capacidad is not None and capacidad < 1:
+                flash('La capacidad debe ser de al menos un voluntario', 'error')
+                return redirect(url_for('organizer.edit_event', event_id=event_id))
+            
             # Actualizar evento
             evento.nombre = request.form.get('nombre')
             evento.fecha = nueva_fecha
@@ -254,6 +249,8 @@ def edit_event(event_id):
             evento.ubicacion = request.form.get('ubicacion')
             evento.localidad = request.form.get('localidad')
             evento.organizacion_id = org_id
+            # Reducir la capacidad no retira cupos ya asignados: solo deja de admitir nuevos
+            evento.capacidad = capacidad
             
             # Actualizar coordenadas
             lat = request.form.get('latitud')
@@ -262,6 +259,13 @@ def edit_event(event_id):
                 evento.latitud = float(lat)
                 evento.longitud = float(lng)
             
+            # Reemplazar la imagen si se subió una nueva
+            imagen_anterior = evento.imagen
+            archivo = request.files.get('imagen')
+            if archivo and archivo.filename:
+                nueva_imagen = save_event_image(archivo)
+                evento.imagen = nueva_imagen
+            
             # Actualizar áreas de intervención
             evento.areas = []
             areas_ids = request.form.getlist('areas')
@@ -270,34 +274,37 @@ def edit_event(event_id):
                 if area:
                     evento.areas.append(area)
             
+            db.session.flush()
+            # Si se amplió la capacidad, los nuevos cupos pasan a la lista de espera
+            promovidas = promote_waitlist(evento.id)
             db.session.commit()
+            process_event_image(nueva_imagen)
+            if nueva_imagen and nueva_imagen != imagen_anterior:
+                # La imagen reemplazada queda huérfana salvo que otro evento la comparta
+                discard_event_image(imagen_anterior)
+            notify_promotions(promovidas)
             
             flash('Evento actualizado correctamente', 'success')
             return redirect(url_for('organizer.event_detail', event_id=event_id))
             
         except Exception as e:
             db.session.rollback()
+            discard_event_image(nueva_imagen)
             flash(f'Error al actualizar el evento: {str(e)}', 'error')
             return redirect(url_for('organizer.edit_event', event_id=event_id))
     
     return render_template('organizer/edit_event.html', 
                           evento=evento,
                           organizaciones=organizaciones,
-                          areas=areas)
+                          areas=areas,
+                          areas_evento={area.id for area in load_event_areas([evento.id])[evento.id]})
 
 @organizer_bp.route('/event/<int:event_id>/solicitud/<int:solicitud_id>/aprobar', methods=['POST'])
 @login_required
 @organizer_required
 def aprobar_solicitud(event_id, solicitud_id):
     """Aprobar una solicitud de participación"""
-    evento = Evento.query.join(
-        Organizacion
-    ).join(
-        Organizacion.usuarios
-    ).filter(
-        Evento.id == event_id,
-        User.id == current_user.id
-    ).first_or_404()
+    evento = get_owned_event_or_404(event_id)
     
     solicitud = SolicitudEvento.query.get_or_404(solicitud_id)
     
@@ -306,9 +313,13 @@ def aprobar_solicitud(event_id, solicitud_id):
         return redirect(url_for('organizer.event_detail', event_id=event_id))
     
     # Aprobar solicitud
-    solicitud.estado = 'aprobado'
-    solicitud.decidido_en = datetime.utcnow()
-    db.session.commit()
+    try:
+        promovidas = change_request_state(solicitud, 'aprobado')
+    except CapacityError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('organizer.event_detail', event_id=event_id))
+    notify_request_state(solicitud)
+    notify_promotions(promovidas)
     
     flash('Solicitud aprobada exitosamente', 'success')
     return redirect(url_for('organizer.event_detail', event_id=event_id))
@@ -318,14 +329,7 @@ def aprobar_solicitud(event_id, solicitud_id):
 @organizer_required
 def rechazar_solicitud(event_id, solicitud_id):
     """Rechazar una solicitud de participación"""
-    evento = Evento.query.join(
-        Organizacion
-    ).join(
-        Organizacion.usuarios
-    ).filter(
-        Evento.id == event_id,
-        User.id == current_user.id
-    ).first_or_404()
+    evento = get_owned_event_or_404(event_id)
     
     solicitud = SolicitudEvento.query.get_or_404(solicitud_id)
     
@@ -333,10 +337,14 @@ def rechazar_solicitud(event_id, solicitud_id):
         flash('La solicitud no corresponde a este evento', 'error')
         return redirect(url_for('organizer.event_detail', event_id=event_id))
     
-    # Rechazar solicitud
-    solicitud.estado = 'rechazado'
-    solicitud.decidido_en = datetime.utcnow()
-    db.session.commit()
+    # Rechazar solicitud (libera su cupo para la lista de espera)
+    try:
+        promovidas = change_request_state(solicitud, 'rechazado')
+    except CapacityError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('organizer.event_detail', event_id=event_id))
+    notify_request_state(solicitud)
+    notify_promotions(promovidas)
     
     flash('Solicitud rechazada', 'success')
     return redirect(url_for('organizer.event_detail', event_id=event_id))
@@ -346,14 +354,20 @@ def rechazar_solicitud(event_id, solicitud_id):
 @organizer_required
 def organizations():
     """Lista de organizaciones del usuario"""
-    organizaciones = Organizacion.query.join(
-        Organizacion.usuarios
-    ).filter(
-        User.id == current_user.id
-    ).all()
+    organizaciones = get_user_organizations(
+        db.joinedload(Organizacion.tipo_organizacion),
+        db.selectinload(Organizacion.areas_trabajo)
+    )
+    
+    # Conteos por organización agrupados en una consulta por tabla
+    org_ids = [org.id for org in organizaciones]
     
     return render_template('organizer/organizations.html', 
                          organizaciones=organizaciones,
+                         miembros=count_organization_members(org_ids),
+                         eventos_por_org=count_by(Evento.organizacion_id, org_ids),
+                         eventos_activos=count_by(Evento.organizacion_id, org_ids,
+                                                  Evento.fecha >= datetime.utcnow().date()),
                          now=datetime.utcnow())
 
 @organizer_bp.route('/create-organization', methods=['GET', 'POST'])
@@ -422,12 +436,7 @@ def create_organization():
 @organizer_required
 def edit_organization(org_id):
     """Editar organización"""
-    organizacion = Organizacion.query.join(
-        Organizacion.usuarios
-    ).filter(
-        Organizacion.id == org_id,
-        User.id == current_user.id
-    ).first_or_404()
+    organizacion = get_owned_organization_or_404(org_id)
     
     if request.method == 'POST':
         try:
@@ -486,14 +495,7 @@ def edit_organization(org_id):
 @organizer_required
 def delete_event(event_id):
     """Eliminar evento"""
-    evento = Evento.query.join(
-        Organizacion
-    ).join(
-        Organizacion.usuarios
-    ).filter(
-        Evento.id == event_id,
-        User.id == current_user.id
-    ).first_or_404()
+    evento = get_owned_event_or_404(event_id)
     db.session.delete(evento)
     db.session.commit()
     flash('Evento eliminado correctamente.', 'success')
@@ -1,6 +1,13 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify
+from flask import Blueprint, render_template, redirect, url_for, flash, request, jsonify, Response, current_app, abort
 from flask_login import login_required, current_user
 from ..utils.security import volunteer_required
+from ..utils.validators import validate_rating
+from ..utils.ratings import apply_rating_change, get_rating_summary
+from ..utils.preload import load_event_areas
+from ..utils.db_routing import read_only
+from ..utils.notifications import get_notification_broker, user_channel, event_stream
+from ..utils.capacity import CapacityError, enroll, cancel_request, waitlist_position, notify_promotions
+from ..controllers.volunteer import VolunteerController
 from ..models.event import Evento, SolicitudEvento, ComentarioCalificacion
 from ..models.activity import HistorialActividad
 from .. import db
@@ -13,26 +20,37 @@ volunteer_bp = Blueprint('volunteer', __name__)
 @volunteer_required
 def dashboard():
     """Panel de voluntario"""
-    # Obtener solicitudes del usuario
-    solicitudes = SolicitudEvento.query.filter_by(usuario_id=current_user.id).all()
-    
-    # Obtener historial de actividades
-    historial = HistorialActividad.query.filter_by(usuario_id=current_user.id).all()
-    
-    # Obtener eventos próximos (solicitudes aprobadas para eventos futuros)
-    eventos_proximos = []
-    for solicitud in solicitudes:
-        if solicitud.estado == 'aprobado' and solicitud.evento.fecha >= datetime.utcnow().date():
-            eventos_proximos.append(solicitud.evento)
+    limite = current_app.config.get('DASHBOARD_LIST_LIMIT', 10)
     
     return render_template('volunteer/dashboard.html', 
-                          solicitudes=solicitudes,
-                          historial=historial,
-                          eventos_proximos=eventos_proximos)
+                          solicitudes=VolunteerController.get_recent_requests(current_user.id, limite),
+                          total_solicitudes=VolunteerController.count_requests(current_user.id),
+                          resumen=VolunteerController.get_summary(current_user.id),
+                          eventos_proximos=VolunteerController.get_upcoming_events(current_user.id, limite))
+
+@volunteer_bp.route('/notifications/stream')
+@login_required
+@volunteer_required
+def notifications_stream():
+    """Notificaciones del voluntario en tiempo real (Server-Sent Events)"""
+    if not current_app.config.get('SSE_ENABLED'):
+        abort(404)
+    ultimo_id = request.headers.get('Last-Event-ID', type=int)
+    suscripcion = get_notification_broker().subscribe(user_channel(current_user.id), ultimo_id)
+    config = current_app.config
+    # El generador no usa el contexto de la petición: la conexión a la base de datos se libera al empezar
+    response = Response(
+        event_stream(suscripcion, config.get('SSE_HEARTBEAT', 15), config.get('SSE_MAX_DURATION', 300)),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @volunteer_bp.route('/events')
 @login_required
 @volunteer_required
+@read_only
 def events():
     """Explorar eventos disponibles"""
     page = request.args.get('page', 1, type=int)
@@ -62,36 +80,56 @@ def events():
         query = query.filter(Evento.fecha <= datetime.strptime(fecha_hasta, '%Y-%m-%d').date())
     
     # Ordenar por fecha y luego por ID para MSSQL
-    query = query.order_by(Evento.fecha.asc(), Evento.id.asc())
+    query = query.options(db.joinedload(Evento.organizacion)).order_by(Evento.fecha.asc(), Evento.id.asc())
     
     # Paginar resultados
     eventos = query.paginate(page=page, per_page=per_page, error_out=False)
     
-    # Obtener solicitudes del usuario para verificar si ya se ha inscrito
-    solicitudes_usuario = SolicitudEvento.query.filter_by(usuario_id=current_user.id).all()
-    eventos_inscritos = [s.evento_id for s in solicitudes_usuario]
+    # Áreas de los eventos de la página en una sola consulta
+    evento_ids = [evento.id for evento in eventos.items]
+    areas_por_evento = load_event_areas(evento_ids)
+    
+    # Solicitudes del usuario solo para los eventos de la página
+    eventos_inscritos = VolunteerController.get_enrolled_event_ids(current_user.id, evento_ids)
     
     return render_template('volunteer/events.html', 
                           eventos=eventos,
-                          eventos_inscritos=eventos_inscritos)
+                          eventos_inscritos=eventos_inscritos,
+                          areas_por_evento=areas_por_evento)
 
 @volunteer_bp.route('/event/<int:event_id>')
 @login_required
 @volunteer_required
 def event_detail(event_id):
     """Detalle de evento"""
-    evento = Evento.query.get_or_404(event_id)
+    evento = Evento.query.options(
+        db.joinedload(Evento.organizacion)
+    ).filter(Evento.id == event_id).first_or_404()
     
     # Verificar si el usuario ya se ha inscrito
     solicitud = SolicitudEvento.query.filter_by(usuario_id=current_user.id, evento_id=evento.id).first()
     
-    # Obtener comentarios del evento
-    comentarios = ComentarioCalificacion.query.filter_by(evento_id=evento.id).all()
+    # Obtener comentarios del evento paginados, con su autor en la misma consulta
+    page = request.args.get('page', 1, type=int)
+    comentarios = ComentarioCalificacion.query.options(
+        db.joinedload(ComentarioCalificacion.usuario)
+    ).filter(
+        ComentarioCalificacion.evento_id == evento.id
+    ).order_by(
+        ComentarioCalificacion.creado_en.desc(),
+        ComentarioCalificacion.id.desc()
+    ).paginate(page=page, per_page=10, error_out=False)
+    
+    mi_comentario = ComentarioCalificacion.query.filter_by(usuario_id=current_user.id, evento_id=evento.id).first()
     
     return render_template('volunteer/event_detail.html', 
                           evento=evento,
+                          areas=load_event_areas([evento.id])[evento.id],
                           solicitud=solicitud,
-                          comentarios=comentarios)
+                          posicion_espera=waitlist_position(solicitud) if solicitud and solicitud.estado == 'en_espera' else None,
+                          comentarios=comentarios,
+                          mi_comentario=mi_comentario,
+                          resumen_calificaciones=get_rating_summary(evento.id))
 
 @volunteer_bp.route('/event/<int:event_id>/inscribirse', methods=['POST'])
 @login_required
@@ -110,27 +148,28 @@ def inscribirse_evento(event_id):
     if solicitud_existente:
         if solicitud_existente.estado == 'pendiente':
             flash('Ya tienes una solicitud pendiente para este evento', 'warning')
+        elif solicitud_existente.estado == 'en_espera':
+            flash('Ya estás en la lista de espera de este evento', 'warning')
         elif solicitud_existente.estado == 'aprobado':
             flash('Ya estás inscrito en este evento', 'info')
         elif solicitud_existente.estado == 'rechazado':
             flash('Tu solicitud anterior fue rechazada', 'warning')
         return redirect(url_for('volunteer.event_detail', event_id=event_id))
     
-    # Crear solicitud
-    nueva_solicitud = SolicitudEvento(
-        usuario_id=current_user.id,
-        evento_id=evento.id,
-        estado='pendiente',
-        solicitado_en=datetime.utcnow()
-    )
-    
+    # Crear solicitud: pendiente si queda cupo, en lista de espera si el evento está lleno
     try:
-        db.session.add(nueva_solicitud)
-        db.session.commit()
-        flash('Te has inscrito correctamente. Tu solicitud está pendiente de aprobación.', 'success')
+        nueva_solicitud = enroll(current_user.id, evento.id)
     except Exception as e:
         db.session.rollback()
         flash('Error al procesar tu solicitud. Por favor, intenta nuevamente.', 'error')
+        return redirect(url_for('volunteer.event_detail', event_id=event_id))
+    
+    if nueva_solicitud is None:
+        flash('Ya tienes una solicitud para este evento', 'warning')
+    elif nueva_solicitud.estado == 'en_espera':
+        flash(f'El evento está completo. Quedaste en la lista de espera (posición {waitlist_position(nueva_solicitud)}).', 'info')
+    else:
+        flash('Te has inscrito correctamente. Tu solicitud está pendiente de aprobación.', 'success')
     
     return redirect(url_for('volunteer.event_detail', event_id=event_id))
 
@@ -146,9 +185,13 @@ def cancelar_inscripcion(event_id):
         flash('No puedes cancelar la inscripción a un evento que ya pasó', 'danger')
         return redirect(url_for('volunteer.event_detail', event_id=event_id))
     
-    # Eliminar solicitud
-    db.session.delete(solicitud)
-    db.session.commit()
+    # Eliminar solicitud: su cupo pasa a la primera solicitud en espera
+    try:
+        promovidas = cancel_request(solicitud)
+    except CapacityError:
+        # Otra petición ya la canceló
+        promovidas = []
+    notify_promotions(promovidas)
     
     flash('Has cancelado tu inscripción correctamente', 'success')
     return redirect(url_for('volunteer.event_detail', event_id=event_id))
@@ -171,12 +214,18 @@ def comentar_evento(event_id):
         flash('Solo puedes comentar eventos en los que has participado', 'danger')
         return redirect(url_for('volunteer.event_detail', event_id=event_id))
     
+    calificacion = request.form.get('calificacion', type=int)
+    if calificacion is not None and not validate_rating(calificacion):
+        flash('La calificación debe estar entre 1 y 5', 'danger')
+        return redirect(url_for('volunteer.event_detail', event_id=event_id))
+    
     # Verificar si el usuario ya ha comentado
     comentario_existente = ComentarioCalificacion.query.filter_by(usuario_id=current_user.id, evento_id=evento.id).first()
     if comentario_existente:
-        # Actualizar comentario existente
+        # Actualizar comentario existente y los agregados del evento
+        apply_rating_change(evento.id, comentario_existente.calificacion, calificacion)
         comentario_existente.comentario = request.form.get('comentario')
-        comentario_existente.calificacion = request.form.get('calificacion', type=int)
+        comentario_existente.calificacion = calificacion
         db.session.commit()
         flash('Tu comentario ha sido actualizado', 'success')
     else:
@@ -185,10 +234,11 @@ def comentar_evento(event_id):
             usuario_id=current_user.id,
             evento_id=evento.id,
             comentario=request.form.get('comentario'),
-            calificacion=request.form.get('calificacion', type=int),
+            calificacion=calificacion,
             creado_en=datetime.utcnow()
         )
         db.session.add(nuevo_comentario)
+        apply_rating_change(evento.id, None, calificacion)
         db.session.commit()
         flash('Tu comentario ha sido publicado', 'success')
     
@@ -199,6 +249,10 @@ def comentar_evento(event_id):
 @volunteer_required
 def historial():
     """Historial de participación"""
-    historial = HistorialActividad.query.filter_by(usuario_id=current_user.id).all()
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)
+    
+    historial = VolunteerController.get_history_page(current_user.id, page, per_page)
+    resumen = VolunteerController.get_summary(current_user.id)
     
-    return render_template('volunteer/historial.html', historial=historial)
+    return render_template('volunteer/historial.html', historial=historial, resumen=resumen)
@@ -0,0 +1,27 @@
+"""
+Configuración de gunicorn (se carga sola al ejecutar `gunicorn run:app` desde la raíz del proyecto).
+
+Las notificaciones en tiempo real mantienen abierta una petición por cada panel de voluntario
+durante hasta SSE_MAX_DURATION segundos. Con los workers síncronos por defecto cada conexión
+ocuparía un worker entero y unos pocos paneles abiertos bloquearían el sitio, así que se usan
+workers con hilos (gthread): cada conexión abierta ocupa un hilo. Las notificaciones solo se
+activan (SSE_ENABLED) cuando el tipo de worker puede mantener conexiones largas y, con más de
+un worker, cuando NOTIFICATIONS_BACKEND=redis: el canal en memoria es propio de cada proceso y
+una notificación publicada en un worker no llegaría a los paneles conectados a otro.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# Hilos por worker: conexiones de notificaciones abiertas más peticiones normales simultáneas
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+notificaciones_compartidas = workers == 1 or os.environ.get('NOTIFICATIONS_BACKEND') == 'redis'
+if worker_class != 'sync' and notificaciones_compartidas:
+    raw_env = [f"SSE_ENABLED={os.environ.get('SSE_ENABLED', 'true')}"]
+else:
+    raw_env = ['SSE_ENABLED=false']
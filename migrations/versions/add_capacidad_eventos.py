@@ -0,0 +1,59 @@
+"""agregar capacidad y lista de espera a eventos
+
+Revision ID: add_capacidad_eventos
+Revises: add_correos_salientes
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_capacidad_eventos'
+down_revision = 'add_correos_salientes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('eventos', sa.Column('capacidad', sa.Integer(), nullable=True))
+    op.add_column('eventos', sa.Column('cupos_ocupados', sa.Integer(), nullable=False, server_default='0'))
+
+    # Solicitudes duplicadas de un mismo usuario: se conserva la de estado más avanzado
+    # (aprobada, pendiente, en espera, rechazada, expirada) y, a igual estado, la primera
+    op.execute("""
+        DELETE FROM solicitudes_evento WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY usuario_id, evento_id
+                    ORDER BY CASE estado
+                        WHEN 'aprobado' THEN 0
+                        WHEN 'pendiente' THEN 1
+                        WHEN 'en_espera' THEN 2
+                        WHEN 'rechazado' THEN 3
+                        WHEN 'expirado' THEN 4
+                        ELSE 5
+                    END, id
+                ) AS orden
+                FROM solicitudes_evento
+            ) numeradas
+            WHERE orden > 1
+        )
+    """)
+    op.create_unique_constraint('unico_usuario_evento_solicitud', 'solicitudes_evento', ['usuario_id', 'evento_id'])
+
+    # Cupos ocupados por las solicitudes existentes
+    op.execute("""
+        UPDATE eventos SET cupos_ocupados = (
+            SELECT COUNT(*) FROM solicitudes_evento
+            WHERE solicitudes_evento.evento_id = eventos.id
+              AND solicitudes_evento.estado IN ('pendiente', 'aprobado')
+        )
+    """)
+
+
+def downgrade():
+    op.drop_constraint('unico_usuario_evento_solicitud', 'solicitudes_evento', type_='unique')
+    op.drop_column('eventos', 'cupos_ocupados', mssql_drop_default=True)
+    op.drop_column('eventos', 'capacidad')
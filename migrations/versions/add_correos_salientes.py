@@ -0,0 +1,44 @@
+"""agregar bandeja de salida de correos
+
+Revision ID: add_correos_salientes
+Revises: add_imagen_eventos
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_correos_salientes'
+down_revision = 'add_imagen_eventos'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('correos_salientes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('destinatario', sa.String(length=255), nullable=False),
+    sa.Column('dominio', sa.String(length=255), nullable=False),
+    sa.Column('asunto', sa.String(length=255), nullable=False),
+    sa.Column('cuerpo', sa.Text(), nullable=False),
+    sa.Column('responder_a', sa.String(length=255), nullable=True),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('proximo_intento', sa.DateTime(), nullable=False),
+    sa.Column('lote', sa.String(length=32), nullable=True),
+    sa.Column('bloqueado_hasta', sa.DateTime(), nullable=True),
+    sa.Column('ultimo_error', sa.String(length=500), nullable=True),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.Column('enviado_en', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_correos_salientes_estado_proximo', 'correos_salientes', ['estado', 'proximo_intento'])
+    op.create_index('ix_correos_salientes_lote', 'correos_salientes', ['lote'])
+
+
+def downgrade():
+    op.drop_index('ix_correos_salientes_lote', table_name='correos_salientes')
+    op.drop_index('ix_correos_salientes_estado_proximo', table_name='correos_salientes')
+    op.drop_table('correos_salientes')
@@ -0,0 +1,24 @@
+"""agregar imagen a eventos
+
+Revision ID: add_imagen_eventos
+Revises: add_metadatos_sistema
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_imagen_eventos'
+down_revision = 'add_metadatos_sistema'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('eventos', sa.Column('imagen', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column('eventos', 'imagen')
@@ -0,0 +1,24 @@
+"""agregar índice por fecha de creación a las revocaciones de tokens
+
+Revision ID: add_indice_revocaciones_creado
+Revises: add_version_membresias
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_indice_revocaciones_creado'
+down_revision = 'add_version_membresias'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_revocaciones_token_creado_en', 'revocaciones_token', ['creado_en'])
+
+
+def downgrade():
+    op.drop_index('ix_revocaciones_token_creado_en', table_name='revocaciones_token')
@@ -0,0 +1,25 @@
+"""agregar índices de fecha a los registros de actividad
+
+Revision ID: add_indices_actividad
+Revises: add_capacidad_eventos
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_indices_actividad'
+down_revision = 'add_capacidad_eventos'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_registro_actividad_creado', 'registro_actividad_usuario', ['creado_en'])
+    op.create_index('ix_historial_cambios_fecha', 'historial_cambios_usuarios', ['fecha'])
+
+
+def downgrade():
+    op.drop_index('ix_historial_cambios_fecha', table_name='historial_cambios_usuarios')
+    op.drop_index('ix_registro_actividad_creado', table_name='registro_actividad_usuario')
@@ -0,0 +1,29 @@
+"""agregar indices de estado para el ciclo de vida de eventos
+
+Revision ID: add_indices_estado
+Revises: add_requisitos_estado
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_indices_estado'
+down_revision = 'add_requisitos_estado'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Listados filtrados por estado y ordenados por fecha
+    op.create_index('ix_eventos_estado_fecha', 'eventos', ['estado', 'fecha'])
+    
+    # Expiración de solicitudes pendientes por evento
+    op.create_index('ix_solicitudes_evento_estado', 'solicitudes_evento', ['estado', 'evento_id'])
+
+
+def downgrade():
+    op.drop_index('ix_solicitudes_evento_estado', table_name='solicitudes_evento')
+    op.drop_index('ix_eventos_estado_fecha', table_name='eventos')
@@ -0,0 +1,28 @@
+"""agregar tabla de latido para la réplica de lectura
+
+Revision ID: add_latido_replica
+Revises: add_resumen_calificaciones
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_latido_replica'
+down_revision = 'add_resumen_calificaciones'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('latido_replica',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('marca', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('latido_replica')
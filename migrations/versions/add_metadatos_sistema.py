@@ -0,0 +1,29 @@
+"""agregar tabla de metadatos del sistema
+
+Revision ID: add_metadatos_sistema
+Revises: add_revocaciones_token
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_metadatos_sistema'
+down_revision = 'add_revocaciones_token'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('metadatos_sistema',
+    sa.Column('clave', sa.String(length=100), nullable=False),
+    sa.Column('valor', sa.String(length=255), nullable=False),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('clave')
+    )
+
+
+def downgrade():
+    op.drop_table('metadatos_sistema')
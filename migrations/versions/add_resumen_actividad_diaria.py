@@ -0,0 +1,35 @@
+"""agregar resumen diario de actividad e índices por usuario
+
+Revision ID: add_resumen_actividad_diaria
+Revises: add_indices_actividad
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_resumen_actividad_diaria'
+down_revision = 'add_indices_actividad'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumen_actividad_diaria',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('accion', sa.String(length=255), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('fecha', 'accion')
+    )
+
+    # Auditoría de un usuario en la pantalla de edición de administración
+    op.create_index('ix_registro_actividad_usuario_creado', 'registro_actividad_usuario', ['usuario_id', 'creado_en'])
+    op.create_index('ix_historial_cambios_usuario_fecha', 'historial_cambios_usuarios', ['usuario_id', 'fecha'])
+
+
+def downgrade():
+    op.drop_index('ix_historial_cambios_usuario_fecha', table_name='historial_cambios_usuarios')
+    op.drop_index('ix_registro_actividad_usuario_creado', table_name='registro_actividad_usuario')
+    op.drop_table('resumen_actividad_diaria')
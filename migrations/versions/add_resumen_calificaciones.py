@@ -0,0 +1,54 @@
+"""agregar resumen de calificaciones por evento
+
+Revision ID: add_resumen_calificaciones
+Revises: add_resumenes_participacion
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_resumen_calificaciones'
+down_revision = 'add_resumenes_participacion'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumen_calificaciones',
+    sa.Column('evento_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('suma', sa.Integer(), nullable=False),
+    sa.Column('estrellas_1', sa.Integer(), nullable=False),
+    sa.Column('estrellas_2', sa.Integer(), nullable=False),
+    sa.Column('estrellas_3', sa.Integer(), nullable=False),
+    sa.Column('estrellas_4', sa.Integer(), nullable=False),
+    sa.Column('estrellas_5', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['evento_id'], ['eventos.id'], ),
+    sa.PrimaryKeyConstraint('evento_id')
+    )
+    
+    # Carga inicial a partir de los comentarios existentes
+    op.execute("""
+        INSERT INTO resumen_calificaciones
+            (evento_id, total, suma, estrellas_1, estrellas_2, estrellas_3, estrellas_4, estrellas_5)
+        SELECT evento_id, COUNT(calificacion), COALESCE(SUM(calificacion), 0),
+               SUM(CASE WHEN calificacion = 1 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN calificacion = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN calificacion = 3 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN calificacion = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN calificacion = 5 THEN 1 ELSE 0 END)
+        FROM comentarios_calificaciones
+        WHERE calificacion BETWEEN 1 AND 5
+        GROUP BY evento_id
+    """)
+    
+    # Comentarios paginados por evento, del más reciente al más antiguo
+    op.create_index('ix_comentarios_evento_creado', 'comentarios_calificaciones', ['evento_id', 'creado_en'])
+
+
+def downgrade():
+    op.drop_index('ix_comentarios_evento_creado', table_name='comentarios_calificaciones')
+    op.drop_table('resumen_calificaciones')
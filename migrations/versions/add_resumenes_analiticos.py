@@ -0,0 +1,40 @@
+"""agregar resúmenes analíticos de eventos y solicitudes
+
+Revision ID: add_resumenes_analiticos
+Revises: add_resumen_actividad_diaria
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_resumenes_analiticos'
+down_revision = 'add_resumen_actividad_diaria'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumen_eventos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('mes', sa.Date(), nullable=False),
+    sa.Column('localidad', sa.String(length=255), nullable=True),
+    sa.Column('tipo_organizacion_id', sa.Integer(), nullable=True),
+    sa.Column('area_id', sa.Integer(), nullable=True),
+    sa.Column('eventos', sa.Integer(), nullable=False),
+    sa.Column('solicitudes', sa.Integer(), nullable=False),
+    sa.Column('aprobadas', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('resumen_solicitudes_dia',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('solicitudes', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('fecha')
+    )
+
+
+def downgrade():
+    op.drop_table('resumen_solicitudes_dia')
+    op.drop_table('resumen_eventos')
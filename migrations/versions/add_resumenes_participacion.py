@@ -0,0 +1,61 @@
+"""agregar tablas de resumen de participacion
+
+Revision ID: add_resumenes_participacion
+Revises: add_indices_estado
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_resumenes_participacion'
+down_revision = 'add_indices_estado'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumen_voluntarios',
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('total_horas', sa.Integer(), nullable=False),
+    sa.Column('eventos_asistidos', sa.Integer(), nullable=False),
+    sa.Column('ultima_participacion', sa.Date(), nullable=True),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('usuario_id')
+    )
+    op.create_table('resumen_organizaciones',
+    sa.Column('organizacion_id', sa.Integer(), nullable=False),
+    sa.Column('total_horas', sa.Integer(), nullable=False),
+    sa.Column('participaciones', sa.Integer(), nullable=False),
+    sa.Column('ultima_participacion', sa.Date(), nullable=True),
+    sa.Column('actualizado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organizacion_id'], ['organizaciones.id'], ),
+    sa.PrimaryKeyConstraint('organizacion_id')
+    )
+    
+    # Consultas paginadas del historial por voluntario
+    op.create_index('ix_historial_usuario_fecha', 'historial_actividad', ['usuario_id', 'fecha_participacion'])
+    
+    # Carga inicial de los resúmenes a partir del historial existente
+    op.execute("""
+        INSERT INTO resumen_voluntarios (usuario_id, total_horas, eventos_asistidos, ultima_participacion)
+        SELECT usuario_id, COALESCE(SUM(horas), 0), COUNT(id), MAX(fecha_participacion)
+        FROM historial_actividad
+        GROUP BY usuario_id
+    """)
+    op.execute("""
+        INSERT INTO resumen_organizaciones (organizacion_id, total_horas, participaciones, ultima_participacion)
+        SELECT e.organizacion_id, COALESCE(SUM(h.horas), 0), COUNT(h.id), MAX(h.fecha_participacion)
+        FROM historial_actividad h
+        JOIN eventos e ON e.id = h.evento_id
+        GROUP BY e.organizacion_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_historial_usuario_fecha', table_name='historial_actividad')
+    op.drop_table('resumen_organizaciones')
+    op.drop_table('resumen_voluntarios')
@@ -0,0 +1,40 @@
+"""agregar revocación de tokens JWT
+
+Revision ID: add_revocaciones_token
+Revises: add_latido_replica
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_revocaciones_token'
+down_revision = 'add_latido_replica'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('usuarios', sa.Column('version_token', sa.Integer(), nullable=False, server_default='0'))
+    
+    op.create_table('revocaciones_token',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('jti', sa.String(length=36), nullable=True),
+    sa.Column('version', sa.Integer(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.Column('expira_en', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_revocaciones_token_jti', 'revocaciones_token', ['jti'])
+    op.create_index('ix_revocaciones_token_expira_en', 'revocaciones_token', ['expira_en'])
+
+
+def downgrade():
+    op.drop_index('ix_revocaciones_token_expira_en', table_name='revocaciones_token')
+    op.drop_index('ix_revocaciones_token_jti', table_name='revocaciones_token')
+    op.drop_table('revocaciones_token')
+    op.drop_column('usuarios', 'version_token')
@@ -0,0 +1,24 @@
+"""agregar versión de membresías a los usuarios
+
+Revision ID: add_version_membresias
+Revises: add_resumenes_analiticos
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_version_membresias'
+down_revision = 'add_resumenes_analiticos'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('usuarios', sa.Column('version_membresias', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    op.drop_column('usuarios', 'version_membresias')
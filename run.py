@@ -1,9 +1,8 @@
 import os
 from datetime import datetime
-from app import create_app, db
+from app import create_app
 from flask import g
-from app.models.event import RolEvento
-from app.utils.init_data import init_roles, create_admin_user
+from app.utils.init_data import seed_if_needed
 
 app = create_app(os.getenv('FLASK_CONFIG') or 'default')
 
@@ -18,28 +17,9 @@ def inject_now():
     return {'now': datetime.utcnow()}
 
 def init_db():
-    """Inicializa la base de datos con datos básicos"""
-    # Crear roles básicos y usuario administrador
-    init_roles()
-    create_admin_user()
-    
-    # Crear roles de evento
-    roles_evento = ['Coordinador', 'Asistente', 'Logística', 'Comunicación', 'Facilitador']
-    for rol in roles_evento:
-        if not RolEvento.query.filter_by(nombre=rol).first():
-            db.session.add(RolEvento(nombre=rol))
-    
-    db.session.commit()
-    print('Base de datos inicializada con datos básicos')
-
-
-    from flask import Flask
-
-    app = Flask(__name__)
-
-@app.route('/')
-def test():
-    return "✅ LandLink backend activo"
+    """Inicializa la base de datos con datos básicos (se omite si la versión de la semilla no cambió)"""
+    if seed_if_needed() is not None:
+        print('Base de datos inicializada con datos básicos')
 
 if __name__ == '__main__':
     with app.app_context():